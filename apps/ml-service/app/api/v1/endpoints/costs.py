@@ -1,11 +1,16 @@
 from fastapi import APIRouter, HTTPException, Depends
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import logging
 
+from app.services.ml_service import MLService
+
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Initialize ML service
+ml_service = MLService()
+
 class CostPredictionRequest(BaseModel):
     item_id: str
     historical_costs: List[dict]
@@ -13,6 +18,15 @@ class CostPredictionRequest(BaseModel):
     vendor_id: Optional[str] = None
     market_conditions: Optional[dict] = None
 
+class BatchCostPredictionRequest(BaseModel):
+    tenant_id: str = Field(..., description="Tenant identifier")
+    item_ids: List[str] = Field(..., description="Items to price")
+    vendor_ids: Optional[List[Optional[str]]] = Field(None, description="Vendor of each item")
+    quantities: Optional[List[float]] = Field(None, description="Order quantity of each item")
+    vendor_ratings: Optional[List[float]] = Field(None, description="Vendor rating of each item")
+    market_prices: Optional[List[float]] = Field(None, description="Market price of each item")
+    forecast_horizon: int = Field(12, ge=1, le=104, description="Weeks to price")
+
 class CostPredictionResponse(BaseModel):
     item_id: str
     predicted_cost: float
@@ -74,3 +88,32 @@ async def predict_cost(request: CostPredictionRequest):
     except Exception as e:
         logger.error(f"Error predicting cost: {e}")
         raise HTTPException(status_code=500, detail="Cost prediction failed")
+
+@router.post("/predict/batch", response_model=dict)
+async def predict_costs_batch(request: BatchCostPredictionRequest):
+    """
+    Predict weekly unit costs for many items with the trained cost models
+    
+    Inputs and results are columnar: every list has one entry per item, and
+    predicted_cost holds one list of forecast_horizon weekly costs per item
+    (null when no cost model covers the item).
+    """
+    try:
+        logger.info(f"Predicting costs for {len(request.item_ids)} items over {request.forecast_horizon} weeks")
+        
+        return await ml_service.generate_batch_cost_forecast(
+            request.tenant_id,
+            request.item_ids,
+            request.forecast_horizon,
+            vendor_ids=request.vendor_ids,
+            inputs={
+                'quantity': request.quantities,
+                'vendor_rating': request.vendor_ratings,
+                'market_price': request.market_prices
+            }
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error predicting costs: {e}")
+        raise HTTPException(status_code=500, detail="Batch cost prediction failed")
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, HTTPException, Depends, Query, Body
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from enum import Enum
+from datetime import datetime
 import logging
 
 from app.services.enhanced_ml_service import EnhancedMLService, ForecastMethod
+from app.services.training_executor import TrainingQueueFull, training_executor
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -17,8 +19,18 @@ class ForecastMethodEnum(str, Enum):
     prophet = "prophet" 
     xgboost = "xgboost"
     hybrid = "hybrid"
+    fast = "fast"
     auto = "auto"
 
+class FastMethodEnum(str, Enum):
+    auto = "auto"
+    ses = "ses"
+    holt = "holt"
+    holt_winters = "holt_winters"
+    croston = "croston"
+    sba = "sba"
+    seasonal_naive = "seasonal_naive"
+
 class ForecastRequest(BaseModel):
     tenant_id: str = Field(..., description="Tenant identifier")
     item_id: str = Field(..., description="Item identifier") 
@@ -38,14 +50,89 @@ class ForecastResponse(BaseModel):
     generated_at: str = Field(..., description="Generation timestamp")
     status: str = Field(..., description="Forecast status")
 
+class BatchForecastRequest(BaseModel):
+    tenant_id: str = Field(..., description="Tenant identifier")
+    item_ids: Optional[List[str]] = Field(None, description="Items to forecast (default: every item with demand)")
+    forecast_horizon: int = Field(30, ge=1, le=365, description="Forecast horizon in days")
+    fast_method: FastMethodEnum = Field(FastMethodEnum.auto, description="Fast forecasting method")
+
+class BacktestMethodEnum(str, Enum):
+    auto = "auto"
+    naive = "naive"
+    seasonal_naive = "seasonal_naive"
+    moving_average = "moving_average"
+    ses = "ses"
+    holt = "holt"
+    holt_winters = "holt_winters"
+    croston = "croston"
+    sba = "sba"
+
 class AccuracyRequest(BaseModel):
     tenant_id: str = Field(..., description="Tenant identifier")
     item_id: str = Field(..., description="Item identifier")
     vendor_id: str = Field(..., description="Vendor identifier")
     evaluation_days: int = Field(30, ge=7, le=90, description="Days to evaluate")
+    forecast_horizon: int = Field(7, ge=1, le=90, description="Days forecast from each cutoff")
+    step_days: int = Field(1, ge=1, le=30, description="Days between backtest cutoffs")
+    methods: Optional[List[BacktestMethodEnum]] = Field(None, description="Methods to backtest")
+
+    @model_validator(mode='after')
+    def check_horizon_fits_window(self):
+        if self.forecast_horizon > self.evaluation_days:
+            raise ValueError("forecast_horizon cannot exceed evaluation_days")
+        return self
+
+class BatchAccuracyRequest(BaseModel):
+    tenant_id: str = Field(..., description="Tenant identifier")
+    item_ids: Optional[List[str]] = Field(None, description="Items to evaluate (default: every item with demand)")
+    evaluation_days: int = Field(30, ge=7, le=90, description="Days to evaluate")
+    forecast_horizon: int = Field(7, ge=1, le=90, description="Days forecast from each cutoff")
+    step_days: int = Field(1, ge=1, le=30, description="Days between backtest cutoffs")
+    methods: Optional[List[BacktestMethodEnum]] = Field(None, description="Methods to backtest")
+
+    @model_validator(mode='after')
+    def check_horizon_fits_window(self):
+        if self.forecast_horizon > self.evaluation_days:
+            raise ValueError("forecast_horizon cannot exceed evaluation_days")
+        return self
+
+class SearchEnum(str, Enum):
+    grid = "grid"
+    random = "random"
+
+class TuningMetricEnum(str, Enum):
+    mae = "mae"
+    rmse = "rmse"
+    mape = "mape"
+    smape = "smape"
+
+class TuningRequest(BaseModel):
+    tenant_id: str = Field(..., description="Tenant identifier")
+    item_id: str = Field(..., description="Item identifier")
+    vendor_id: str = Field(..., description="Vendor identifier")
+    search_space: Optional[Dict[str, Any]] = Field(
+        None, description="Parameter values (lists) or ranges ({low, high, log}) to search"
+    )
+    search: SearchEnum = Field(SearchEnum.grid, description="Grid or random search")
+    n_iter: int = Field(20, ge=1, le=500, description="Parameter sets sampled by random search")
+    metric: TuningMetricEnum = Field(TuningMetricEnum.rmse, description="Cross-validated error to minimize")
+    seed: int = Field(0, description="Random search seed")
+
+class ModelTypeEnum(str, Enum):
+    demand_forecast = "demand_forecast"
+    cost_prediction = "cost_prediction"
+    global_demand_forecast = "global_demand_forecast"
+
+class TrainingRequest(BaseModel):
+    tenant_id: str = Field(..., description="Tenant identifier")
+    model_type: ModelTypeEnum = Field(ModelTypeEnum.demand_forecast, description="Type of model to train")
+    item_id: Optional[str] = Field(None, description="Item identifier (not used by global models)")
+    vendor_id: Optional[str] = Field(None, description="Vendor identifier (not used by global models)")
+    parameters: Dict[str, Any] = Field(default_factory=dict, description="Model parameters")
 
 class AccuracyResponse(BaseModel):
-    accuracy_metrics: Dict[str, float] = Field(..., description="Accuracy metrics")
+    accuracy_metrics: Dict[str, Optional[float]] = Field(..., description="Accuracy metrics of the most accurate method")
+    method_metrics: Dict[str, Dict[str, Optional[float]]] = Field(..., description="Accuracy metrics per method")
     evaluation_period: Dict[str, Any] = Field(..., description="Evaluation period info")
     method_used: str = Field(..., description="Method used for evaluation")
     data_points_compared: int = Field(..., description="Number of data points compared")
@@ -144,6 +231,57 @@ async def generate_prophet_forecast(request: ForecastRequest):
         logger.error(f"Prophet forecast generation failed: {e}")
         raise HTTPException(status_code=500, detail=f"Prophet forecast generation failed: {str(e)}")
 
+@router.post("/fast", response_model=ForecastResponse)
+async def generate_fast_forecast(request: ForecastRequest):
+    """
+    Generate forecast using the vectorized fast forecasters
+    
+    Exponential smoothing (simple, Holt, Holt-Winters), Croston/SBA for
+    intermittent demand and seasonal naive, fitted in NumPy. Suited to
+    sparse long-tail items that are too short or intermittent for Prophet.
+    """
+    try:
+        logger.info(f"Generating fast forecast for item {request.item_id}")
+        
+        result = await ml_service.generate_forecast(
+            tenant_id=request.tenant_id,
+            item_id=request.item_id,
+            vendor_id=request.vendor_id,
+            forecast_horizon=request.forecast_horizon,
+            method=ForecastMethod.FAST,
+            force_method=True
+        )
+        
+        logger.info(f"Fast forecast generated successfully for item {request.item_id}")
+        return ForecastResponse(**result)
+        
+    except Exception as e:
+        logger.error(f"Fast forecast generation failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Fast forecast generation failed: {str(e)}")
+
+@router.post("/fast/batch")
+async def generate_fast_forecasts(request: BatchForecastRequest):
+    """
+    Forecast many items of a tenant in one vectorized pass
+    
+    Returns per-item predictions and the algorithm each item used.
+    """
+    try:
+        logger.info(f"Generating fast forecasts for tenant {request.tenant_id}")
+        
+        return await ml_service.generate_fast_forecasts(
+            tenant_id=request.tenant_id,
+            forecast_horizon=request.forecast_horizon,
+            item_ids=request.item_ids,
+            fast_method=request.fast_method.value
+        )
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Batch fast forecast generation failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Batch fast forecast generation failed: {str(e)}")
+
 @router.post("/hybrid", response_model=ForecastResponse)
 async def generate_hybrid_forecast(request: ForecastRequest):
     """
@@ -174,10 +312,11 @@ async def generate_hybrid_forecast(request: ForecastRequest):
 @router.post("/accuracy", response_model=AccuracyResponse)
 async def evaluate_forecast_accuracy(request: AccuracyRequest):
     """
-    Evaluate forecast accuracy by comparing predictions with actual values
+    Evaluate forecast accuracy by rolling-origin backtesting
     
-    This endpoint helps assess the performance of different forecasting
-    methods by calculating metrics like MAPE, RMSE, and R².
+    Each method is forecast from every cutoff of the evaluation window
+    using only earlier data and scored against the actual demand with
+    MAE, RMSE, MAPE, sMAPE and MASE.
     """
     try:
         logger.info(f"Evaluating forecast accuracy for item {request.item_id}")
@@ -186,7 +325,10 @@ async def evaluate_forecast_accuracy(request: AccuracyRequest):
             tenant_id=request.tenant_id,
             item_id=request.item_id,
             vendor_id=request.vendor_id,
-            days_back=request.evaluation_days
+            days_back=request.evaluation_days,
+            forecast_horizon=request.forecast_horizon,
+            step_days=request.step_days,
+            methods=[method.value for method in request.methods] if request.methods else None
         )
         
         if 'error' in result:
@@ -201,6 +343,177 @@ async def evaluate_forecast_accuracy(request: AccuracyRequest):
         logger.error(f"Accuracy evaluation failed: {e}")
         raise HTTPException(status_code=500, detail=f"Accuracy evaluation failed: {str(e)}")
 
+@router.post("/accuracy/batch")
+async def evaluate_forecast_accuracy_batch(request: BatchAccuracyRequest):
+    """
+    Backtest many items of a tenant at once
+    
+    Returns each item's metrics per method and its most accurate method,
+    and every method's metrics averaged over the items.
+    """
+    try:
+        logger.info(f"Evaluating forecast accuracy for tenant {request.tenant_id}")
+        
+        return await ml_service.get_forecast_accuracy_many(
+            tenant_id=request.tenant_id,
+            item_ids=request.item_ids,
+            days_back=request.evaluation_days,
+            forecast_horizon=request.forecast_horizon,
+            step_days=request.step_days,
+            methods=[method.value for method in request.methods] if request.methods else None
+        )
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Batch accuracy evaluation failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Batch accuracy evaluation failed: {str(e)}")
+
+@router.post("/tune")
+async def tune_prophet_model(request: TuningRequest):
+    """
+    Tune Prophet hyperparameters of an item by rolling-origin cross-validation
+    
+    The search is queued as a training job; poll /tune/{training_id}
+    for its report. The best parameters are stored for the item and used
+    whenever its Prophet model is trained or retrained. Fold fits run in a
+    shared pool of worker processes and are cached, so re-tuning after new
+    data only fits the new folds.
+    """
+    try:
+        logger.info(f"Tuning Prophet parameters for item {request.item_id}")
+        
+        job = training_executor.submit_tuning(
+            request.item_id,
+            request.vendor_id,
+            request.tenant_id,
+            {
+                'search_space': request.search_space,
+                'search': request.search.value,
+                'n_iter': request.n_iter,
+                'metric': request.metric.value,
+                'seed': request.seed
+            }
+        )
+        
+        return {
+            "status": "tuning_queued",
+            "message": "Prophet tuning has been queued",
+            "training_id": job.job_id,
+            "queued_at": datetime.now().isoformat()
+        }
+        
+    except TrainingQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Prophet tuning failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Prophet tuning failed: {str(e)}")
+
+@router.get("/tune/{training_id}")
+async def get_tuning_status(training_id: str):
+    """
+    Get the status of a tuning job, with its report once it is done
+    """
+    job = training_executor.get(training_id)
+    if job is None or job.kind != 'tune':
+        raise HTTPException(status_code=404, detail="Tuning job not found")
+    
+    return {
+        "status": "success",
+        "job": job.to_dict()
+    }
+
+@router.post("/training")
+async def queue_model_training(request: TrainingRequest):
+    """
+    Train a new model in the training executor's worker processes
+    
+    Returns at once with a training_id; poll /training/{training_id} for
+    the job's status and, once it is done, the new model's id.
+    """
+    try:
+        job = training_executor.submit(
+            request.model_type.value,
+            request.item_id,
+            request.vendor_id,
+            request.tenant_id,
+            request.parameters
+        )
+        
+        logger.info(f"Training queued for {request.model_type.value} model as job {job.job_id}")
+        
+        return {
+            "status": "training_queued",
+            "message": "Model training has been queued",
+            "training_id": job.job_id,
+            "queued_at": datetime.now().isoformat()
+        }
+        
+    except TrainingQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error starting training: {e}")
+        raise HTTPException(status_code=500, detail=f"Training failed: {str(e)}")
+
+@router.get("/training/{training_id}")
+async def get_training_status(training_id: str):
+    """
+    Get the status of a training, retraining or tuning job
+    """
+    job = training_executor.get(training_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Training job not found")
+    
+    return {
+        "status": "success",
+        "job": job.to_dict()
+    }
+
+@router.delete("/training/{training_id}")
+async def cancel_training(training_id: str):
+    """
+    Cancel a queued or running training job
+    """
+    try:
+        cancelled = training_executor.cancel(training_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Training job not found")
+    
+    if not cancelled:
+        raise HTTPException(status_code=409, detail="Training job has already finished")
+    
+    return {
+        "status": "success",
+        "message": "Training job cancelled"
+    }
+
+@router.post("/models/{tenant_id}/{model_id}/retrain")
+async def queue_model_retraining(tenant_id: str, model_id: str):
+    """
+    Retrain an existing model with new data
+    
+    Queued like /training; the finished job's model_id is the model to
+    use, either the new version or model_id itself if it was kept.
+    """
+    try:
+        job = training_executor.submit_retrain(tenant_id, model_id)
+        
+        logger.info(f"Retraining queued for model {model_id} as job {job.job_id}")
+        
+        return {
+            "status": "retraining_queued",
+            "message": "Model retraining has been queued",
+            "model_id": model_id,
+            "training_id": job.job_id,
+            "queued_at": datetime.now().isoformat()
+        }
+        
+    except TrainingQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error starting retraining: {e}")
+        raise HTTPException(status_code=500, detail=f"Retraining failed: {str(e)}")
+
 @router.get("/status")
 async def get_forecast_service_status():
     """
@@ -294,6 +607,14 @@ async def get_available_forecast_methods():
                 "recommended_for": ["Critical forecasts", "Improved accuracy", "Risk mitigation"],
                 "max_horizon_days": 365
             },
+            "fast": {
+                "name": "Fast (exponential smoothing / Croston)",
+                "available": True,
+                "description": "Vectorized NumPy forecasters for sparse and intermittent demand",
+                "min_data_points": 1,
+                "recommended_for": ["Long-tail items", "Intermittent demand", "Forecasting many items at once"],
+                "max_horizon_days": 90
+            },
             "auto": {
                 "name": "Auto-selection",
                 "available": True,
@@ -1,31 +1,33 @@
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, Query
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import logging
 from datetime import datetime, timedelta
 
 from app.services.ml_service import MLService
+from app.services.training_executor import TrainingQueueFull, training_executor
 from app.core.auth import get_current_user
+from app.core.database import get_data_service
 from app.schemas.forecast import ForecastRequest, ForecastResponse, TrainingRequest, TrainingResponse
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+def get_ml_service() -> MLService:
+    """MLService bound to the process-wide database connections"""
+    return MLService(get_data_service())
+
 @router.post("/train", response_model=TrainingResponse)
 async def train_model(
     request: TrainingRequest,
-    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user)
 ):
     """
     Train a new ML model for demand forecasting or cost prediction
     """
     try:
-        ml_service = MLService()
-        
-        # Start training in background
-        background_tasks.add_task(
-            ml_service.train_model,
+        # Queue training for the worker processes
+        job = training_executor.submit(
             request.model_type,
             request.item_id,
             request.vendor_id,
@@ -33,30 +35,69 @@ async def train_model(
             request.parameters
         )
         
-        logger.info(f"Training started for {request.model_type} model")
+        logger.info(f"Training queued for {request.model_type} model as job {job.job_id}")
         
         return TrainingResponse(
-            status="training_started",
-            message="Model training has been initiated",
-            training_id=f"train_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            status="training_queued",
+            message="Model training has been queued",
+            training_id=job.job_id,
             timestamp=datetime.now()
         )
         
+    except TrainingQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error starting training: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Training failed: {str(e)}")
 
+@router.get("/train/{training_id}")
+async def get_training_status(
+    training_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get the status of a training job
+    """
+    job = training_executor.get(training_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Training job not found")
+    
+    return {
+        "status": "success",
+        "job": job.to_dict()
+    }
+
+@router.delete("/train/{training_id}")
+async def cancel_training(
+    training_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Cancel a queued or running training job
+    """
+    try:
+        cancelled = training_executor.cancel(training_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Training job not found")
+    
+    if not cancelled:
+        raise HTTPException(status_code=409, detail="Training job has already finished")
+    
+    return {
+        "status": "success",
+        "message": "Training job cancelled"
+    }
+
 @router.post("/forecast", response_model=ForecastResponse)
 async def generate_forecast(
     request: ForecastRequest,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    ml_service: MLService = Depends(get_ml_service)
 ):
     """
     Generate forecast predictions using trained models
     """
     try:
-        ml_service = MLService()
-        
         forecast = await ml_service.generate_forecast(
             request.model_type,
             request.item_id,
@@ -88,21 +129,28 @@ async def generate_forecast(
 async def list_models(
     tenant_id: str,
     model_type: Optional[str] = None,
-    current_user: dict = Depends(get_current_user)
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
+    ml_service: MLService = Depends(get_ml_service)
 ):
     """
-    List available trained models for a tenant
+    List available trained models for a tenant, newest first
+    
+    Pass the returned next_cursor as cursor to fetch the next page.
     """
     try:
-        ml_service = MLService()
-        models = await ml_service.list_models(tenant_id, model_type)
+        page = await ml_service.list_models(tenant_id, model_type, limit, cursor)
         
         return {
             "status": "success",
-            "models": models,
-            "total": len(models)
+            "models": page["models"],
+            "total": len(page["models"]),
+            "next_cursor": page["next_cursor"]
         }
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error listing models: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to list models: {str(e)}")
@@ -111,13 +159,13 @@ async def list_models(
 async def get_model_info(
     tenant_id: str,
     model_id: str,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    ml_service: MLService = Depends(get_ml_service)
 ):
     """
     Get detailed information about a specific model
     """
     try:
-        ml_service = MLService()
         model_info = await ml_service.get_model_info(tenant_id, model_id)
         
         if not model_info:
@@ -138,14 +186,15 @@ async def get_model_info(
 async def delete_model(
     tenant_id: str,
     model_id: str,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    ml_service: MLService = Depends(get_ml_service)
 ):
     """
     Delete a trained model
     """
     try:
-        ml_service = MLService()
-        await ml_service.delete_model(tenant_id, model_id)
+        if not await ml_service.delete_model(tenant_id, model_id):
+            raise HTTPException(status_code=404, detail="Model not found")
         
         logger.info(f"Model {model_id} deleted for tenant {tenant_id}")
         
@@ -154,6 +203,8 @@ async def delete_model(
             "message": "Model deleted successfully"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error deleting model: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to delete model: {str(e)}")
@@ -162,31 +213,29 @@ async def delete_model(
 async def retrain_model(
     tenant_id: str,
     model_id: str,
-    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user)
 ):
     """
     Retrain an existing model with new data
+    
+    Queued like /train; poll /train/{training_id} for the model to use
+    once it is done.
     """
     try:
-        ml_service = MLService()
-        
-        # Start retraining in background
-        background_tasks.add_task(
-            ml_service.retrain_model,
-            tenant_id,
-            model_id
-        )
+        job = training_executor.submit_retrain(tenant_id, model_id)
         
-        logger.info(f"Retraining started for model {model_id}")
+        logger.info(f"Retraining queued for model {model_id} as job {job.job_id}")
         
         return {
-            "status": "retraining_started",
-            "message": "Model retraining has been initiated",
+            "status": "retraining_queued",
+            "message": "Model retraining has been queued",
             "model_id": model_id,
+            "training_id": job.job_id,
             "timestamp": datetime.now()
         }
         
+    except TrainingQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error starting retraining: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Retraining failed: {str(e)}")
@@ -195,13 +244,13 @@ async def retrain_model(
 async def get_model_performance(
     tenant_id: str,
     model_type: Optional[str] = None,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    ml_service: MLService = Depends(get_ml_service)
 ):
     """
     Get performance metrics for models
     """
     try:
-        ml_service = MLService()
         performance = await ml_service.get_model_performance(tenant_id, model_type)
         
         return {
@@ -216,13 +265,13 @@ async def get_model_performance(
 @router.post("/batch-forecast")
 async def batch_forecast(
     requests: List[ForecastRequest],
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    ml_service: MLService = Depends(get_ml_service)
 ):
     """
     Generate forecasts for multiple items/vendors in batch
     """
     try:
-        ml_service = MLService()
         results = []
         
         for request in requests:
@@ -1,18 +1,109 @@
+import asyncio
 import motor.motor_asyncio
+from redis import ConnectionPool, Redis
+from typing import Optional
 from app.core.config import settings
+from app.services.data_service import DataService
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+class ConnectionManager:
+    """
+    Process-wide MongoDB and Redis clients
+
+    Both clients pool their connections, so one of each is shared by every
+    service and request instead of being built per service instance. The
+    FastAPI lifespan verifies them on startup (init_db) and closes them on
+    shutdown (close_db); clients are created lazily on first use, so
+    services built at import time only keep a reference.
+    """
+
+    def __init__(self, mongo_uri: str, redis_url: str):
+        self.mongo_uri = mongo_uri
+        self.redis_url = redis_url
+        self._mongo_client: Optional[motor.motor_asyncio.AsyncIOMotorClient] = None
+        self._redis_client: Optional[Redis] = None
+        self._data_service: Optional[DataService] = None
+
+    @property
+    def mongo_client(self) -> motor.motor_asyncio.AsyncIOMotorClient:
+        if self._mongo_client is None:
+            self._mongo_client = motor.motor_asyncio.AsyncIOMotorClient(
+                self.mongo_uri,
+                maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+                minPoolSize=settings.MONGODB_MIN_POOL_SIZE,
+                maxIdleTimeMS=settings.MONGODB_MAX_IDLE_TIME_MS,
+                serverSelectionTimeoutMS=settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+                appname=settings.APP_NAME
+            )
+        return self._mongo_client
+
+    @property
+    def redis_client(self) -> Redis:
+        if self._redis_client is None:
+            pool = ConnectionPool.from_url(
+                self.redis_url,
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+                socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS
+            )
+            self._redis_client = Redis(connection_pool=pool)
+        return self._redis_client
+
+    @property
+    def data_service(self) -> DataService:
+        """DataService shared by every service, built on the pooled clients"""
+        if self._data_service is None:
+            self._data_service = DataService(
+                mongo_client=self.mongo_client,
+                redis_client=self.redis_client
+            )
+        return self._data_service
+
+    def close(self) -> None:
+        if self._mongo_client is not None:
+            self._mongo_client.close()
+            self._mongo_client = None
+        if self._redis_client is not None:
+            self._redis_client.close()
+            self._redis_client.connection_pool.disconnect()
+            self._redis_client = None
+        self._data_service = None
+
+
+connections = ConnectionManager(settings.MONGODB_URI, settings.REDIS_URL)
+
+
+def get_data_service() -> DataService:
+    """Return the process-wide DataService"""
+    return connections.data_service
+
+
 async def init_db():
-    """Initialize database connection"""
+    """Establish the shared database connections and verify they respond"""
     try:
-        # For now, just log that we would connect to MongoDB
-        # In a real implementation, you would establish the connection here
-        logger.info("Database initialization would happen here")
-        logger.info(f"MongoDB URI: {settings.MONGODB_URI}")
-        logger.info(f"MongoDB Database: {settings.MONGODB_DB}")
-        return True
+        await connections.mongo_client.admin.command('ping')
+        logger.info(f"Connected to MongoDB (database {settings.MONGODB_DB}, pool size {settings.MONGODB_MAX_POOL_SIZE})")
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
         return False
+
+    try:
+        await asyncio.to_thread(connections.redis_client.ping)
+        logger.info(f"Connected to Redis (pool size {settings.REDIS_MAX_CONNECTIONS})")
+    except Exception as e:
+        # Training reads fall back to MongoDB; the model registry needs Redis back
+        logger.warning(f"Redis is unavailable: {e}")
+
+    return True
+
+async def close_db():
+    """Close the shared database connections"""
+    connections.close()
+    logger.info("Database connections closed")
+
+async def ensure_indexes():
+    """Create the compound indexes training reads rely on for every tenant"""
+    return await get_data_service().ensure_indexes()
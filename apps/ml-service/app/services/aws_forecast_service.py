@@ -11,6 +11,7 @@ import asyncio
 from concurrent.futures import ThreadPoolExecutor
 
 from app.core.config import settings
+from app.core.database import get_data_service
 from app.services.data_service import DataService
 
 logger = logging.getLogger(__name__)
@@ -21,11 +22,8 @@ class AWSForecastService:
     Provides enterprise-grade time series forecasting using Amazon Forecast
     """
     
-    def __init__(self):
-        self.data_service = DataService(
-            mongo_uri=settings.MONGODB_URI,
-            redis_url=settings.REDIS_URL
-        )
+    def __init__(self, data_service: Optional[DataService] = None):
+        self.data_service = data_service or get_data_service()
         self.region_name = settings.AWS_REGION or 'us-east-1'
         self.role_arn = settings.AWS_FORECAST_ROLE_ARN
         
@@ -112,7 +110,7 @@ class AWSForecastService:
         try:
             # Get historical order data
             historical_data = await self.data_service.get_training_data(
-                tenant_id, item_id, vendor_id, 'forecast'
+                tenant_id, 'demand', item_id=item_id, vendor_id=vendor_id
             )
             
             if historical_data.empty:
@@ -0,0 +1,221 @@
+"""
+Vectorized rolling-origin backtests of many demand series
+
+Every function takes `values`, a [days, series] array of daily demand
+(missing days as zero), and `cutoffs`, the day indices forecasts are made
+from: a forecast from cutoff c sees values[:c] and is scored on
+values[c:c + horizon]. Forecasts and actuals of all cutoffs are held as
+[cutoffs, horizon, series] arrays, so one set of array operations scores
+every cutoff of every series; history is loaded once by the caller.
+"""
+import logging
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.services.fast_forecasters import METHODS as FAST_METHODS, forecast_many
+
+logger = logging.getLogger(__name__)
+
+# Baselines computed for every cutoff at once by indexing
+BASELINE_METHODS = ('naive', 'seasonal_naive', 'moving_average')
+# The fast forecasters are fitted once per cutoff, vectorized over series
+BACKTEST_METHODS = BASELINE_METHODS + tuple(m for m in FAST_METHODS if m != 'seasonal_naive')
+
+METRICS = ('mae', 'rmse', 'mape', 'smape', 'mase')
+
+
+def rolling_cutoffs(days: int, horizon: int, evaluation_days: int, step_days: int = 1, min_train_days: int = 1) -> np.ndarray:
+    """
+    Cutoffs whose test windows lie within the last evaluation_days days
+
+    The latest cutoff is days - horizon; earlier ones are step_days apart.
+    Cutoffs with fewer than min_train_days days of history are dropped.
+    """
+    last = days - horizon
+    first = max(days - evaluation_days, min_train_days)
+    if last < first:
+        return np.empty(0, dtype=np.int64)
+    return np.arange(last, first - 1, -step_days, dtype=np.int64)[::-1]
+
+
+def actual_windows(values: np.ndarray, cutoffs: np.ndarray, horizon: int) -> np.ndarray:
+    """[cutoffs, horizon, series] actual demand after each cutoff"""
+    return values[cutoffs[:, None] + np.arange(horizon)]
+
+
+def baseline_forecasts(
+    values: np.ndarray,
+    cutoffs: np.ndarray,
+    horizon: int,
+    method: str,
+    season_length: int = 7,
+    window: int = 28
+) -> np.ndarray:
+    """
+    Forecasts of a baseline method from every cutoff in one indexing step
+
+    naive repeats the last day, seasonal_naive the last season and
+    moving_average the mean of the last `window` days (fewer if the history
+    is shorter).
+
+    Returns:
+        [cutoffs, horizon, series] forecasts
+    """
+    if method == 'naive':
+        return np.repeat(values[cutoffs - 1][:, None, :], horizon, axis=1)
+
+    if method == 'seasonal_naive':
+        m = min(season_length, int(cutoffs.min()))
+        return values[cutoffs[:, None] - m + np.arange(horizon) % m]
+
+    if method == 'moving_average':
+        cumulative = np.vstack([np.zeros((1, values.shape[1])), np.cumsum(values, axis=0)])
+        span = np.minimum(window, cutoffs)
+        mean = (cumulative[cutoffs] - cumulative[cutoffs - span]) / span[:, None]
+        return np.repeat(mean[:, None, :], horizon, axis=1)
+
+    raise ValueError(f"Unsupported baseline method: {method}")
+
+
+def backtest_forecasts(
+    values: np.ndarray,
+    cutoffs: np.ndarray,
+    horizon: int,
+    method: str,
+    season_length: int = 7
+) -> np.ndarray:
+    """[cutoffs, horizon, series] forecasts of `method` from every cutoff"""
+    if method in BASELINE_METHODS:
+        return baseline_forecasts(values, cutoffs, horizon, method, season_length)
+    if method not in BACKTEST_METHODS:
+        raise ValueError(f"Unsupported backtest method: {method}")
+    return np.stack([
+        forecast_many(values[:cutoff], horizon, method, season_length)[0] for cutoff in cutoffs
+    ])
+
+
+def mase_scale(values: np.ndarray, cutoffs: np.ndarray, season_length: int = 7) -> np.ndarray:
+    """
+    [cutoffs, series] in-sample MAE of the seasonal naive forecast before each cutoff
+
+    Falls back to the one-step naive forecast when the shortest history
+    holds no full season. Computed from one cumulative sum of absolute
+    differences.
+    """
+    lag = season_length if cutoffs.min() > season_length else 1
+    differences = np.abs(values[lag:] - values[:-lag])
+    cumulative = np.vstack([np.zeros((1, values.shape[1])), np.cumsum(differences, axis=0)])
+    return cumulative[cutoffs - lag] / np.maximum(cutoffs - lag, 1)[:, None]
+
+
+def forecast_errors(actual: np.ndarray, forecast: np.ndarray, scale: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    MAE, RMSE, MAPE, sMAPE and MASE of every series over all cutoffs and steps
+
+    Args:
+        actual: [cutoffs, horizon, series] actual demand
+        forecast: Forecasts of the same shape
+        scale: [cutoffs, series] MASE denominators (see mase_scale; optional)
+
+    Returns:
+        Metric name to a [series] array. MAPE only counts days with demand
+        and is NaN for series without any; MASE is NaN where the scale is
+        zero. Percentages are 0-100.
+    """
+    error = actual - forecast
+    abs_error = np.abs(error)
+    abs_actual = np.abs(actual)
+
+    demand = abs_actual > 0
+    demand_days = demand.sum(axis=(0, 1))
+    ape_sum = np.where(demand, abs_error / np.where(demand, abs_actual, 1.0), 0.0).sum(axis=(0, 1))
+
+    denominator = abs_actual + np.abs(forecast)
+    sape = np.where(denominator > 0, 2 * abs_error / np.where(denominator > 0, denominator, 1.0), 0.0)
+
+    errors = {
+        'mae': abs_error.mean(axis=(0, 1)),
+        'rmse': np.sqrt((error ** 2).mean(axis=(0, 1))),
+        'mape': np.where(demand_days > 0, ape_sum / np.maximum(demand_days, 1) * 100, np.nan),
+        'smape': sape.mean(axis=(0, 1)) * 100,
+        'mase': np.full(actual.shape[2], np.nan)
+    }
+    if scale is not None:
+        scaled = scale > 0
+        cutoff_mae = abs_error.mean(axis=1)  # [cutoffs, series]
+        counted = scaled.sum(axis=0)
+        errors['mase'] = np.where(
+            counted > 0,
+            np.where(scaled, cutoff_mae / np.where(scaled, scale, 1.0), 0.0).sum(axis=0) / np.maximum(counted, 1),
+            np.nan
+        )
+    return errors
+
+
+def run_backtest(
+    values: np.ndarray,
+    horizon: int,
+    evaluation_days: int,
+    methods: Sequence[str] = ('auto',),
+    step_days: int = 1,
+    season_length: int = 7,
+    min_train_days: Optional[int] = None
+) -> Dict[str, object]:
+    """
+    Backtest methods on every series from every cutoff of the evaluation window
+
+    Args:
+        values: [days, series] daily demand
+        horizon: Days forecast from each cutoff
+        evaluation_days: Trailing days the test windows cover
+        methods: Methods to evaluate, from BACKTEST_METHODS
+        step_days: Days between cutoffs
+        season_length: Days per season
+        min_train_days: Least history a cutoff needs (default two seasons)
+
+    Returns:
+        {'cutoffs': [cutoff indices], 'metrics': {method: {metric: [series] array}}}
+
+    Raises:
+        ValueError: For unknown methods, a horizon longer than the evaluation
+            window, or history too short for any cutoff
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        values = values[:, None]
+    unknown = [method for method in methods if method not in BACKTEST_METHODS]
+    if unknown:
+        raise ValueError(f"Unsupported backtest methods: {unknown}")
+
+    if horizon > evaluation_days:
+        raise ValueError(
+            f"The {evaluation_days}-day evaluation window is shorter than the {horizon}-day horizon"
+        )
+
+    if min_train_days is None:
+        min_train_days = 2 * season_length
+    cutoffs = rolling_cutoffs(values.shape[0], horizon, evaluation_days, step_days, max(min_train_days, 1))
+    if not len(cutoffs):
+        raise ValueError(
+            f"Need at least {max(min_train_days, 1) + horizon} days of history to backtest a {horizon}-day horizon"
+        )
+
+    actual = actual_windows(values, cutoffs, horizon)
+    scale = mase_scale(values, cutoffs, season_length)
+    metrics: Dict[str, Dict[str, np.ndarray]] = {}
+    for method in methods:
+        forecast = np.maximum(backtest_forecasts(values, cutoffs, horizon, method, season_length), 0.0)
+        metrics[method] = forecast_errors(actual, forecast, scale)
+
+    return {'cutoffs': cutoffs, 'metrics': metrics}
+
+
+def summarize(errors: Dict[str, np.ndarray], columns: Optional[List[int]] = None) -> Dict[str, Optional[float]]:
+    """Mean of each metric over series (NaN series skipped; None if all are NaN)"""
+    summary = {}
+    for name, per_series in errors.items():
+        selected = per_series if columns is None else per_series[columns]
+        finite = selected[np.isfinite(selected)]
+        summary[name] = float(finite.mean()) if len(finite) else None
+    return summary
@@ -0,0 +1,270 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.core.config import settings
+from app.services.cursor_frames import Column, FrameBuilder
+from app.services.data_service import COST_COLUMNS, DEMAND_ROW_COLUMNS, DataService
+from app.services.training_cache import normalize_ids
+
+logger = logging.getLogger(__name__)
+
+EXPORT_COLUMNS = {
+    'demand': DEMAND_ROW_COLUMNS,
+    'cost': COST_COLUMNS,
+}
+
+MANIFEST_FILE = 'manifest.json'
+
+_ARROW_TYPES = {
+    'datetime64[ns]': pa.timestamp('ns'),
+    'float64': pa.float64(),
+    'object': pa.string(),
+}
+
+
+def _schema(columns: Sequence[Column]) -> pa.Schema:
+    return pa.schema([(column.name, _ARROW_TYPES[column.dtype]) for column in columns])
+
+
+class BulkTrainingExport:
+    """
+    Exports demand and cost training data for many tenants at once
+
+    Tenants are exported concurrently, at most `concurrency` at a time, on
+    the DataService's shared Mongo client, routed like training reads. Each read streams its cursor
+    into column buffers that are flushed to Parquet one row group at a
+    time, so memory is bounded by the row group size rather than by the
+    tenant's history.
+
+    A batch is laid out as
+      <output_dir>/<batch_id>/<data_type>/tenant=<tenant_id>/part.parquet
+      <output_dir>/<batch_id>/manifest.json
+    so each data type reads as one tenant-partitioned dataset with
+    pyarrow.dataset (partitioning='hive'). Files are written under a
+    temporary name and renamed once complete, and the manifest is written
+    last, so a batch is ready once it has a manifest.
+
+    Demand rows are daily item/vendor quantities (the rollup plus raw
+    movements past its watermark); cost rows are purchase order lines.
+    """
+
+    def __init__(
+        self,
+        data_service: DataService,
+        output_dir: str = settings.BULK_EXPORT_PATH,
+        concurrency: int = settings.BULK_EXPORT_CONCURRENCY,
+        row_group_size: int = settings.BULK_EXPORT_ROW_GROUP_SIZE
+    ):
+        self.data_service = data_service
+        self.output_dir = Path(output_dir)
+        self.concurrency = concurrency
+        self.row_group_size = row_group_size
+
+    async def export(
+        self,
+        tenant_ids: Optional[List[str]] = None,
+        data_types: Sequence[str] = ('demand', 'cost'),
+        since: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Export training data for a set of tenants into a new batch
+
+        Args:
+            tenant_ids: Tenants to export (optional, defaults to every tenant_* database)
+            data_types: Data types to export ('demand', 'cost')
+            since: Only export data from this date onwards (ISO format, optional)
+
+        Returns:
+            The batch manifest, with per-tenant rows, bytes and rows/sec
+        """
+        for data_type in data_types:
+            if data_type not in EXPORT_COLUMNS:
+                raise ValueError(f"Unsupported export data type: {data_type}")
+
+        if tenant_ids is None:
+            db_names = await self.data_service.mongo_client.list_database_names()
+            tenant_ids = [name[len('tenant_'):] for name in db_names if name.startswith('tenant_')]
+
+        batch_id = datetime.utcnow().strftime('%Y%m%dT%H%M%S%fZ')
+        batch_dir = self.output_dir / batch_id
+        batch_dir.mkdir(parents=True)
+
+        started_at = datetime.utcnow()
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def export_tenant(tenant_id: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._export_tenant(batch_dir, tenant_id, data_types, since)
+
+        tenants = await asyncio.gather(*(export_tenant(tenant_id) for tenant_id in tenant_ids))
+        seconds = time.perf_counter() - started
+
+        rows = sum(t['rows'] for t in tenants)
+        manifest = {
+            'batch_id': batch_id,
+            'path': str(batch_dir),
+            'data_types': list(data_types),
+            'since': since,
+            'started_at': started_at.isoformat(),
+            'seconds': round(seconds, 3),
+            'rows': rows,
+            'bytes': sum(t['bytes'] for t in tenants),
+            'rows_per_second': round(rows / seconds) if seconds else 0,
+            'failed_tenants': [t['tenant_id'] for t in tenants if t['status'] == 'failed'],
+            'tenants': tenants
+        }
+
+        manifest_tmp = batch_dir / f".{MANIFEST_FILE}.tmp"
+        with open(manifest_tmp, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(manifest_tmp, batch_dir / MANIFEST_FILE)
+
+        logger.info(
+            f"Exported {rows} rows for {len(tenants)} tenants to {batch_dir} in {seconds:.1f}s "
+            f"({len(manifest['failed_tenants'])} failed)"
+        )
+        return manifest
+
+    async def _export_tenant(
+        self,
+        batch_dir: Path,
+        tenant_id: str,
+        data_types: Sequence[str],
+        since: Optional[str]
+    ) -> Dict[str, Any]:
+        result: Dict[str, Any] = {'tenant_id': tenant_id, 'status': 'completed', 'files': {}}
+        started = time.perf_counter()
+
+        try:
+            await self.data_service._ensure_tenant_indexes(tenant_id)
+
+            for data_type in data_types:
+                path = batch_dir / data_type / f"tenant={tenant_id}" / 'part.parquet'
+                path.parent.mkdir(parents=True)
+                file_started = time.perf_counter()
+                rows = await self._write_parquet(
+                    path, await self._reads(tenant_id, data_type, since), EXPORT_COLUMNS[data_type]
+                )
+                file_seconds = time.perf_counter() - file_started
+                result['files'][data_type] = {
+                    'path': str(path.relative_to(batch_dir)),
+                    'rows': rows,
+                    'bytes': path.stat().st_size,
+                    'rows_per_second': round(rows / file_seconds) if file_seconds else 0
+                }
+        except Exception as e:
+            logger.error(f"Error exporting training data for tenant {tenant_id}: {str(e)}")
+            result['status'] = 'failed'
+            result['error'] = str(e)
+
+        seconds = time.perf_counter() - started
+        rows = sum(f['rows'] for f in result['files'].values())
+        result.update({
+            'rows': rows,
+            'bytes': sum(f['bytes'] for f in result['files'].values()),
+            'seconds': round(seconds, 3),
+            'rows_per_second': round(rows / seconds) if seconds else 0
+        })
+        return result
+
+    async def _reads(self, tenant_id: str, data_type: str, since: Optional[str]) -> List[Tuple[Any, List[Dict[str, Any]]]]:
+        """Return the (collection, pipeline) reads that make up one export file"""
+        db = self.data_service._tenant_db(tenant_id, 'training')
+
+        if data_type == 'demand':
+            watermark = await self.data_service.demand_rollup.get_watermark(tenant_id)
+            return self.data_service._demand_row_pipelines(db, since, watermark)
+        return [(db.purchase_orders, self.data_service._cost_pipeline(since, None))]
+
+    async def _write_parquet(
+        self,
+        path: Path,
+        reads: List[Tuple[Any, List[Dict[str, Any]]]],
+        columns: Sequence[Column]
+    ) -> int:
+        """Stream the reads into a Parquet file, one row group per row_group_size rows"""
+        schema = _schema(columns)
+        batch_size = self.data_service.batch_size
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        writer = pq.ParquetWriter(tmp_path, schema, compression='zstd')
+        rows = 0
+
+        try:
+            for collection, pipeline in reads:
+                cursor = collection.aggregate(
+                    pipeline,
+                    batchSize=batch_size,
+                    allowDiskUse=True,
+                    maxTimeMS=self.data_service.max_time_ms['training']
+                )
+                builder = FrameBuilder(columns, capacity=self.row_group_size)
+
+                while True:
+                    batch = await cursor.to_list(length=batch_size)
+                    builder.extend(batch)
+
+                    if len(builder) >= self.row_group_size or (not batch and len(builder)):
+                        # Parquet encoding is CPU-bound; keep the event loop serving other tenants
+                        await asyncio.to_thread(self._write_row_group, writer, builder, schema)
+                        rows += len(builder)
+                        builder = FrameBuilder(columns, capacity=self.row_group_size)
+
+                    if not batch:
+                        break
+
+            writer.close()
+            os.replace(tmp_path, path)
+        except BaseException:
+            writer.close()
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        return rows
+
+    def _write_row_group(self, writer: pq.ParquetWriter, builder: FrameBuilder, schema: pa.Schema) -> None:
+        frame = normalize_ids(builder.to_frame())
+        table = pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+        writer.write_table(table, row_group_size=self.row_group_size)
+
+
+async def _run(args: argparse.Namespace) -> Dict[str, Any]:
+    data_service = DataService(mongo_uri=settings.MONGODB_URI, redis_url=settings.REDIS_URL)
+    try:
+        exporter = BulkTrainingExport(
+            data_service,
+            output_dir=args.output_dir,
+            concurrency=args.concurrency
+        )
+        return await exporter.export(args.tenant_id or None, args.data_type, args.since)
+    finally:
+        data_service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export tenant training data as a Parquet batch")
+    parser.add_argument('--tenant-id', action='append', help='Tenant to export (repeatable, default: all)')
+    parser.add_argument('--data-type', action='append', choices=sorted(EXPORT_COLUMNS), help='Default: demand and cost')
+    parser.add_argument('--since', help='Only export data from this ISO date onwards')
+    parser.add_argument('--output-dir', default=settings.BULK_EXPORT_PATH)
+    parser.add_argument('--concurrency', type=int, default=settings.BULK_EXPORT_CONCURRENCY)
+    args = parser.parse_args()
+    args.data_type = args.data_type or ['demand', 'cost']
+
+    logging.basicConfig(level=logging.INFO)
+    manifest = asyncio.run(_run(args))
+    print(json.dumps({k: v for k, v in manifest.items() if k != 'tenants'}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import logging
+from typing import Any, Dict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Inputs a caller can supply per item; seasonality_factor is derived from the horizon step
+COST_INPUT_FEATURES = ('quantity', 'vendor_rating', 'market_price')
+WEEKS_PER_YEAR = 52
+
+
+def seasonality_factors(horizon: int) -> np.ndarray:
+    """seasonality_factor of each forecast week, as the cost model sees it"""
+    return np.sin(2 * np.pi * np.arange(horizon) / WEEKS_PER_YEAR)
+
+
+def cost_feature_matrix(
+    model_data: Dict[str, Any],
+    inputs: Dict[str, np.ndarray],
+    items: int,
+    horizon: int
+) -> np.ndarray:
+    """
+    Build the unscaled feature matrix of N items over H forecast weeks
+
+    Row i * H + h holds item i at week h, with columns in the model's
+    feature_columns order. Each input is either one value per item, which
+    is repeated across the horizon, or an [N, H] array. Missing values are
+    0, as in training (fillna(0)); features the caller did not supply at
+    all are set to their training mean, which the scaler maps to 0.
+
+    Returns:
+        float64 array of shape [N * H, len(feature_columns)]
+    """
+    scaler = model_data['scaler']
+    matrix = np.empty((items * horizon, len(model_data['feature_columns'])), dtype=np.float64)
+
+    for j, column in enumerate(model_data['feature_columns']):
+        if column == 'seasonality_factor':
+            matrix[:, j] = np.tile(seasonality_factors(horizon), items)
+            continue
+
+        values = inputs.get(column)
+        if values is None:
+            matrix[:, j] = scaler.mean_[j]
+            continue
+
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim == 1:
+            values = np.repeat(values, horizon)
+        elif values.shape != (items, horizon):
+            raise ValueError(f"{column} must have one value per item or shape ({items}, {horizon})")
+        matrix[:, j] = np.nan_to_num(values.ravel(), nan=0.0)
+
+    return matrix
+
+
+def predict_costs(
+    model_data: Dict[str, Any],
+    inputs: Dict[str, np.ndarray],
+    items: int,
+    horizon: int
+) -> np.ndarray:
+    """
+    Predict unit costs of N items over H weeks with one booster call
+
+    Args:
+        model_data: Cost model as saved by fit_cost_model
+        inputs: Per-item feature values, see cost_feature_matrix
+        items: N
+        horizon: H
+
+    Returns:
+        [N, H] array of non-negative predicted costs
+    """
+    feature_matrix = cost_feature_matrix(model_data, inputs, items, horizon)
+    scaled = model_data['scaler'].transform(feature_matrix)
+    predictions = model_data['model'].predict(scaled)
+    return np.maximum(predictions, 0).reshape(items, horizon)
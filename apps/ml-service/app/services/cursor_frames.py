@@ -0,0 +1,181 @@
+import logging
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class Column(NamedTuple):
+    """An output column read from a (possibly nested) document field"""
+    name: str
+    path: str   # Dotted path into the document, e.g. '_id.date'
+    dtype: str  # NumPy dtype of the column buffer
+
+
+def _make_extractor(columns: Sequence[Column]) -> Callable[[Dict[str, Any]], Tuple[Any, ...]]:
+    """
+    Build a function that pulls every column out of one document
+
+    Tolerates missing fields and non-dict parents; used when the fast
+    itemgetter path hits a document that does not have every field.
+    """
+    paths = [column.path.split('.') for column in columns]
+
+    def extract(doc: Dict[str, Any]) -> Tuple[Any, ...]:
+        values = []
+        for parts in paths:
+            value = doc
+            for part in parts:
+                value = value.get(part) if isinstance(value, dict) else None
+            values.append(value)
+        return tuple(values)
+
+    return extract
+
+
+def _make_batch_reader(columns: Sequence[Column]) -> Callable[[List[Dict[str, Any]]], Dict[str, Sequence[Any]]]:
+    """
+    Build a function that splits a batch into per-column value sequences
+
+    Columns are grouped by their top-level field. Each nested group (e.g.
+    every '_id.*' column) is resolved with one C-level itemgetter pass over
+    the batch, so `_id` is flattened in a single pass rather than once per
+    sub-field. Paths deeper than two levels use the tolerant extractor.
+    """
+    groups: Dict[str, List[Tuple[str, Optional[str]]]] = {}
+    for column in columns:
+        parts = column.path.split('.')
+        if len(parts) > 2:
+            groups = {}
+            break
+        groups.setdefault(parts[0], []).append((column.name, parts[1] if len(parts) == 2 else None))
+
+    extract = _make_extractor(columns)
+    names = [column.name for column in columns]
+
+    def read_slow(batch: List[Dict[str, Any]]) -> Dict[str, Sequence[Any]]:
+        return dict(zip(names, zip(*map(extract, batch))))
+
+    if not groups:
+        return read_slow
+
+    def read(batch: List[Dict[str, Any]]) -> Dict[str, Sequence[Any]]:
+        try:
+            result: Dict[str, Sequence[Any]] = {}
+            for top, members in groups.items():
+                values = list(map(itemgetter(top), batch))
+                nested = [(name, sub) for name, sub in members if sub is not None]
+
+                for name, sub in members:
+                    if sub is None:
+                        result[name] = values
+
+                if len(nested) == 1:
+                    name, sub = nested[0]
+                    result[name] = list(map(itemgetter(sub), values))
+                elif nested:
+                    getter = itemgetter(*[sub for _, sub in nested])
+                    result.update(zip([name for name, _ in nested], zip(*map(getter, values))))
+            return result
+        except (KeyError, TypeError):
+            return read_slow(batch)
+
+    return read
+
+
+class FrameBuilder:
+    """
+    Streams cursor batches into preallocated NumPy column buffers
+
+    Each batch is split into per-column value sequences with C-level
+    itemgetter passes and slice-assigned into the typed buffers, so no
+    intermediate list of dicts or object DataFrame is ever built. Buffers
+    grow geometrically when a result outgrows the initial capacity.
+    """
+
+    def __init__(self, columns: Sequence[Column], capacity: int = 1024):
+        self.columns = list(columns)
+        self._read = _make_batch_reader(self.columns)
+        self._size = 0
+        self._buffers: Dict[str, np.ndarray] = {
+            column.name: np.empty(max(capacity, 1), dtype=column.dtype)
+            for column in self.columns
+        }
+
+    def __len__(self) -> int:
+        return self._size
+
+    def extend(self, batch: List[Dict[str, Any]]) -> None:
+        """Append one cursor batch to the column buffers"""
+        if not batch:
+            return
+
+        count = len(batch)
+        self._reserve(self._size + count)
+
+        columns = self._read(batch)
+        start, end = self._size, self._size + count
+
+        for column in self.columns:
+            values = columns[column.name]
+            buffer = self._buffers[column.name]
+            if buffer.dtype == object:
+                # fromiter stores the values as-is; slice assignment would probe
+                # every element (e.g. ObjectIds) for the sequence protocol
+                buffer[start:end] = np.fromiter(values, dtype=object, count=count)
+                continue
+            try:
+                buffer[start:end] = values
+            except (TypeError, ValueError):
+                # A value that does not fit the declared dtype (e.g. an array in a
+                # numeric field); keep the column but fall back to objects
+                logger.debug(f"Column {column.name} does not fit {column.dtype}, storing as object")
+                buffer = buffer.astype(object)
+                buffer[start:end] = np.fromiter(values, dtype=object, count=count)
+                self._buffers[column.name] = buffer
+
+        self._size = end
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the filled buffers as a DataFrame without copying them again"""
+        return pd.DataFrame(
+            {name: buffer[:self._size] for name, buffer in self._buffers.items()},
+            copy=False
+        )
+
+    def _reserve(self, required: int) -> None:
+        capacity = len(next(iter(self._buffers.values())))
+        if required <= capacity:
+            return
+
+        while capacity < required:
+            capacity *= 2
+
+        for name, buffer in self._buffers.items():
+            grown = np.empty(capacity, dtype=buffer.dtype)
+            grown[:self._size] = buffer[:self._size]
+            self._buffers[name] = grown
+
+
+async def cursor_to_frame(cursor, columns: Sequence[Column], batch_size: int, builder: FrameBuilder = None) -> FrameBuilder:
+    """
+    Drain an async cursor into a FrameBuilder batch by batch
+
+    Each batch is awaited separately so long reads yield the event loop
+    between getMore round trips. Pass an existing builder to append several
+    cursors into the same frame.
+    """
+    if builder is None:
+        builder = FrameBuilder(columns, capacity=batch_size)
+
+    while True:
+        batch = await cursor.to_list(length=batch_size)
+        if not batch:
+            break
+        builder.extend(batch)
+
+    return builder
+
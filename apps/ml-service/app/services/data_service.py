@@ -1,26 +1,185 @@
+import asyncio
+import time
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
-from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, IndexModel
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+from bson import ObjectId
 from redis import Redis
 import joblib
 import os
 from pathlib import Path
 
+from app.core.config import settings
+from app.services.demand_rollup import DemandRollupService, ROLLUP_COLLECTION, day_start
+from app.services.series_store import SeriesStore
+from app.services.cursor_frames import Column, FrameBuilder, cursor_to_frame
+from app.services.training_cache import TrainingDataCache, normalize_ids
+from app.services.forecast_cache import ForecastCache
+from app.services.quality_profiles import QualityProfileStore, changed_series
+from app.services.model_versions import ModelVersionRegistry
+from app.services.model_registry import ModelRegistry
+from app.services.model_cache import model_cache
+from app.services.model_artifacts import ARTIFACT_SUFFIX, save_artifact, load_artifact, delete_artifact
+
 logger = logging.getLogger(__name__)
 
+# Equality fields lead so single item/vendor reads become index range scans on createdAt
+INVENTORY_MOVEMENT_INDEXES = [
+    IndexModel([('itemId', ASCENDING), ('createdAt', ASCENDING)], name='itemId_createdAt'),
+    IndexModel([('vendorId', ASCENDING), ('itemId', ASCENDING), ('createdAt', ASCENDING)], name='vendorId_itemId_createdAt'),
+    IndexModel([('createdAt', ASCENDING)], name='createdAt'),
+]
+
+PURCHASE_ORDER_INDEXES = [
+    IndexModel([('vendorId', ASCENDING), ('createdAt', ASCENDING)], name='vendorId_createdAt'),
+    IndexModel([('items.itemId', ASCENDING), ('createdAt', ASCENDING)], name='itemsItemId_createdAt'),
+    IndexModel([('createdAt', ASCENDING)], name='createdAt'),
+]
+
+# Column layouts for converting aggregation results; '_id' sub-fields are flattened on read
+DEMAND_COLUMNS = [
+    Column('date', '_id.date', 'datetime64[ns]'),
+    Column('itemId', '_id.itemId', 'object'),
+    Column('itemName', '_id.itemName', 'object'),
+    Column('category', '_id.category', 'object'),
+    Column('quantity', 'quantity', 'float64'),
+]
+
+DEMAND_ROW_COLUMNS = [
+    Column('date', 'date', 'datetime64[ns]'),
+    Column('itemId', 'itemId', 'object'),
+    Column('vendorId', 'vendorId', 'object'),
+    Column('quantity', 'quantity', 'float64'),
+]
+
+COST_COLUMNS = [
+    Column('date', 'date', 'datetime64[ns]'),
+    Column('vendorId', 'vendorId', 'object'),
+    Column('vendorName', 'vendorName', 'object'),
+    Column('vendorRating', 'vendorRating', 'float64'),
+    Column('itemId', 'itemId', 'object'),
+    Column('itemName', 'itemName', 'object'),
+    Column('itemCategory', 'itemCategory', 'object'),
+    Column('quantity', 'quantity', 'float64'),
+    Column('unitPrice', 'unitPrice', 'float64'),
+    Column('totalAmount', 'totalAmount', 'float64'),
+]
+
+VENDOR_PERFORMANCE_COLUMNS = [
+    Column('vendorId', 'vendorId', 'object'),
+    Column('vendorName', 'vendorName', 'object'),
+    Column('vendorCategory', 'vendorCategory', 'object'),
+    Column('totalOrders', 'totalOrders', 'float64'),
+    Column('totalAmount', 'totalAmount', 'float64'),
+    Column('avgDeliveryTime', 'avgDeliveryTime', 'float64'),
+    Column('onTimeDeliveries', 'onTimeDeliveries', 'float64'),
+    Column('onTimeRate', 'onTimeRate', 'float64'),
+]
+
+READ_PREFERENCES = {
+    'primary': Primary,
+    'primaryPreferred': PrimaryPreferred,
+    'secondary': Secondary,
+    'secondaryPreferred': SecondaryPreferred,
+    'nearest': Nearest,
+}
+
+def read_preference(mode: str, max_staleness: int = -1) -> Any:
+    """Build a read preference from its mode name, e.g. 'secondaryPreferred'"""
+    if mode not in READ_PREFERENCES:
+        raise ValueError(f"Unknown read preference: {mode}")
+    if mode == 'primary':
+        return Primary()
+    return READ_PREFERENCES[mode](max_staleness=max_staleness)
+
+def _load_saved_model(model_path: str) -> Any:
+    """Load a model saved by save_model, either as an artifact or a legacy pickle"""
+    if Path(model_path).is_dir():
+        return load_artifact(model_path)[0]
+    return joblib.load(model_path)
+
+
 class DataService:
     """Service for handling data operations in the ML service"""
     
-    def __init__(self, mongo_uri: str, redis_url: str):
-        self.mongo_client = MongoClient(mongo_uri)
-        self.redis_client = Redis.from_url(redis_url)
+    def __init__(
+        self,
+        mongo_uri: Optional[str] = None,
+        redis_url: Optional[str] = None,
+        mongo_client: Optional[AsyncIOMotorClient] = None,
+        redis_client: Optional[Redis] = None
+    ):
+        # Clients passed in are shared (see app.core.database) and closed by their owner
+        self._owns_clients = mongo_client is None
+        self.mongo_client = mongo_client or AsyncIOMotorClient(mongo_uri)
+        self.redis_client = redis_client or Redis.from_url(redis_url)
+        self.batch_size = settings.MONGODB_BATCH_SIZE
+        self._indexed_tenants = set()
+        self.demand_rollup = DemandRollupService(self.mongo_client)
+        self.series_store = None
+        if settings.SERIES_CACHE_ENABLED:
+            self.series_store = SeriesStore(
+                settings.SERIES_CACHE_PATH,
+                ttl_seconds=settings.SERIES_CACHE_TTL_SECONDS,
+                max_segments=settings.SERIES_CACHE_MAX_SEGMENTS
+            )
+        # Read preference and maxTimeMS per query class; see _tenant_db
+        self.read_preferences = {
+            'training': read_preference(settings.MONGODB_TRAINING_READ_PREFERENCE, settings.MONGODB_MAX_STALENESS_SECONDS),
+            'summary': read_preference(settings.MONGODB_SUMMARY_READ_PREFERENCE, settings.MONGODB_MAX_STALENESS_SECONDS),
+        }
+        self.max_time_ms = {
+            'training': settings.MONGODB_TRAINING_MAX_TIME_MS,
+            'summary': settings.MONGODB_SUMMARY_MAX_TIME_MS,
+        }
+        # Both caches below are invalidated by data version bumps, which only
+        # the demand rollup loop makes; without it they would ignore new data
+        versioned = settings.DEMAND_ROLLUP_REFRESH_SECONDS > 0
+        self.training_cache = None
+        if settings.TRAINING_CACHE_ENABLED and versioned:
+            self.training_cache = TrainingDataCache(
+                self.redis_client,
+                ttl_seconds=settings.TRAINING_CACHE_TTL_SECONDS,
+                max_bytes=settings.TRAINING_CACHE_MAX_BYTES,
+                settle_seconds=0 if settings.MONGODB_TRAINING_READ_PREFERENCE == 'primary' else settings.MONGODB_MAX_STALENESS_SECONDS
+            )
+        self.forecast_cache = None
+        if settings.FORECAST_CACHE_ENABLED and versioned:
+            self.forecast_cache = ForecastCache(
+                self.redis_client,
+                ttl_seconds=settings.FORECAST_RETENTION_DAYS * 24 * 3600,
+                l1_max_entries=settings.FORECAST_CACHE_L1_MAX_ENTRIES,
+                max_bytes=settings.FORECAST_CACHE_MAX_BYTES
+            )
+        # Maintained as the series cache seals days, so they need it
+        self.quality_profiles = None
+        if settings.QUALITY_PROFILES_ENABLED and self.series_store is not None:
+            self.quality_profiles = QualityProfileStore(self.redis_client)
+        self.model_versions = ModelVersionRegistry(self.redis_client)
+        self.model_registry = ModelRegistry(
+            self.mongo_client[settings.MONGODB_DB],
+            cache_ttl_seconds=settings.MODEL_REGISTRY_CACHE_TTL_SECONDS
+        )
+        # (tenant_id, exact) -> (monotonic time fetched, summary)
+        self._summary_cache: Dict[Tuple[str, bool], Tuple[float, Dict[str, Any]]] = {}
+        self._summary_refreshes: Dict[Tuple[str, bool], asyncio.Task] = {}
         self.models_dir = Path("models")
         self.models_dir.mkdir(exist_ok=True)
         
-    def get_training_data(self, tenant_id: str, data_type: str, start_date: Optional[str] = None, end_date: Optional[str] = None) -> pd.DataFrame:
+    async def get_training_data(
+        self,
+        tenant_id: str,
+        data_type: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        item_id: Optional[str] = None,
+        vendor_id: Optional[str] = None
+    ) -> pd.DataFrame:
         """
         Retrieve training data for ML models
         
@@ -29,46 +188,173 @@ class DataService:
             data_type: Type of data ('demand', 'cost', 'vendor_performance')
             start_date: Start date for data range (ISO format)
             end_date: End date for data range (ISO format)
+            item_id: Restrict the data to a single item (optional)
+            vendor_id: Restrict the data to a single vendor (optional)
             
         Returns:
-            DataFrame with training data
+            DataFrame with training data. Demand data filtered to an item is a
+            single daily series with 'date' and 'quantity' columns; unfiltered
+            demand data is pivoted with one column per item.
         """
         try:
-            db = self.mongo_client[f"tenant_{tenant_id}"]
-            
-            if data_type == 'demand':
-                return self._get_demand_data(db, start_date, end_date)
-            elif data_type == 'cost':
-                return self._get_cost_data(db, start_date, end_date)
-            elif data_type == 'vendor_performance':
-                return self._get_vendor_performance_data(db, start_date, end_date)
-            else:
-                raise ValueError(f"Unsupported data type: {data_type}")
+            if self.training_cache is None:
+                return await self._load_training_data(
+                    tenant_id, data_type, start_date, end_date, item_id, vendor_id
+                )
+            
+            filters = {
+                'start_date': start_date,
+                'end_date': end_date,
+                'item_id': item_id,
+                'vendor_id': vendor_id
+            }
+            version, cached = await asyncio.to_thread(self.training_cache.get, tenant_id, data_type, filters)
+            if cached is not None:
+                return cached
+            
+            read_at = time.time()
+            data = await self._load_training_data(
+                tenant_id, data_type, start_date, end_date, item_id, vendor_id, version
+            )
+            if version is not None:
+                await asyncio.to_thread(
+                    self.training_cache.set, tenant_id, data_type, filters, data, version, read_at
+                )
+            
+            return data
                 
         except Exception as e:
             logger.error(f"Error retrieving training data: {str(e)}")
             raise
     
-    def _get_demand_data(self, db, start_date: Optional[str], end_date: Optional[str]) -> pd.DataFrame:
-        """Get demand forecasting training data"""
-        # Query inventory movements and sales data
-        pipeline = []
+    async def _load_training_data(
+        self,
+        tenant_id: str,
+        data_type: str,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        item_id: Optional[str],
+        vendor_id: Optional[str],
+        data_version: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Read training data with ids normalized to strings
         
-        if start_date and end_date:
-            pipeline.append({
-                '$match': {
-                    'createdAt': {
-                        '$gte': datetime.fromisoformat(start_date),
-                        '$lte': datetime.fromisoformat(end_date)
-                    }
-                }
-            })
+        Every path normalizes here, whether or not the training cache is
+        enabled, so callers get the same frame shape either way.
+        """
+        data = await self._read_training_data(
+            tenant_id, data_type, start_date, end_date, item_id, vendor_id, data_version
+        )
+        return normalize_ids(data)
+    
+    async def _read_training_data(
+        self,
+        tenant_id: str,
+        data_type: str,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        item_id: Optional[str],
+        vendor_id: Optional[str],
+        data_version: Optional[int] = None
+    ) -> pd.DataFrame:
+        """Read training data from the series cache or Mongo"""
+        db = self._tenant_db(tenant_id, 'training')
         
-        pipeline.extend([
+        if data_type == 'demand':
+            if self.series_store is not None:
+                cached = await self._get_cached_demand_data(
+                    tenant_id, start_date, end_date, item_id, vendor_id, data_version
+                )
+                if cached is not None:
+                    return cached
+            
+            await self._ensure_tenant_indexes(tenant_id)
+            watermark = await self.demand_rollup.get_watermark(tenant_id)
+            return await self._get_demand_data(db, start_date, end_date, item_id, vendor_id, watermark)
+        elif data_type == 'cost':
+            await self._ensure_tenant_indexes(tenant_id)
+            return await self._get_cost_data(db, start_date, end_date, item_id, vendor_id)
+        elif data_type == 'vendor_performance':
+            return await self._get_vendor_performance_data(db, start_date, end_date, vendor_id)
+        else:
+            raise ValueError(f"Unsupported data type: {data_type}")
+    
+    def _tenant_db(self, tenant_id: str, query_class: Optional[str] = None):
+        """
+        Return a tenant database routed for a class of queries
+        
+        'training' and 'summary' reads use their configured read preference,
+        so heavy aggregations can run on secondaries instead of competing
+        with the backend's writes on the primary. Without a query class the
+        client default (primary) is kept, for writes and for reads whose
+        results are persisted incrementally.
+        """
+        name = f"tenant_{tenant_id}"
+        if query_class is None:
+            return self.mongo_client[name]
+        return self.mongo_client.get_database(name, read_preference=self.read_preferences[query_class])
+    
+    def _build_match(
+        self,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        filters: Optional[Dict[str, Optional[str]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Build a leading $match stage from id filters and a createdAt range
+        
+        Equality filters come first so the query planner can use the
+        (id, createdAt) compound indexes as a range scan.
+        """
+        match = self._build_id_match(filters)
+        
+        date_range = {}
+        if start_date:
+            date_range['$gte'] = datetime.fromisoformat(start_date)
+        if end_date:
+            date_range['$lte'] = datetime.fromisoformat(end_date)
+        if date_range:
+            match['createdAt'] = date_range
+        
+        return match
+    
+    def _build_id_match(self, filters: Optional[Dict[str, Optional[str]]]) -> Dict[str, Any]:
+        """Build equality conditions for the given id filters"""
+        match: Dict[str, Any] = {}
+        
+        for field, value in (filters or {}).items():
+            if value is None:
+                continue
+            # Ids may be stored either as ObjectIds or as plain strings
+            if ObjectId.is_valid(value):
+                match[field] = {'$in': [ObjectId(value), value]}
+            else:
+                match[field] = value
+        
+        return match
+    
+    def _demand_stages(self, date_expr: Any) -> List[Dict[str, Any]]:
+        """
+        Group to one row per item/day, then attach item details
+        
+        Grouping happens before the join so the items lookup runs once per
+        item/day rather than once per movement.
+        """
+        return [
+            {
+                '$group': {
+                    '_id': {
+                        'date': date_expr,
+                        'itemId': '$itemId'
+                    },
+                    'quantity': {'$sum': '$quantity'}
+                }
+            },
             {
                 '$lookup': {
                     'from': 'items',
-                    'localField': 'itemId',
+                    'localField': '_id.itemId',
                     'foreignField': '_id',
                     'as': 'item'
                 }
@@ -77,36 +363,87 @@ class DataService:
                 '$unwind': '$item'
             },
             {
-                '$group': {
+                '$project': {
                     '_id': {
-                        'date': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$createdAt'}},
-                        'itemId': '$itemId',
+                        'date': '$_id.date',
+                        'itemId': '$_id.itemId',
                         'itemName': '$item.name',
                         'category': '$item.category'
                     },
-                    'quantity': {'$sum': '$quantity'},
-                    'type': {'$first': '$type'}
+                    'quantity': 1
                 }
             },
             {
                 '$sort': {'_id.date': 1}
             }
-        ])
+        ]
+    
+    async def _get_demand_data(
+        self,
+        db,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        item_id: Optional[str] = None,
+        vendor_id: Optional[str] = None,
+        watermark: Optional[datetime] = None
+    ) -> pd.DataFrame:
+        """
+        Get demand forecasting training data
         
-        cursor = db.inventory_movements.aggregate(pipeline)
-        data = list(cursor)
+        When the tenant has a demand_daily rollup, whole days before the
+        watermark day are read from it and only the tail from the start of
+        that day onwards is aggregated from raw inventory movements.
+        """
+        filters = {'itemId': item_id, 'vendorId': vendor_id}
+        raw_date = {'$dateToString': {'format': '%Y-%m-%d', 'date': '$createdAt'}}
         
-        if not data:
+        if watermark is None:
+            pipeline = []
+            match = self._build_match(start_date, end_date, filters)
+            if match:
+                pipeline.append({'$match': match})
+            pipeline.extend(self._demand_stages(raw_date))
+            
+            frame = await self._aggregate_frame(db.inventory_movements, pipeline, DEMAND_COLUMNS)
+        else:
+            cutoff = day_start(watermark)
+            
+            rollup_match = self._build_id_match(filters)
+            date_range = {'$lt': cutoff.strftime('%Y-%m-%d')}
+            if start_date:
+                date_range['$gte'] = datetime.fromisoformat(start_date).strftime('%Y-%m-%d')
+            if end_date:
+                date_range['$lte'] = datetime.fromisoformat(end_date).strftime('%Y-%m-%d')
+            rollup_match['date'] = date_range
+            
+            frame = await self._aggregate_frame(
+                db[ROLLUP_COLLECTION],
+                [{'$match': rollup_match}] + self._demand_stages('$date'),
+                DEMAND_COLUMNS
+            )
+            
+            if end_date is None or datetime.fromisoformat(end_date) >= cutoff:
+                tail_start = cutoff
+                if start_date:
+                    tail_start = max(cutoff, datetime.fromisoformat(start_date))
+                tail_match = self._build_match(tail_start.isoformat(), end_date, filters)
+                await self._aggregate_frame(
+                    db.inventory_movements,
+                    [{'$match': tail_match}] + self._demand_stages(raw_date),
+                    DEMAND_COLUMNS,
+                    builder=frame
+                )
+        
+        if not len(frame):
             return pd.DataFrame()
         
-        # Convert to DataFrame
-        df = pd.DataFrame(data)
-        df['date'] = pd.to_datetime(df['_id'].apply(lambda x: x['date']))
-        df['itemId'] = df['_id'].apply(lambda x: x['itemId'])
-        df['itemName'] = df['_id'].apply(lambda x: x['name'])
-        df['category'] = df['_id'].apply(lambda x: x['category'])
-        df['quantity'] = df['quantity']
-        df['type'] = df['type']
+        return self._shape_demand(frame.to_frame(), item_id)
+    
+    def _shape_demand(self, df: pd.DataFrame, item_id: Optional[str]) -> pd.DataFrame:
+        """Turn long date/itemId/quantity rows into the training data layout"""
+        if item_id is not None:
+            # Single series requested - return daily totals for that item
+            return df.groupby('date', as_index=False)['quantity'].sum()
         
         # Pivot to get daily demand by item
         df_pivot = df.pivot_table(
@@ -119,20 +456,261 @@ class DataService:
         
         return df_pivot.reset_index()
     
-    def _get_cost_data(self, db, start_date: Optional[str], end_date: Optional[str]) -> pd.DataFrame:
-        """Get cost prediction training data"""
-        # Query purchase orders and vendor data
+    async def _get_cached_demand_data(
+        self,
+        tenant_id: str,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        item_id: Optional[str],
+        vendor_id: Optional[str],
+        data_version: Optional[int] = None
+    ) -> Optional[pd.DataFrame]:
+        """
+        Serve demand data from the local columnar cache
+        
+        A fresh cache is read straight from the memory-mapped segments with no
+        Mongo round trip. A stale one (past its TTL or built at an older data
+        version) is first topped up with the days since its last refresh,
+        re-reading its last few sealed days (see _refresh_series_cache).
+        Returns None when the cache cannot be used, so the caller falls back
+        to Mongo.
+        """
+        try:
+            if not self.series_store.is_fresh(tenant_id, data_version):
+                if not await self._refresh_series_cache(tenant_id, data_version):
+                    return None
+            
+            rows = self.series_store.read(tenant_id, start_date, end_date, item_id, vendor_id)
+            if rows.empty:
+                return pd.DataFrame()
+            
+            return self._shape_demand(rows, item_id)
+            
+        except Exception as e:
+            logger.warning(f"Series cache unavailable for tenant {tenant_id}, reading from Mongo: {str(e)}")
+            return None
+    
+    async def _refresh_series_cache(self, tenant_id: str, data_version: Optional[int] = None) -> bool:
+        """
+        Append days not yet in the series cache
+        
+        The last SERIES_CACHE_RESEAL_DAYS sealed days are read again and
+        replaced, so backdated movements and edits the rollup folded into
+        those days show up; older changes need the tenant's cache to be
+        invalidated. Reads go to the primary, so rows a lagging secondary
+        had not applied yet are not sealed.
+        
+        Returns:
+            True if the cache holds usable data afterwards
+        """
+        with self.series_store.writer_lock(tenant_id) as acquired:
+            if not acquired:
+                # Another worker is refreshing; use what is already there
+                return self.series_store.read_manifest(tenant_id) is not None
+            
+            if self.series_store.is_fresh(tenant_id, data_version):
+                return True
+            
+            manifest = self.series_store.read_manifest(tenant_id)
+            since = manifest['through'] if manifest else None
+            read_since = None
+            if since is not None:
+                read_since = (
+                    datetime.fromisoformat(since) - timedelta(days=max(settings.SERIES_CACHE_RESEAL_DAYS, 0))
+                ).strftime('%Y-%m-%d')
+            watermark = await self.demand_rollup.get_watermark(tenant_id)
+            rows = await self._get_demand_rows(self._tenant_db(tenant_id), read_since, watermark)
+            
+            resealed = None
+            if self.quality_profiles is not None and read_since is not None:
+                # Cached totals of the re-read days, to find series whose folded days changed
+                resealed = await asyncio.to_thread(self.series_store.read, tenant_id, read_since)
+            
+            through = datetime.utcnow().strftime('%Y-%m-%d')
+            await asyncio.to_thread(
+                self.series_store.append, tenant_id, rows, through, data_version, read_since
+            )
+            
+            if self.quality_profiles is not None:
+                await self._update_quality_profiles(tenant_id, rows, since, through, read_since, resealed)
+            
+        logger.info(f"Series cache refreshed for tenant {tenant_id} from {read_since or 'beginning'}")
+        return True
+    
+    async def _update_quality_profiles(
+        self,
+        tenant_id: str,
+        rows: pd.DataFrame,
+        since: Optional[str],
+        through: str,
+        read_since: Optional[str] = None,
+        resealed: Optional[pd.DataFrame] = None
+    ) -> None:
+        """
+        Fold the days the series cache just sealed into the quality profiles
+        
+        Series whose re-read days (read_since up to since) no longer match
+        the totals the cache held for them before the append, in `resealed`,
+        are refolded from their cached history, so late movements reach the
+        profiles too. Profiles that are missing or out of step with the cache (e.g. after
+        the cache was rebuilt) are rebuilt from the cached history. Called
+        while holding the series cache writer lock; failures only leave the
+        profiles stale.
+        """
+        try:
+            if since is not None and await asyncio.to_thread(
+                self.quality_profiles.advance, tenant_id, rows, since, through
+            ):
+                if resealed is not None and read_since is not None and read_since < since:
+                    # Compare cache reads on both sides so id types match
+                    current = await asyncio.to_thread(self.series_store.read, tenant_id, read_since)
+                    changed = changed_series(resealed, current, read_since, since)
+                    if changed:
+                        history = await asyncio.to_thread(self.series_store.read, tenant_id)
+                        await asyncio.to_thread(self.quality_profiles.refold, tenant_id, history, changed, through)
+                        logger.info(f"Quality profiles refolded for tenant {tenant_id}: {len(changed)} series")
+                return
+            
+            history = rows if since is None else await asyncio.to_thread(self.series_store.read, tenant_id)
+            series = await asyncio.to_thread(self.quality_profiles.rebuild, tenant_id, history, through)
+            logger.info(f"Quality profiles rebuilt for tenant {tenant_id}: {series} series")
+            
+        except Exception as e:
+            logger.warning(f"Could not update quality profiles for tenant {tenant_id}: {str(e)}")
+    
+    async def _get_demand_rows(
+        self,
+        db,
+        since: Optional[str],
+        watermark: Optional[datetime]
+    ) -> pd.DataFrame:
+        """
+        Get daily item/vendor demand rows from a day onwards, without item details
+        
+        Uses the demand_daily rollup for days before the watermark day when
+        one exists and aggregates raw movements for the rest.
+        """
+        frame = FrameBuilder(DEMAND_ROW_COLUMNS, capacity=self.batch_size)
+        for collection, pipeline in self._demand_row_pipelines(db, since, watermark):
+            await self._aggregate_frame(collection, pipeline, DEMAND_ROW_COLUMNS, builder=frame)
+        
+        return frame.to_frame()
+    
+    def _demand_row_pipelines(
+        self,
+        db,
+        since: Optional[str],
+        watermark: Optional[datetime]
+    ) -> List[Tuple[Any, List[Dict[str, Any]]]]:
+        """
+        Build the (collection, pipeline) reads behind _get_demand_rows
+        
+        Their results share the DEMAND_ROW_COLUMNS layout and together cover
+        every day from since onwards exactly once.
+        """
+        reads = []
+        raw_since = since
+        
+        if watermark is not None:
+            cutoff = day_start(watermark).strftime('%Y-%m-%d')
+            date_range = {'$lt': cutoff}
+            if since:
+                date_range['$gte'] = since
+            reads.append((db[ROLLUP_COLLECTION], [
+                {'$match': {'date': date_range}},
+                {'$project': {'_id': 0, 'date': 1, 'itemId': 1, 'vendorId': 1, 'quantity': 1}}
+            ]))
+            raw_since = max(since, cutoff) if since else cutoff
+        
         pipeline = []
+        if raw_since:
+            pipeline.append({'$match': {'createdAt': {'$gte': datetime.fromisoformat(raw_since)}}})
+        pipeline.extend([
+            {
+                '$group': {
+                    '_id': {
+                        'date': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$createdAt'}},
+                        'itemId': '$itemId',
+                        'vendorId': '$vendorId'
+                    },
+                    'quantity': {'$sum': '$quantity'}
+                }
+            },
+            {
+                '$project': {
+                    '_id': 0,
+                    'date': '$_id.date',
+                    'itemId': '$_id.itemId',
+                    'vendorId': '$_id.vendorId',
+                    'quantity': 1
+                }
+            }
+        ])
+        reads.append((db.inventory_movements, pipeline))
         
-        if start_date and end_date:
-            pipeline.append({
-                '$match': {
-                    'createdAt': {
-                        '$gte': datetime.fromisoformat(start_date),
-                        '$lte': datetime.fromisoformat(end_date)
-                    }
+        return reads
+    
+    async def _get_cost_data(
+        self,
+        db,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        item_id: Optional[str] = None,
+        vendor_id: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Get cost prediction training data, one row per purchase order line
+        
+        The pipeline narrows and flattens before it joins: the indexed $match
+        selects orders, $project drops everything but the fields the cost
+        model uses, and line items are unwound before the vendor and item
+        lookups, which then run once per surviving line and return only the
+        looked-up fields. Results stream batch by batch into column buffers
+        with allowDiskUse, so the PO history is never held in Python as
+        documents.
+        """
+        pipeline = self._cost_pipeline(start_date, end_date, item_id, vendor_id)
+        frame = await self._aggregate_frame(db.purchase_orders, pipeline, COST_COLUMNS, allow_disk_use=True)
+        
+        if not len(frame):
+            return pd.DataFrame()
+        
+        return frame.to_frame()
+    
+    def _cost_pipeline(
+        self,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        item_id: Optional[str] = None,
+        vendor_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Build the purchase_orders pipeline behind _get_cost_data (COST_COLUMNS layout)"""
+        pipeline = []
+        
+        match = self._build_match(start_date, end_date, {'vendorId': vendor_id, 'items.itemId': item_id})
+        if match:
+            pipeline.append({'$match': match})
+        
+        pipeline.extend([
+            {
+                '$project': {
+                    '_id': 0,
+                    'createdAt': 1,
+                    'vendorId': 1,
+                    'totalAmount': 1,
+                    'items.itemId': 1,
+                    'items.quantity': 1,
+                    'items.unitPrice': 1
                 }
-            })
+            },
+            {
+                '$unwind': '$items'
+            }
+        ])
+        
+        if item_id is not None:
+            # The leading $match keeps whole orders; keep only the requested lines
+            pipeline.append({'$match': self._build_id_match({'items.itemId': item_id})})
         
         pipeline.extend([
             {
@@ -140,6 +718,7 @@ class DataService:
                     'from': 'vendors',
                     'localField': 'vendorId',
                     'foreignField': '_id',
+                    'pipeline': [{'$project': {'_id': 0, 'name': 1, 'rating': 1}}],
                     'as': 'vendor'
                 }
             },
@@ -151,6 +730,7 @@ class DataService:
                     'from': 'items',
                     'localField': 'items.itemId',
                     'foreignField': '_id',
+                    'pipeline': [{'$project': {'_id': 0, 'name': 1, 'category': 1}}],
                     'as': 'item'
                 }
             },
@@ -163,7 +743,7 @@ class DataService:
                     'vendorId': '$vendorId',
                     'vendorName': '$vendor.name',
                     'vendorRating': '$vendor.rating',
-                    'itemId': '$item._id',
+                    'itemId': '$items.itemId',
                     'itemName': '$item.name',
                     'itemCategory': '$item.category',
                     'quantity': '$items.quantity',
@@ -173,32 +753,22 @@ class DataService:
             }
         ])
         
-        cursor = db.purchase_orders.aggregate(pipeline)
-        data = list(cursor)
-        
-        if not data:
-            return pd.DataFrame()
-        
-        # Convert to DataFrame
-        df = pd.DataFrame(data)
-        df['date'] = pd.to_datetime(df['date'])
-        
-        return df
+        return pipeline
     
-    def _get_vendor_performance_data(self, db, start_date: Optional[str], end_date: Optional[str]) -> pd.DataFrame:
+    async def _get_vendor_performance_data(
+        self,
+        db,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        vendor_id: Optional[str] = None
+    ) -> pd.DataFrame:
         """Get vendor performance analysis data"""
         # Query vendor performance metrics
         pipeline = []
         
-        if start_date and end_date:
-            pipeline.append({
-                '$match': {
-                    'createdAt': {
-                        '$gte': datetime.fromisoformat(start_date),
-                        '$lte': datetime.fromisoformat(end_date)
-                    }
-                }
-            })
+        match = self._build_match(start_date, end_date, {'vendorId': vendor_id})
+        if match:
+            pipeline.append({'$match': match})
         
         pipeline.extend([
             {
@@ -247,13 +817,73 @@ class DataService:
             }
         ])
         
-        cursor = db.purchase_orders.aggregate(pipeline)
-        data = list(cursor)
+        frame = await self._aggregate_frame(db.purchase_orders, pipeline, VENDOR_PERFORMANCE_COLUMNS)
         
-        if not data:
+        if not len(frame):
             return pd.DataFrame()
         
-        return pd.DataFrame(data)
+        return frame.to_frame()
+    
+    async def ensure_indexes(self, tenant_ids: Optional[List[str]] = None) -> int:
+        """
+        Create the compound indexes used by training reads
+        
+        Args:
+            tenant_ids: Tenants to index (optional, defaults to every tenant_* database)
+            
+        Returns:
+            Number of tenant databases indexed
+        """
+        try:
+            await self.model_registry.ensure_indexes()
+            
+            if tenant_ids is None:
+                db_names = await self.mongo_client.list_database_names()
+                tenant_ids = [name[len('tenant_'):] for name in db_names if name.startswith('tenant_')]
+            
+            for tenant_id in tenant_ids:
+                await self._ensure_tenant_indexes(tenant_id)
+            
+            logger.info(f"Ensured training indexes for {len(tenant_ids)} tenants")
+            return len(tenant_ids)
+            
+        except Exception as e:
+            logger.error(f"Error ensuring indexes: {str(e)}")
+            return 0
+    
+    async def _ensure_tenant_indexes(self, tenant_id: str) -> None:
+        """Create training indexes for a tenant once per process"""
+        if tenant_id in self._indexed_tenants:
+            return
+        
+        db = self._tenant_db(tenant_id)
+        # create_indexes is a no-op for indexes that already exist
+        await db.inventory_movements.create_indexes(INVENTORY_MOVEMENT_INDEXES)
+        await db.purchase_orders.create_indexes(PURCHASE_ORDER_INDEXES)
+        self._indexed_tenants.add(tenant_id)
+    
+    async def _aggregate_frame(
+        self,
+        collection,
+        pipeline: List[Dict[str, Any]],
+        columns: List[Column],
+        builder: Optional[FrameBuilder] = None,
+        allow_disk_use: bool = False
+    ) -> FrameBuilder:
+        """
+        Run a training aggregation and stream its cursor into column buffers
+        
+        Batches are awaited one at a time so a long-running aggregation yields
+        the event loop between getMore round trips, and each batch is copied
+        straight into typed NumPy buffers instead of being kept as dicts.
+        """
+        cursor = collection.aggregate(
+            pipeline,
+            batchSize=self.batch_size,
+            allowDiskUse=allow_disk_use,
+            maxTimeMS=self.max_time_ms['training']
+        )
+        return await cursor_to_frame(cursor, columns, self.batch_size, builder)
     
     def save_model(self, model: Any, model_name: str, tenant_id: str, version: str = None) -> str:
         """
@@ -272,13 +902,9 @@ class DataService:
             if version is None:
                 version = datetime.now().strftime("%Y%m%d_%H%M%S")
             
-            model_filename = f"{model_name}_{tenant_id}_{version}.joblib"
+            model_filename = f"{model_name}_{tenant_id}_{version}{ARTIFACT_SUFFIX}"
             model_path = self.models_dir / model_filename
             
-            # Save model
-            joblib.dump(model, model_path)
-            
-            # Save metadata
             metadata = {
                 'model_name': model_name,
                 'tenant_id': tenant_id,
@@ -287,12 +913,11 @@ class DataService:
                 'model_path': str(model_path)
             }
             
-            # Store metadata in Redis
-            self.redis_client.hset(
-                f"model_metadata:{tenant_id}:{model_name}",
-                version,
-                str(metadata)
-            )
+            # Save model as an artifact directory with a metadata sidecar
+            save_artifact(model_path, model, metadata)
+            
+            # Register metadata in Redis
+            self.model_versions.register(tenant_id, model_name, version, metadata)
             
             logger.info(f"Model saved: {model_path}")
             return str(model_path)
@@ -315,31 +940,23 @@ class DataService:
         """
         try:
             if version is None:
-                # Get latest version
-                versions = self.redis_client.hkeys(f"model_metadata:{tenant_id}:{model_name}")
-                if not versions:
+                # Latest version is the head of the creation-time index
+                metadata = self.model_versions.latest(tenant_id, model_name)
+                if not metadata:
                     raise FileNotFoundError(f"No models found for {model_name} and tenant {tenant_id}")
-                
-                version = max(versions, key=lambda v: v.decode())
-            
-            # Get model metadata
-            metadata_str = self.redis_client.hget(
-                f"model_metadata:{tenant_id}:{model_name}",
-                version
-            )
-            
-            if not metadata_str:
-                raise FileNotFoundError(f"Model version {version} not found")
+            else:
+                metadata = self.model_versions.get(tenant_id, model_name, version)
+                if not metadata:
+                    raise FileNotFoundError(f"Model version {version} not found")
             
-            metadata = eval(metadata_str.decode())
             model_path = metadata['model_path']
             
             if not os.path.exists(model_path):
                 raise FileNotFoundError(f"Model file not found: {model_path}")
             
-            # Load model
-            model = joblib.load(model_path)
-            logger.info(f"Model loaded: {model_path}")
+            # Deserialized once per process and artifact version
+            model = model_cache.get(model_path, version=metadata['version'], loader=_load_saved_model)
+            logger.debug(f"Model loaded: {model_path}")
             
             return model
             
@@ -359,23 +976,8 @@ class DataService:
             List of model versions with metadata
         """
         try:
-            versions = self.redis_client.hkeys(f"model_metadata:{tenant_id}:{model_name}")
-            model_versions = []
-            
-            for version in versions:
-                metadata_str = self.redis_client.hget(
-                    f"model_metadata:{tenant_id}:{model_name}",
-                    version
-                )
-                
-                if metadata_str:
-                    metadata = eval(metadata_str.decode())
-                    model_versions.append(metadata)
-            
-            # Sort by creation date
-            model_versions.sort(key=lambda x: x['created_at'], reverse=True)
-            
-            return model_versions
+            # Newest first, straight from the creation-time index
+            return self.model_versions.list(tenant_id, model_name)
             
         except Exception as e:
             logger.error(f"Error getting model versions: {str(e)}")
@@ -394,24 +996,18 @@ class DataService:
             True if successful, False otherwise
         """
         try:
-            # Get model metadata
-            metadata_str = self.redis_client.hget(
-                f"model_metadata:{tenant_id}:{model_name}",
-                version
-            )
-            
-            if not metadata_str:
+            metadata = self.model_versions.get(tenant_id, model_name, version)
+            if not metadata:
                 return False
             
-            metadata = eval(metadata_str.decode())
             model_path = metadata['model_path']
             
-            # Delete model file
-            if os.path.exists(model_path):
-                os.remove(model_path)
+            # Delete model artifact
+            delete_artifact(model_path)
+            model_cache.invalidate(model_path)
             
             # Remove metadata from Redis
-            self.redis_client.hdel(f"model_metadata:{tenant_id}:{model_name}", version)
+            self.model_versions.remove(tenant_id, model_name, [version])
             
             logger.info(f"Model deleted: {model_path}")
             return True
@@ -434,28 +1030,19 @@ class DataService:
         try:
             deleted_count = 0
             
-            # Get all models for tenant
-            model_keys = self.redis_client.keys(f"model_metadata:{tenant_id}:*")
+            # SCAN for the tenant's models and pipeline the lookups of versions past the limit
+            expired = self.model_versions.expired(tenant_id, max_versions)
             
-            for key in model_keys:
-                model_name = key.decode().split(':')[-1]
-                versions = self.redis_client.hkeys(key)
+            for model_name, versions in expired.items():
+                removed = []
+                for metadata in versions:
+                    model_path = metadata['model_path']
+                    delete_artifact(model_path)
+                    model_cache.invalidate(model_path)
+                    removed.append(metadata['version'])
                 
-                if len(versions) > max_versions:
-                    # Sort versions by creation date
-                    version_metadata = []
-                    for version in versions:
-                        metadata_str = self.redis_client.hget(key, version)
-                        if metadata_str:
-                            metadata = eval(metadata_str.decode())
-                            version_metadata.append((version, metadata))
-                    
-                    version_metadata.sort(key=lambda x: x[1]['created_at'], reverse=True)
-                    
-                    # Delete old versions
-                    for version, _ in version_metadata[max_versions:]:
-                        if self.delete_model(model_name, tenant_id, version.decode()):
-                            deleted_count += 1
+                self.model_versions.remove(tenant_id, model_name, removed)
+                deleted_count += len(removed)
             
             logger.info(f"Cleaned up {deleted_count} old model versions")
             return deleted_count
@@ -464,43 +1051,127 @@ class DataService:
             logger.error(f"Error cleaning up old models: {str(e)}")
             return 0
     
-    def get_data_summary(self, tenant_id: str) -> Dict[str, Any]:
+    async def get_data_summary(self, tenant_id: str, exact: bool = False) -> Dict[str, Any]:
         """
         Get summary statistics for training data
         
+        Summaries are cached per tenant for DATA_SUMMARY_TTL_SECONDS. Past
+        the TTL the cached summary is still served, for up to
+        DATA_SUMMARY_MAX_STALE_SECONDS, while a single background task
+        refreshes it, so polling dashboards never wait on Mongo after the
+        first request.
+        
         Args:
             tenant_id: Tenant identifier
+            exact: Count documents exactly instead of using collection
+                metadata (optional, slower on large collections)
             
         Returns:
             Dictionary with data summary statistics
         """
         try:
-            db = self.mongo_client[f"tenant_{tenant_id}"]
-            
-            summary = {
-                'inventory_movements': db.inventory_movements.count_documents({}),
-                'purchase_orders': db.purchase_orders.count_documents({}),
-                'vendors': db.vendors.count_documents({}),
-                'items': db.items.count_documents({}),
-                'data_range': {}
-            }
+            key = (tenant_id, exact)
+            cached = self._summary_cache.get(key)
             
-            # Get data range
-            if summary['inventory_movements'] > 0:
-                first_movement = db.inventory_movements.find_one({}, sort=[('createdAt', 1)])
-                last_movement = db.inventory_movements.find_one({}, sort=[('createdAt', -1)])
-                
-                if first_movement and last_movement:
-                    summary['data_range']['start'] = first_movement['createdAt'].isoformat()
-                    summary['data_range']['end'] = last_movement['createdAt'].isoformat()
+            if cached is not None:
+                age = time.monotonic() - cached[0]
+                if age < settings.DATA_SUMMARY_TTL_SECONDS:
+                    return cached[1]
+                if age < settings.DATA_SUMMARY_MAX_STALE_SECONDS:
+                    self._schedule_summary_refresh(key)
+                    return cached[1]
             
-            return summary
+            # Nothing usable cached; share one in-flight computation per tenant
+            summary = await asyncio.shield(self._schedule_summary_refresh(key))
+            return summary or {}
             
         except Exception as e:
             logger.error(f"Error getting data summary: {str(e)}")
             return {}
     
+    def _schedule_summary_refresh(self, key: Tuple[str, bool]) -> asyncio.Task:
+        """Start a summary refresh for a tenant unless one is already running"""
+        task = self._summary_refreshes.get(key)
+        if task is None:
+            task = asyncio.create_task(self._refresh_data_summary(*key))
+            self._summary_refreshes[key] = task
+        return task
+    
+    async def _refresh_data_summary(self, tenant_id: str, exact: bool) -> Optional[Dict[str, Any]]:
+        try:
+            summary = await self._compute_data_summary(tenant_id, exact)
+            self._summary_cache[(tenant_id, exact)] = (time.monotonic(), summary)
+            return summary
+        except Exception as e:
+            # Also runs detached from any request, so failures are logged here
+            logger.warning(f"Data summary refresh failed for tenant {tenant_id}: {str(e)}")
+            return None
+        finally:
+            self._summary_refreshes.pop((tenant_id, exact), None)
+    
+    async def _compute_data_summary(self, tenant_id: str, exact: bool) -> Dict[str, Any]:
+        """
+        Read counts and the movement date range with concurrent cheap queries
+        
+        The default mode reads counts from collection metadata
+        (estimated_document_count) and the date range from the two ends of
+        the createdAt index. Exact mode counts every collection and gets the
+        movement count and date range from one $group pass.
+        """
+        db = self._tenant_db(tenant_id, 'summary')
+        max_time_ms = self.max_time_ms['summary']
+        
+        if exact:
+            movements, purchase_orders, vendors, items = await asyncio.gather(
+                db.inventory_movements.aggregate([
+                    {
+                        '$group': {
+                            '_id': None,
+                            'count': {'$sum': 1},
+                            'start': {'$min': '$createdAt'},
+                            'end': {'$max': '$createdAt'}
+                        }
+                    }
+                ], maxTimeMS=max_time_ms).to_list(length=1),
+                db.purchase_orders.count_documents({}, maxTimeMS=max_time_ms),
+                db.vendors.count_documents({}, maxTimeMS=max_time_ms),
+                db.items.count_documents({}, maxTimeMS=max_time_ms)
+            )
+            stats = movements[0] if movements else {}
+            movement_count = stats.get('count', 0)
+            first_created, last_created = stats.get('start'), stats.get('end')
+        else:
+            projection = {'_id': 0, 'createdAt': 1}
+            movement_count, purchase_orders, vendors, items, first, last = await asyncio.gather(
+                db.inventory_movements.estimated_document_count(maxTimeMS=max_time_ms),
+                db.purchase_orders.estimated_document_count(maxTimeMS=max_time_ms),
+                db.vendors.estimated_document_count(maxTimeMS=max_time_ms),
+                db.items.estimated_document_count(maxTimeMS=max_time_ms),
+                db.inventory_movements.find_one({}, projection, sort=[('createdAt', 1)], max_time_ms=max_time_ms),
+                db.inventory_movements.find_one({}, projection, sort=[('createdAt', -1)], max_time_ms=max_time_ms)
+            )
+            first_created = first.get('createdAt') if first else None
+            last_created = last.get('createdAt') if last else None
+        
+        summary = {
+            'inventory_movements': movement_count,
+            'purchase_orders': purchase_orders,
+            'vendors': vendors,
+            'items': items,
+            'data_range': {},
+            'exact': exact,
+            'generated_at': datetime.utcnow().isoformat()
+        }
+        
+        if first_created and last_created:
+            summary['data_range']['start'] = first_created.isoformat()
+            summary['data_range']['end'] = last_created.isoformat()
+        
+        return summary
+    
     def close(self):
-        """Close database connections"""
+        """Close database connections this service created"""
+        if not self._owns_clients:
+            return
         self.mongo_client.close()
         self.redis_client.close()
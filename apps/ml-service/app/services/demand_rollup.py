@@ -0,0 +1,286 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure, PyMongoError
+from redis import Redis
+
+from app.core.config import settings
+from app.services.training_cache import TrainingDataCache
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_COLLECTION = 'demand_daily'
+STATE_COLLECTION = 'rollup_state'
+
+DEMAND_DAILY_INDEXES = [
+    IndexModel([('itemId', ASCENDING), ('date', ASCENDING)], name='itemId_date'),
+    IndexModel([('vendorId', ASCENDING), ('itemId', ASCENDING), ('date', ASCENDING)], name='vendorId_itemId_date'),
+    IndexModel([('date', ASCENDING)], name='date'),
+]
+
+
+def day_start(value: datetime) -> datetime:
+    """Truncate a timestamp to midnight of the same day"""
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class DemandRollupService:
+    """
+    Maintains the per-tenant demand_daily rollup of inventory movements
+
+    Each rollup document holds the total quantity for one item/vendor/day.
+    Refreshes re-aggregate whole days from the start of the watermark day and
+    $merge them with replace semantics, so running a refresh twice (or
+    concurrently from a change stream and the periodic loop) converges on the
+    same result instead of double counting.
+
+    When given a training data cache, the tenant's data version is bumped
+    whenever a refresh folds in new movements or new purchase orders show
+    up, invalidating cached training data.
+    """
+
+    def __init__(self, mongo_client: AsyncIOMotorClient, training_cache: Optional[TrainingDataCache] = None):
+        self.mongo_client = mongo_client
+        self.training_cache = training_cache
+
+    async def get_watermark(self, tenant_id: str) -> Optional[datetime]:
+        """Return the createdAt of the newest movement folded into the rollup"""
+        db = self.mongo_client[f"tenant_{tenant_id}"]
+        state = await db[STATE_COLLECTION].find_one({'_id': ROLLUP_COLLECTION})
+        return state.get('watermark') if state else None
+
+    async def refresh(self, tenant_id: str, since: Optional[datetime] = None) -> Optional[datetime]:
+        """
+        Fold movements past the watermark into the rollup
+
+        Args:
+            tenant_id: Tenant identifier
+            since: Also rebuild days from this timestamp (optional, used for
+                backdated movements seen on the change stream)
+
+        Returns:
+            The new watermark, or None if the tenant has no movements
+        """
+        try:
+            db = self.mongo_client[f"tenant_{tenant_id}"]
+            watermark = await self.get_watermark(tenant_id)
+
+            # Without a watermark nothing has been rolled up yet, so backfill everything
+            window_start = None
+            if watermark is not None:
+                window_start = day_start(min(watermark, since) if since else watermark)
+
+            # Read the new high-water mark before aggregating; anything that lands
+            # after it is picked up by the next refresh of the same day
+            newest = await db.inventory_movements.find_one(
+                {}, sort=[('createdAt', DESCENDING)], projection={'createdAt': 1}
+            )
+            if not newest:
+                return None
+
+            if watermark is not None and since is None and newest['createdAt'] <= watermark:
+                return watermark
+
+            await db[ROLLUP_COLLECTION].create_indexes(DEMAND_DAILY_INDEXES)
+
+            pipeline: List[Dict[str, Any]] = []
+            if window_start is not None:
+                pipeline.append({'$match': {'createdAt': {'$gte': window_start}}})
+
+            pipeline.extend([
+                {
+                    '$group': {
+                        '_id': {
+                            'itemId': '$itemId',
+                            'vendorId': '$vendorId',
+                            'date': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$createdAt'}}
+                        },
+                        'quantity': {'$sum': '$quantity'},
+                        'movements': {'$sum': 1},
+                        'type': {'$first': '$type'}
+                    }
+                },
+                {
+                    '$project': {
+                        'itemId': '$_id.itemId',
+                        'vendorId': '$_id.vendorId',
+                        'date': '$_id.date',
+                        'quantity': 1,
+                        'movements': 1,
+                        'type': 1,
+                        'updatedAt': '$$NOW'
+                    }
+                },
+                {
+                    '$merge': {
+                        'into': ROLLUP_COLLECTION,
+                        'on': '_id',
+                        'whenMatched': 'replace',
+                        'whenNotMatched': 'insert'
+                    }
+                }
+            ])
+
+            # $merge writes server-side; draining the cursor just waits for completion
+            await db.inventory_movements.aggregate(pipeline, allowDiskUse=True).to_list(length=None)
+
+            new_watermark = max(newest['createdAt'], watermark) if watermark else newest['createdAt']
+            await db[STATE_COLLECTION].update_one(
+                {'_id': ROLLUP_COLLECTION},
+                {'$set': {'watermark': new_watermark, 'refreshedAt': datetime.utcnow()}},
+                upsert=True
+            )
+            await self._bump_data_version(tenant_id)
+
+            logger.info(f"Demand rollup refreshed for tenant {tenant_id} from {window_start or 'beginning'}")
+            return new_watermark
+
+        except Exception as e:
+            logger.error(f"Error refreshing demand rollup for tenant {tenant_id}: {str(e)}")
+            raise
+
+    async def check_purchase_orders(self, tenant_id: str) -> bool:
+        """
+        Bump the data version if purchase orders were created since the last check
+
+        Only inserts are detected (by the newest _id); writers that update
+        orders in place can INCR the data version key themselves, and cached
+        entries expire with their TTL otherwise.
+
+        Returns:
+            True if new purchase orders were found
+        """
+        if self.training_cache is None:
+            return False
+
+        db = self.mongo_client[f"tenant_{tenant_id}"]
+        newest = await db.purchase_orders.find_one({}, sort=[('_id', DESCENDING)], projection={'_id': 1})
+        if not newest:
+            return False
+
+        state = await db[STATE_COLLECTION].find_one({'_id': 'purchase_orders'})
+        if state and state.get('newest') == newest['_id']:
+            return False
+
+        await db[STATE_COLLECTION].update_one(
+            {'_id': 'purchase_orders'},
+            {'$set': {'newest': newest['_id'], 'checkedAt': datetime.utcnow()}},
+            upsert=True
+        )
+        await self._bump_data_version(tenant_id)
+        return True
+
+    async def _bump_data_version(self, tenant_id: str) -> None:
+        if self.training_cache is not None:
+            await asyncio.to_thread(self.training_cache.bump_version, tenant_id)
+
+    async def watch(self, tenant_id: str, debounce_ms: int = 2000) -> bool:
+        """
+        Keep the rollup current from the inventory_movements change stream
+
+        Changes are batched: a refresh runs once the stream has been idle for
+        debounce_ms. Backdated movements rebuild the rollup from their day.
+
+        Returns:
+            False if change streams are not available (e.g. a standalone
+            mongod), so the caller can fall back to periodic refreshes
+        """
+        db = self.mongo_client[f"tenant_{tenant_id}"]
+        pipeline = [{'$match': {'operationType': {'$in': ['insert', 'update', 'replace']}}}]
+
+        try:
+            async with db.inventory_movements.watch(
+                pipeline, full_document='updateLookup', max_await_time_ms=debounce_ms
+            ) as stream:
+                await self.refresh(tenant_id)
+                pending = False
+                since: Optional[datetime] = None
+
+                while stream.alive:
+                    change = await stream.try_next()
+                    if change is None:
+                        if pending:
+                            await self.refresh(tenant_id, since=since)
+                            pending, since = False, None
+                        continue
+
+                    pending = True
+                    created_at = (change.get('fullDocument') or {}).get('createdAt')
+                    if isinstance(created_at, datetime) and (since is None or created_at < since):
+                        since = created_at
+
+        except OperationFailure as e:
+            logger.info(f"Change streams unavailable for tenant {tenant_id}: {str(e)}")
+            return False
+        except PyMongoError as e:
+            logger.warning(f"Change stream for tenant {tenant_id} stopped: {str(e)}")
+            return False
+
+        return True
+
+    async def run_forever(self, interval_seconds: int, use_change_streams: bool = False) -> None:
+        """
+        Keep the rollup fresh for every tenant database
+
+        Tenants with a live change stream watcher are skipped by the periodic
+        pass; tenants whose watcher could not start fall back to polling.
+        """
+        watchers: Dict[str, asyncio.Task] = {}
+
+        try:
+            while True:
+                try:
+                    db_names = await self.mongo_client.list_database_names()
+                    for name in db_names:
+                        if not name.startswith('tenant_'):
+                            continue
+                        tenant_id = name[len('tenant_'):]
+
+                        try:
+                            await self.check_purchase_orders(tenant_id)
+                        except PyMongoError:
+                            pass
+
+                        if use_change_streams and tenant_id not in watchers:
+                            watchers[tenant_id] = asyncio.create_task(self.watch(tenant_id))
+                            continue
+                        if tenant_id in watchers and not watchers[tenant_id].done():
+                            continue
+
+                        try:
+                            await self.refresh(tenant_id)
+                        except PyMongoError:
+                            continue
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"Demand rollup refresh cycle failed: {str(e)}")
+
+                await asyncio.sleep(interval_seconds)
+        finally:
+            for task in watchers.values():
+                task.cancel()
+
+
+async def run_demand_rollup(mongo_client: AsyncIOMotorClient, redis_client: Redis) -> None:
+    """Background task that keeps demand_daily rollups fresh using the shared clients"""
+    if settings.DEMAND_ROLLUP_REFRESH_SECONDS <= 0:
+        return
+
+    # Bumps the data version the training data and forecast caches are keyed by
+    training_cache = None
+    if settings.TRAINING_CACHE_ENABLED or settings.FORECAST_CACHE_ENABLED:
+        training_cache = TrainingDataCache(
+            redis_client,
+            ttl_seconds=settings.TRAINING_CACHE_TTL_SECONDS,
+            max_bytes=settings.TRAINING_CACHE_MAX_BYTES
+        )
+
+    await DemandRollupService(mongo_client, training_cache).run_forever(
+        settings.DEMAND_ROLLUP_REFRESH_SECONDS,
+        use_change_streams=settings.DEMAND_ROLLUP_CHANGE_STREAMS
+    )
@@ -5,12 +5,19 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple, Union
 import asyncio
 import json
+import time
 from enum import Enum
 
 from app.core.config import settings
+from app.core.database import get_data_service
 from app.services.data_service import DataService
 from app.services.aws_forecast_service import AWSForecastService
-from app.services.ml_service import MLService  # Existing Prophet/XGBoost service
+from app.services.backtest import run_backtest, summarize
+from app.services.fast_forecasters import forecast_many
+from app.services.ml_service import MLService, fit_stats  # Existing Prophet/XGBoost service
+from app.services.model_cache import model_cache
+from app.services.quality_profiles import EMPTY_QUALITY, SeriesProfile
+from app.services.training_executor import training_executor
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +26,10 @@ class ForecastMethod(Enum):
     PROPHET = "prophet"
     XGBOOST = "xgboost"
     HYBRID = "hybrid"
+    FAST = "fast"  # Vectorized exponential smoothing / Croston, for sparse series
+
+# Methods backtested when the caller does not choose
+DEFAULT_BACKTEST_METHODS = ('auto', 'naive', 'seasonal_naive', 'moving_average')
 
 class EnhancedMLService:
     """
@@ -26,13 +37,10 @@ class EnhancedMLService:
     based on data quality, requirements, and availability.
     """
     
-    def __init__(self):
-        self.data_service = DataService(
-            mongo_uri=settings.MONGODB_URI,
-            redis_url=settings.REDIS_URL
-        )
-        self.aws_forecast_service = AWSForecastService()
-        self.local_ml_service = MLService()  # Fallback to existing service
+    def __init__(self, data_service: Optional[DataService] = None):
+        self.data_service = data_service or get_data_service()
+        self.aws_forecast_service = AWSForecastService(self.data_service)
+        self.local_ml_service = MLService(self.data_service)  # Fallback to existing service
         
         # Configuration
         self.min_data_points_aws = settings.FORECAST_MIN_DATA_POINTS
@@ -48,12 +56,30 @@ class EnhancedMLService:
         vendor_id: str,
         forecast_horizon: int = 30,
         method: Optional[ForecastMethod] = None,
-        force_method: bool = False
+        force_method: bool = False,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """
         Generate forecast using the most appropriate method
+        
+        Successful forecasts are cached per requested method and horizon
+        until the tenant's data or the series' model changes (see
+        ForecastCache), so repeated requests skip method selection,
+        training and prediction.
         """
         try:
+            forecast_cache = self.data_service.forecast_cache if use_cache else None
+            cache_key = None
+            if forecast_cache is not None:
+                requested = f"{method.value if method else 'auto'}{'!' if force_method else ''}"
+                cache_key, cached = await asyncio.to_thread(
+                    forecast_cache.lookup, tenant_id, item_id, vendor_id, requested, forecast_horizon
+                )
+                if cached is not None:
+                    return dict(cached)
+            
+            started = time.perf_counter()
+            
             # Determine the best forecasting method
             chosen_method = await self._select_forecast_method(
                 tenant_id, item_id, vendor_id, method, force_method
@@ -63,17 +89,27 @@ class EnhancedMLService:
             
             # Generate forecast based on chosen method
             if chosen_method == ForecastMethod.AWS_FORECAST:
-                return await self._generate_aws_forecast(
+                result = await self._generate_aws_forecast(
                     tenant_id, item_id, vendor_id, forecast_horizon
                 )
             elif chosen_method == ForecastMethod.HYBRID:
-                return await self._generate_hybrid_forecast(
+                result = await self._generate_hybrid_forecast(
+                    tenant_id, item_id, vendor_id, forecast_horizon
+                )
+            elif chosen_method == ForecastMethod.FAST:
+                result = await self._generate_fast_forecast(
                     tenant_id, item_id, vendor_id, forecast_horizon
                 )
             else:
-                return await self._generate_local_forecast(
+                result = await self._generate_local_forecast(
                     tenant_id, item_id, vendor_id, forecast_horizon, chosen_method
                 )
+            
+            if cache_key is not None and result.get('status') == 'success':
+                await asyncio.to_thread(
+                    forecast_cache.store, cache_key, result, time.perf_counter() - started
+                )
+            return result
                 
         except Exception as e:
             logger.error(f"Forecast generation failed: {e}")
@@ -121,6 +157,11 @@ class EnhancedMLService:
             self._is_aws_forecast_available()):
             return ForecastMethod.AWS_FORECAST
         
+        elif (data_quality['data_points'] < settings.FAST_FORECAST_MIN_PROPHET_POINTS or
+              data_quality['demand_interval'] > settings.FAST_FORECAST_INTERMITTENT_ADI):
+            # Too sparse or intermittent for Prophet
+            return ForecastMethod.FAST
+        
         elif (data_quality['data_points'] >= 30 and
               data_quality['seasonality_strength'] > 0.5):
             return ForecastMethod.PROPHET
@@ -134,62 +175,36 @@ class EnhancedMLService:
     async def _assess_data_quality(self, tenant_id: str, item_id: str, vendor_id: str) -> Dict[str, float]:
         """
         Assess the quality of historical data for forecasting
+        
+        Normally a single read of the series' quality profile, which is kept
+        up to date incrementally as new days arrive (see quality_profiles).
+        Until the tenant's profiles are built, the history is loaded and
+        profiled here; loading it refreshes the series cache, which builds
+        them for the next call.
         """
         try:
+            profiles = self.data_service.quality_profiles
+            if profiles is not None:
+                quality = await asyncio.to_thread(profiles.get, tenant_id, item_id, vendor_id)
+                if quality is not None:
+                    return quality
+            
             # Get historical data - using 'demand' data type for forecasting
-            historical_data = self.data_service.get_training_data(
-                tenant_id, 'demand'
+            historical_data = await self.data_service.get_training_data(
+                tenant_id, 'demand', item_id=item_id, vendor_id=vendor_id
             )
             
             if historical_data.empty:
-                return {
-                    'data_points': 0,
-                    'data_completeness': 0.0,
-                    'trend_strength': 0.0,
-                    'seasonality_strength': 0.0,
-                    'noise_level': 1.0
-                }
-            
-            # Calculate metrics
-            data_points = len(historical_data)
+                return dict(EMPTY_QUALITY)
             
-            # Data completeness (ratio of non-null values)
-            data_completeness = historical_data['quantity'].notna().mean()
-            
-            # Trend strength (correlation with time)
-            time_index = np.arange(len(historical_data))
-            trend_strength = abs(np.corrcoef(historical_data['quantity'].fillna(0), time_index)[0, 1])
-            
-            # Seasonality strength (simplified using autocorrelation)
-            values = historical_data['quantity'].fillna(0).values
-            if len(values) > 14:  # Weekly seasonality
-                weekly_autocorr = np.corrcoef(values[:-7], values[7:])[0, 1] if len(values) > 7 else 0
-                seasonality_strength = abs(weekly_autocorr)
-            else:
-                seasonality_strength = 0.0
-            
-            # Noise level (coefficient of variation)
-            mean_val = values.mean()
-            std_val = values.std()
-            noise_level = std_val / mean_val if mean_val > 0 else 1.0
-            
-            return {
-                'data_points': data_points,
-                'data_completeness': data_completeness,
-                'trend_strength': trend_strength,
-                'seasonality_strength': seasonality_strength,
-                'noise_level': noise_level
-            }
+            profile = SeriesProfile.from_series(
+                historical_data['date'], historical_data['quantity'].to_numpy(dtype=np.float64)
+            )
+            return profile.metrics()
             
         except Exception as e:
             logger.error(f"Failed to assess data quality: {e}")
-            return {
-                'data_points': 0,
-                'data_completeness': 0.0,
-                'trend_strength': 0.0,
-                'seasonality_strength': 0.0,
-                'noise_level': 1.0
-            }
+            return dict(EMPTY_QUALITY)
 
     def _is_aws_forecast_available(self) -> bool:
         """
@@ -361,6 +376,113 @@ class EnhancedMLService:
             logger.error(f"Local forecast failed: {e}")
             raise
 
+    async def _generate_fast_forecast(
+        self,
+        tenant_id: str,
+        item_id: str,
+        vendor_id: str,
+        forecast_horizon: int,
+        fast_method: str = 'auto'
+    ) -> Dict[str, Any]:
+        """
+        Generate forecast using the vectorized fast forecasters
+        """
+        try:
+            history = await self.data_service.get_training_data(
+                tenant_id, 'demand', item_id=item_id, vendor_id=vendor_id
+            )
+            if history.empty:
+                raise ValueError("No demand history available")
+            
+            daily = self._daily_demand(history.rename(columns={'quantity': item_id}))
+            forecast, algorithms = forecast_many(
+                daily.to_numpy(), forecast_horizon, fast_method, settings.FAST_FORECAST_SEASON_LENGTH
+            )
+            dates = pd.date_range(daily.index[-1] + timedelta(days=1), periods=forecast_horizon, freq='D')
+            
+            return {
+                'method': ForecastMethod.FAST.value,
+                'forecast_horizon': forecast_horizon,
+                'predictions': self._format_fast_predictions(dates, forecast[:, 0]),
+                'confidence_intervals': [],
+                'metadata': {
+                    'tenant_id': tenant_id,
+                    'item_id': item_id,
+                    'vendor_id': vendor_id,
+                    'algorithm': algorithms[0],
+                    'history_days': len(daily),
+                    'generated_at': datetime.utcnow().isoformat()
+                },
+                'quality_metrics': {
+                    'data_source': 'local',
+                    'algorithm': algorithms[0]
+                },
+                'generated_at': datetime.utcnow().isoformat(),
+                'status': 'success'
+            }
+            
+        except Exception as e:
+            logger.error(f"Fast forecast failed: {e}")
+            raise
+
+    async def generate_fast_forecasts(
+        self,
+        tenant_id: str,
+        forecast_horizon: int = 30,
+        item_ids: Optional[List[str]] = None,
+        fast_method: str = 'auto'
+    ) -> Dict[str, Any]:
+        """
+        Forecast many items of a tenant at once with the fast forecasters
+        
+        Every item's daily history is stacked into one [days, items] array
+        and fitted in the same vectorized pass.
+        """
+        try:
+            history = await self.data_service.get_training_data(tenant_id, 'demand')
+            if history.empty:
+                raise ValueError("No demand history available")
+            
+            daily = self._daily_demand(history)
+            if item_ids is not None:
+                missing = [item for item in item_ids if item not in daily.columns]
+                if missing:
+                    raise ValueError(f"No demand history for items: {missing[:5]}")
+                daily = daily[item_ids]
+            
+            forecast, algorithms = forecast_many(
+                daily.to_numpy(), forecast_horizon, fast_method, settings.FAST_FORECAST_SEASON_LENGTH
+            )
+            dates = pd.date_range(daily.index[-1] + timedelta(days=1), periods=forecast_horizon, freq='D')
+            
+            return {
+                'method': ForecastMethod.FAST.value,
+                'forecast_horizon': forecast_horizon,
+                'predictions': {
+                    str(item): self._format_fast_predictions(dates, forecast[:, i])
+                    for i, item in enumerate(daily.columns)
+                },
+                'algorithms': {str(item): algorithms[i] for i, item in enumerate(daily.columns)},
+                'generated_at': datetime.utcnow().isoformat(),
+                'status': 'success'
+            }
+            
+        except Exception as e:
+            logger.error(f"Batch fast forecast failed: {e}")
+            raise
+
+    def _daily_demand(self, history: pd.DataFrame) -> pd.DataFrame:
+        """Index demand by date with one row per day, days without demand as zero"""
+        daily = history.assign(date=pd.to_datetime(history['date'])).set_index('date').sort_index()
+        days = pd.date_range(daily.index.min(), daily.index.max(), freq='D')
+        return daily.reindex(days, fill_value=0).fillna(0)
+
+    def _format_fast_predictions(self, dates: pd.DatetimeIndex, values: np.ndarray) -> List[Dict[str, Any]]:
+        return [
+            {'date': day.strftime('%Y-%m-%d'), 'predicted_demand': float(value)}
+            for day, value in zip(dates, values)
+        ]
+
     def _combine_forecasts(self, results: List[Tuple[str, Dict]], forecast_horizon: int) -> Dict[str, Any]:
         """
         Intelligently combine multiple forecast results
@@ -397,86 +519,146 @@ class EnhancedMLService:
             # Return the first available result
             return results[0][1] if results else {'status': 'error', 'error': str(e)}
 
-    async def get_forecast_accuracy(self, tenant_id: str, item_id: str, vendor_id: str, days_back: int = 30) -> Dict[str, Any]:
+    async def get_forecast_accuracy(
+        self,
+        tenant_id: str,
+        item_id: str,
+        vendor_id: str,
+        days_back: int = 30,
+        forecast_horizon: int = 7,
+        step_days: int = 1,
+        methods: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
         """
-        Evaluate forecast accuracy by comparing past predictions with actual values
+        Evaluate forecast accuracy by rolling-origin backtesting
+        
+        The item's history is loaded once and every method is forecast from
+        each cutoff of the last `days_back` days, using only the data before
+        the cutoff, then scored against what actually happened.
+        
+        Args:
+            tenant_id: Tenant identifier
+            item_id: Item identifier
+            vendor_id: Vendor identifier
+            days_back: Trailing days the test windows cover
+            forecast_horizon: Days forecast from each cutoff
+            step_days: Days between cutoffs
+            methods: Methods to evaluate (default: auto, plus the baselines)
+        
+        Returns:
+            Metrics of the most accurate method (lowest MASE, else MAE) and of
+            every evaluated method, or {'error': ...}
         """
         try:
-            # Get actual values for the past period
-            end_date = datetime.utcnow()
-            start_date = end_date - timedelta(days=days_back)
-            
-            actual_data = self.data_service.get_training_data(
-                tenant_id, 'demand', start_date.isoformat(), end_date.isoformat()
+            history = await self.data_service.get_training_data(
+                tenant_id, 'demand', item_id=item_id, vendor_id=vendor_id
             )
-            
-            if actual_data.empty:
+            if history.empty:
                 return {'error': 'No historical data available for accuracy assessment'}
             
-            # Filter to the evaluation period
-            actual_data['date'] = pd.to_datetime(actual_data['date'])
-            actual_values = actual_data[
-                (actual_data['date'] >= start_date) & 
-                (actual_data['date'] <= end_date)
-            ]
-            
-            if actual_values.empty:
-                return {'error': 'No actual data in evaluation period'}
-            
-            # Generate forecast for the same period (simulating historical prediction)
-            historical_forecast = await self.generate_forecast(
-                tenant_id, item_id, vendor_id, forecast_horizon=days_back
+            daily = self._daily_demand(history.rename(columns={'quantity': item_id}))
+            methods = methods or list(DEFAULT_BACKTEST_METHODS)
+            backtest = await asyncio.to_thread(
+                run_backtest, daily.to_numpy(), forecast_horizon, days_back, methods,
+                step_days, settings.FAST_FORECAST_SEASON_LENGTH
             )
             
-            # Calculate accuracy metrics
-            predictions = historical_forecast.get('predictions', [])
-            if not predictions:
-                return {'error': 'No predictions available for comparison'}
-            
-            # Align predictions with actual values
-            pred_df = pd.DataFrame(predictions)
-            pred_df['date'] = pd.to_datetime(pred_df['date'])
+            method_metrics = {method: summarize(errors) for method, errors in backtest['metrics'].items()}
+            best = self._most_accurate(method_metrics)
+            cutoffs = daily.index[backtest['cutoffs']]
             
-            merged = actual_values.merge(pred_df, on='date', how='inner')
-            
-            if merged.empty:
-                return {'error': 'No overlapping dates for accuracy calculation'}
-            
-            # Calculate metrics
-            actual = merged['quantity'].values
-            predicted = merged['predicted_value'].values
+            return {
+                'accuracy_metrics': method_metrics[best],
+                'method_metrics': method_metrics,
+                'evaluation_period': {
+                    'start_date': cutoffs[0].isoformat(),
+                    'end_date': daily.index[-1].isoformat(),
+                    'cutoffs': len(cutoffs),
+                    'forecast_horizon': forecast_horizon,
+                    'days_evaluated': days_back
+                },
+                'method_used': best,
+                'data_points_compared': len(cutoffs) * forecast_horizon,
+                'generated_at': datetime.utcnow().isoformat()
+            }
             
-            mae = np.mean(np.abs(actual - predicted))
-            mse = np.mean((actual - predicted) ** 2)
-            rmse = np.sqrt(mse)
-            mape = np.mean(np.abs((actual - predicted) / actual)) * 100
+        except ValueError as e:
+            return {'error': str(e)}
+        except Exception as e:
+            logger.error(f"Accuracy evaluation failed: {e}")
+            return {'error': str(e)}
+
+    async def get_forecast_accuracy_many(
+        self,
+        tenant_id: str,
+        item_ids: Optional[List[str]] = None,
+        days_back: int = 30,
+        forecast_horizon: int = 7,
+        step_days: int = 1,
+        methods: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Backtest many items of a tenant in one vectorized pass
+        
+        Every item's daily history is stacked into one [days, items] array,
+        as for generate_fast_forecasts, and each method is scored on every
+        item and cutoff at once.
+        
+        Returns:
+            Per-item metrics of every method, each item's most accurate
+            method, and each method's metrics averaged over items
+        """
+        try:
+            history = await self.data_service.get_training_data(tenant_id, 'demand')
+            if history.empty:
+                raise ValueError("No demand history available")
+            
+            daily = self._daily_demand(history)
+            if item_ids is not None:
+                missing = [item for item in item_ids if item not in daily.columns]
+                if missing:
+                    raise ValueError(f"No demand history for items: {missing[:5]}")
+                daily = daily[item_ids]
+            
+            methods = methods or list(DEFAULT_BACKTEST_METHODS)
+            backtest = await asyncio.to_thread(
+                run_backtest, daily.to_numpy(), forecast_horizon, days_back, methods,
+                step_days, settings.FAST_FORECAST_SEASON_LENGTH
+            )
             
-            # R-squared
-            ss_res = np.sum((actual - predicted) ** 2)
-            ss_tot = np.sum((actual - np.mean(actual)) ** 2)
-            r2 = 1 - (ss_res / ss_tot) if ss_tot > 0 else 0
+            items = {}
+            for i, item in enumerate(daily.columns):
+                item_metrics = {method: summarize(errors, [i]) for method, errors in backtest['metrics'].items()}
+                items[str(item)] = {
+                    'best_method': self._most_accurate(item_metrics),
+                    'method_metrics': item_metrics
+                }
+            cutoffs = daily.index[backtest['cutoffs']]
             
             return {
-                'accuracy_metrics': {
-                    'mae': float(mae),
-                    'mse': float(mse),
-                    'rmse': float(rmse),
-                    'mape': float(mape),
-                    'r2_score': float(r2)
-                },
+                'items': items,
+                'method_metrics': {method: summarize(errors) for method, errors in backtest['metrics'].items()},
                 'evaluation_period': {
-                    'start_date': start_date.isoformat(),
-                    'end_date': end_date.isoformat(),
-                    'days_evaluated': len(merged)
+                    'start_date': cutoffs[0].isoformat(),
+                    'end_date': daily.index[-1].isoformat(),
+                    'cutoffs': len(cutoffs),
+                    'forecast_horizon': forecast_horizon,
+                    'days_evaluated': days_back
                 },
-                'method_used': historical_forecast.get('method'),
-                'data_points_compared': len(merged),
                 'generated_at': datetime.utcnow().isoformat()
             }
             
         except Exception as e:
-            logger.error(f"Accuracy evaluation failed: {e}")
-            return {'error': str(e)}
+            logger.error(f"Batch accuracy evaluation failed: {e}")
+            raise
+
+    def _most_accurate(self, method_metrics: Dict[str, Dict[str, Optional[float]]]) -> str:
+        """Method with the lowest MASE, or MAE where MASE is undefined"""
+        def score(method: str) -> Tuple[float, float]:
+            metrics = method_metrics[method]
+            mase = metrics['mase'] if metrics['mase'] is not None else float('inf')
+            return mase, metrics['mae'] if metrics['mae'] is not None else float('inf')
+        return min(method_metrics, key=score)
 
     async def cleanup_resources(self, tenant_id: str = None, max_age_hours: int = 24):
         """
@@ -499,6 +681,12 @@ class EnhancedMLService:
             'current_aws_jobs': self.current_aws_jobs,
             'max_aws_jobs': self.max_concurrent_aws_jobs,
             'local_ml_service': 'active',
+            'model_cache': model_cache.stats(),
+            'model_registry': self.data_service.model_registry.stats(),
+            'training_executor': training_executor.stats(),
+            'fit_timings': fit_stats.stats(),
+            'forecast_cache': self.data_service.forecast_cache.stats() if self.data_service.forecast_cache else None,
+            'quality_profiles': self.data_service.quality_profiles.stats() if self.data_service.quality_profiles else None,
             'timestamp': datetime.utcnow().isoformat()
         }
         
@@ -0,0 +1,277 @@
+"""
+Vectorized forecasters for many short or sparse demand series
+
+Every function takes `values`, a [days, series] array of daily demand
+(missing days as zero), and returns (forecast, mse): the [horizon, series]
+forecast and each series' mean squared one-step-ahead error over days
+from `score_from`. Loops run over time only; each step updates every
+series (and every parameter candidate) at once, so thousands of items
+are fitted in milliseconds.
+"""
+import logging
+from typing import Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Smoothing parameters searched per series; every candidate is run for every
+# series in the same array operations and each series keeps its best one
+DEFAULT_ALPHAS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.8)
+TREND_ALPHAS = (0.1, 0.3, 0.6)  # Smaller grid for the trend and seasonal methods
+DEFAULT_BETAS = (0.01, 0.1)
+DEFAULT_GAMMAS = (0.05, 0.2)
+
+# Syntetos-Boylan cut-off: mean interval between demands above which a
+# series is treated as intermittent
+INTERMITTENT_ADI = 1.32
+
+METHODS = ('ses', 'holt', 'holt_winters', 'croston', 'sba', 'seasonal_naive', 'auto')
+
+
+def _grid(*axes: Sequence[float]) -> Tuple[np.ndarray, ...]:
+    """Every combination of the parameter axes, each as a [candidates, 1] column"""
+    mesh = np.meshgrid(*[np.asarray(axis, dtype=np.float64) for axis in axes], indexing='ij')
+    return tuple(m.reshape(-1, 1) for m in mesh)
+
+
+def _pick(candidates: np.ndarray, sse: np.ndarray) -> np.ndarray:
+    """Per series, the row of `candidates` ([candidates, ..., series]) with the lowest error"""
+    best = np.argmin(sse, axis=0)
+    return np.take_along_axis(candidates, best.reshape((1,) * (candidates.ndim - 1) + (-1,)), axis=0)[0]
+
+
+def simple_exponential_smoothing(
+    values: np.ndarray,
+    horizon: int,
+    alphas: Sequence[float] = DEFAULT_ALPHAS,
+    score_from: int = 1
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Simple exponential smoothing: a flat forecast at the smoothed level"""
+    days, series = values.shape
+    (alpha,) = _grid(alphas)
+
+    level = np.repeat(values[:1], len(alpha), axis=0)
+    sse = np.zeros((len(alpha), series))
+    for t in range(1, days):
+        error = values[t] - level
+        if t >= score_from:
+            sse += error ** 2
+        level += alpha * error
+
+    level = _pick(level, sse)
+    mse = sse.min(axis=0) / max(days - max(score_from, 1), 1)
+    return np.repeat(level[None, :], horizon, axis=0), mse
+
+
+def holt(
+    values: np.ndarray,
+    horizon: int,
+    alphas: Sequence[float] = TREND_ALPHAS,
+    betas: Sequence[float] = DEFAULT_BETAS,
+    damping: float = 0.98,
+    score_from: int = 2
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Holt's linear (damped) trend method"""
+    days, series = values.shape
+    if days < 2:
+        raise ValueError("Holt's method needs at least 2 days of history")
+    alpha, beta = _grid(alphas, betas)
+
+    level = np.repeat(values[1:2], len(alpha), axis=0)
+    trend = np.repeat(values[1:2] - values[:1], len(alpha), axis=0)
+    sse = np.zeros((len(alpha), series))
+    for t in range(2, days):
+        error = values[t] - (level + damping * trend)
+        if t >= score_from:
+            sse += error ** 2
+        previous = level
+        level = level + damping * trend + alpha * error
+        trend = beta * (level - previous) + (1 - beta) * damping * trend
+
+    level, trend = _pick(level, sse), _pick(trend, sse)
+    steps = np.cumsum(damping ** np.arange(1, horizon + 1))[:, None]
+    mse = sse.min(axis=0) / max(days - max(score_from, 2), 1)
+    return level + steps * trend, mse
+
+
+def holt_winters(
+    values: np.ndarray,
+    horizon: int,
+    season_length: int = 7,
+    alphas: Sequence[float] = TREND_ALPHAS,
+    betas: Sequence[float] = DEFAULT_BETAS,
+    gammas: Sequence[float] = DEFAULT_GAMMAS,
+    score_from: int = 0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Additive Holt-Winters, initialized from the first two seasons"""
+    days, series = values.shape
+    m = season_length
+    if days < 2 * m:
+        raise ValueError(f"Holt-Winters needs at least {2 * m} days of history")
+    alpha, beta, gamma = _grid(alphas, betas, gammas)
+    candidates = len(alpha)
+
+    first, second = values[:m].mean(axis=0), values[m:2 * m].mean(axis=0)
+    level = np.repeat(first[None, :], candidates, axis=0)
+    trend = np.repeat(((second - first) / m)[None, :], candidates, axis=0)
+    # [m, candidates, series], so each day's seasonal state is contiguous
+    season = np.repeat((values[:m] - first)[:, None, :], candidates, axis=1)
+
+    sse = np.zeros((candidates, series))
+    error = np.empty((candidates, series))
+    for t in range(m, days):
+        s = season[t % m]
+        np.subtract(values[t], level, out=error)
+        error -= trend
+        error -= s
+        if t >= score_from:
+            sse += error ** 2
+        previous = level
+        # Error-correction form of the additive updates
+        level = level + trend + alpha * error
+        trend += beta * (level - previous - trend)
+        s += gamma * (1 - alpha) * error
+
+    best = np.argmin(sse, axis=0)
+    columns = np.arange(series)
+    level, trend = level[best, columns], trend[best, columns]
+    season = season[:, best, columns]  # [m, series]
+
+    steps = np.arange(1, horizon + 1)
+    forecast = level + steps[:, None] * trend + season[(days + steps - 1) % m]
+    mse = sse.min(axis=0) / max(days - max(score_from, m), 1)
+    return forecast, mse
+
+
+def croston(
+    values: np.ndarray,
+    horizon: int,
+    alphas: Sequence[float] = (0.05, 0.1, 0.2, 0.3),
+    sba: bool = False,
+    score_from: int = 1
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Croston's method for intermittent demand, or its Syntetos-Boylan
+    bias correction (sba=True)
+
+    Demand sizes and the intervals between demands are smoothed separately,
+    only on days with demand; the forecast is their ratio.
+    """
+    days, series = values.shape
+    (alpha,) = _grid(alphas)
+    correction = (1 - alpha / 2) if sba else np.ones_like(alpha)
+
+    occurred = values > 0
+    counts = occurred.sum(axis=0)
+    sizes = np.where(counts > 0, values.sum(axis=0) / np.maximum(counts, 1), 0.0)
+    intervals = np.where(counts > 0, days / np.maximum(counts, 1), 1.0)
+
+    size = np.repeat(sizes[None, :], len(alpha), axis=0)
+    interval = np.repeat(intervals[None, :], len(alpha), axis=0)
+    since = np.ones((len(alpha), series))
+    sse = np.zeros((len(alpha), series))
+    for t in range(days):
+        if t >= score_from:
+            sse += (values[t] - correction * size / interval) ** 2
+        demand = occurred[t]
+        size = np.where(demand, size + alpha * (values[t] - size), size)
+        interval = np.where(demand, interval + alpha * (since - interval), interval)
+        since = np.where(demand, 1.0, since + 1)
+
+    rate = _pick(correction * size / interval, sse)
+    rate = np.where(counts > 0, rate, 0.0)
+    mse = sse.min(axis=0) / max(days - score_from, 1)
+    return np.repeat(rate[None, :], horizon, axis=0), mse
+
+
+def seasonal_naive(
+    values: np.ndarray,
+    horizon: int,
+    season_length: int = 7,
+    score_from: int = 0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Repeat the last observed season"""
+    days, _ = values.shape
+    m = min(season_length, days)
+    last = values[days - m:]
+    forecast = last[np.arange(horizon) % m]
+
+    start = max(score_from, m)
+    errors = values[start:] - values[start - m:days - m]
+    mse = (errors ** 2).mean(axis=0) if len(errors) else np.zeros(values.shape[1])
+    return forecast, mse
+
+
+def average_demand_interval(values: np.ndarray) -> np.ndarray:
+    """Mean days between demands per series (inf for series with no demand)"""
+    counts = (values > 0).sum(axis=0)
+    with np.errstate(divide='ignore'):
+        return np.where(counts > 0, values.shape[0] / np.maximum(counts, 1), np.inf)
+
+
+def forecast_many(
+    values: np.ndarray,
+    horizon: int,
+    method: str = 'auto',
+    season_length: int = 7,
+    intermittent_adi: float = INTERMITTENT_ADI
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Forecast every column of `values` ([days, series]) with one method
+
+    With method='auto', intermittent series (mean interval between demands
+    above `intermittent_adi`) use SBA; the others use whichever of SES,
+    Holt and Holt-Winters (when there are two full seasons) has the lowest
+    one-step error over the same days.
+
+    Returns:
+        (forecast [horizon, series] clipped at zero, method name per series)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        values = values[:, None]
+    days, series = values.shape
+    if days == 0:
+        raise ValueError("No history to forecast from")
+
+    if method != 'auto':
+        if method == 'ses':
+            forecast, _ = simple_exponential_smoothing(values, horizon)
+        elif method == 'holt':
+            forecast, _ = holt(values, horizon)
+        elif method == 'holt_winters':
+            forecast, _ = holt_winters(values, horizon, season_length)
+        elif method in ('croston', 'sba'):
+            forecast, _ = croston(values, horizon, sba=method == 'sba')
+        elif method == 'seasonal_naive':
+            forecast, _ = seasonal_naive(values, horizon, season_length)
+        else:
+            raise ValueError(f"Unsupported fast forecast method: {method}")
+        return np.maximum(forecast, 0.0), np.full(series, method)
+
+    intermittent = average_demand_interval(values) > intermittent_adi
+    forecast = np.zeros((horizon, series))
+    methods = np.full(series, 'sba', dtype=object)
+
+    if intermittent.any():
+        forecast[:, intermittent], _ = croston(values[:, intermittent], horizon, sba=True)
+
+    smooth = ~intermittent
+    if smooth.any():
+        dense = values[:, smooth]
+        # Score every candidate over the same days
+        score_from = 2 * season_length if days >= 2 * season_length else min(2, days)
+        candidates = [('ses', simple_exponential_smoothing(dense, horizon, score_from=score_from))]
+        if days >= 3:
+            candidates.append(('holt', holt(dense, horizon, score_from=score_from)))
+        if days >= 2 * season_length + 1:
+            candidates.append(('holt_winters', holt_winters(dense, horizon, season_length, score_from=score_from)))
+
+        errors = np.vstack([mse for _, (_, mse) in candidates])
+        best = np.argmin(errors, axis=0)
+        stacked = np.stack([f for _, (f, _) in candidates])  # [candidates, horizon, series]
+        forecast[:, smooth] = stacked[best, :, np.arange(dense.shape[1])].T
+        methods[smooth] = np.array([name for name, _ in candidates], dtype=object)[best]
+
+    return np.maximum(forecast, 0.0), methods
@@ -0,0 +1,217 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from redis import Redis
+from redis.exceptions import RedisError
+
+from app.services.training_cache import VERSION_KEY
+
+logger = logging.getLogger(__name__)
+
+MODEL_VERSION_KEY = "forecast_model_version:{tenant_id}"
+ENTRY_KEY = "forecast:{tenant_id}:{item_id}:{vendor_id}:{method}:h{horizon}:d{data_version}:m{model_version}"
+# Model version field bumped by tenant-wide models, e.g. the global demand model
+TENANT_FIELD = '*'
+
+
+class ForecastKey(NamedTuple):
+    tenant_id: str
+    item_id: Optional[str]
+    vendor_id: Optional[str]
+    method: str
+    horizon: int
+    data_version: int
+    model_version: str
+
+    def redis_key(self) -> str:
+        return ENTRY_KEY.format(**self._asdict())
+
+
+def _model_fields(item_id: Optional[str], vendor_id: Optional[str]) -> Tuple[str, ...]:
+    """Model version fields of a series: its own, then the tenant-wide one"""
+    if item_id is None and vendor_id is None:
+        return (TENANT_FIELD,)
+    return (f"{item_id}:{vendor_id}", TENANT_FIELD)
+
+
+def _model_version(values: List[Any]) -> str:
+    return '.'.join(str(int(v or 0)) for v in values)
+
+
+class _Entry(NamedTuple):
+    expires_at: float
+    result: Dict[str, Any]
+    compute_seconds: float
+
+
+class ForecastCache:
+    """
+    Two-level cache of generated forecasts
+
+    Entries are keyed by tenant, item, vendor, requested method, horizon,
+    the tenant's data version (data_version:<tenant_id>, bumped by the
+    demand rollup when new movements land) and the series' model version
+    (bumped whenever a model of the series, or a tenant-wide model, is
+    registered). A bump of either orphans the old entries without
+    scanning for them; they expire with their TTL.
+
+    Both versions are read from Redis on every lookup (one pipelined round
+    trip), so the in-process L1 never serves a forecast Redis would
+    consider stale; it only saves fetching and decoding the payload.
+    Without Redis nothing is cached.
+    """
+
+    def __init__(self, redis_client: Redis, ttl_seconds: int, l1_max_entries: int = 1024, max_bytes: int = 1024 * 1024):
+        self.redis_client = redis_client
+        self.ttl_seconds = ttl_seconds
+        self.l1_max_entries = l1_max_entries
+        self.max_bytes = max_bytes
+        self._l1: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    def lookup(
+        self,
+        tenant_id: str,
+        item_id: Optional[str],
+        vendor_id: Optional[str],
+        method: str,
+        horizon: int
+    ) -> Tuple[Optional[ForecastKey], Optional[Dict[str, Any]]]:
+        """
+        Look up a cached forecast
+
+        Returns:
+            (entry key, cached forecast or None on a miss). The key is None
+            if Redis is unavailable, in which case nothing should be cached.
+        """
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.get(VERSION_KEY.format(tenant_id=tenant_id))
+            pipe.hmget(MODEL_VERSION_KEY.format(tenant_id=tenant_id), *_model_fields(item_id, vendor_id))
+            data_version, model_versions = pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Forecast cache unavailable for tenant {tenant_id}: {str(e)}")
+            return None, None
+
+        key = ForecastKey(
+            tenant_id, item_id, vendor_id, method, horizon,
+            int(data_version or 0), _model_version(model_versions)
+        )
+        redis_key = key.redis_key()
+
+        now = time.time()
+        with self._lock:
+            entry = self._l1.get(redis_key)
+            if entry is not None and entry.expires_at > now:
+                self._l1.move_to_end(redis_key)
+                self.l1_hits += 1
+                self.saved_seconds += entry.compute_seconds
+                return key, entry.result
+
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.get(redis_key)
+            pipe.ttl(redis_key)
+            payload, ttl = pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Forecast cache read failed for tenant {tenant_id}: {str(e)}")
+            payload = None
+
+        cached = None
+        if payload is not None:
+            try:
+                cached = json.loads(payload)
+            except ValueError as e:
+                logger.warning(f"Unreadable cached forecast {redis_key}: {str(e)}")
+
+        if cached is None:
+            with self._lock:
+                self.misses += 1
+            return key, None
+
+        self._remember(redis_key, cached['result'], cached['compute_seconds'], now + (ttl if ttl > 0 else self.ttl_seconds))
+        with self._lock:
+            self.l2_hits += 1
+            self.saved_seconds += cached['compute_seconds']
+        return key, cached['result']
+
+    def store(self, key: ForecastKey, result: Dict[str, Any], compute_seconds: float) -> bool:
+        """
+        Cache a forecast under the key its lookup returned
+
+        Generating a forecast may itself register a model for the series
+        (local forecasts train one), so the model version is re-read and the
+        entry is stored under the current one. The data version is kept
+        from the lookup: data that changed while the forecast was generated
+        leaves the entry under the old version.
+
+        Returns:
+            True if the forecast was cached
+        """
+        try:
+            payload = json.dumps({'result': result, 'compute_seconds': compute_seconds}, default=str)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Forecast for {key.redis_key()} is not serializable, not caching: {str(e)}")
+            return False
+
+        if len(payload) > self.max_bytes:
+            logger.debug(f"Forecast for {key.redis_key()} is {len(payload)} bytes, not caching")
+            return False
+
+        try:
+            model_versions = self.redis_client.hmget(
+                MODEL_VERSION_KEY.format(tenant_id=key.tenant_id), *_model_fields(key.item_id, key.vendor_id)
+            )
+            redis_key = key._replace(model_version=_model_version(model_versions)).redis_key()
+            self.redis_client.set(redis_key, payload, ex=self.ttl_seconds)
+        except RedisError as e:
+            logger.warning(f"Forecast cache write failed for {key.redis_key()}: {str(e)}")
+            return False
+
+        # Keep what a Redis hit would return, e.g. dates as strings
+        self._remember(redis_key, json.loads(payload)['result'], compute_seconds, time.time() + self.ttl_seconds)
+        return True
+
+    def bump_model_version(self, tenant_id: str, item_id: Optional[str], vendor_id: Optional[str]) -> None:
+        """
+        Invalidate cached forecasts of a series after one of its models is (re)trained
+
+        Models without an item and vendor are tenant-wide and invalidate
+        every series of the tenant.
+        """
+        field = _model_fields(item_id, vendor_id)[0]
+        try:
+            self.redis_client.hincrby(MODEL_VERSION_KEY.format(tenant_id=tenant_id), field, 1)
+        except RedisError as e:
+            logger.warning(f"Could not bump forecast model version for tenant {tenant_id}: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return L1/L2 hits, misses, the hit ratio and compute seconds saved by hits"""
+        with self._lock:
+            hits = self.l1_hits + self.l2_hits
+            lookups = hits + self.misses
+            return {
+                'l1_entries': len(self._l1),
+                'l1_hits': self.l1_hits,
+                'l2_hits': self.l2_hits,
+                'misses': self.misses,
+                'hit_ratio': round(hits / lookups, 4) if lookups else 0.0,
+                'saved_compute_seconds': round(self.saved_seconds, 3)
+            }
+
+    def _remember(self, key: str, result: Dict[str, Any], compute_seconds: float, expires_at: float) -> None:
+        if self.l1_max_entries <= 0:
+            return
+        with self._lock:
+            self._l1[key] = _Entry(expires_at, result, compute_seconds)
+            self._l1.move_to_end(key)
+            while len(self._l1) > self.l1_max_entries:
+                self._l1.popitem(last=False)
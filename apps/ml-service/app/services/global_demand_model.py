@@ -0,0 +1,251 @@
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from xgboost import XGBRegressor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LAGS = (1, 2, 3, 7, 14, 28)
+DEFAULT_WINDOWS = (7, 28)
+
+
+def _window_sums(cumsum: np.ndarray, ends: slice, window: int) -> np.ndarray:
+    """Sums over the `window` rows before each end row, from a cumsum with a leading zero row"""
+    return cumsum[ends] - cumsum[ends.start - window:ends.stop - window]
+
+
+class GlobalDemandModel:
+    """
+    One gradient-boosted regressor for every demand series of a tenant
+
+    Per-item Prophet fits one Stan model per series. This model is instead
+    trained once on rows pooled from every item: for each (day, item) the
+    target is the day's demand and the features are lagged demand, trailing
+    means and standard deviations, calendar fields, the item's index and
+    its demand scale. Series are divided by their mean demand, so items of
+    very different volume share one set of trees.
+
+    Features are built with array slicing over a [days, items] matrix, never
+    per item. Forecasts are recursive: each horizon step predicts the next
+    day for every requested item in one batched call and feeds it back as
+    history for the next step.
+    """
+
+    def __init__(
+        self,
+        lags: Sequence[int] = DEFAULT_LAGS,
+        windows: Sequence[int] = DEFAULT_WINDOWS,
+        n_estimators: int = 300,
+        max_depth: int = 8,
+        learning_rate: float = 0.05,
+        max_training_rows: int = 2_000_000,
+        n_jobs: Optional[int] = None,
+        random_state: int = 42
+    ):
+        self.lags = tuple(int(lag) for lag in lags)
+        self.windows = tuple(int(window) for window in windows)
+        self.n_estimators = n_estimators
+        self.max_depth = max_depth
+        self.learning_rate = learning_rate
+        self.max_training_rows = max_training_rows
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+
+        self.regressor: Optional[XGBRegressor] = None
+        self.item_ids: List[str] = []
+        self.scales: Optional[np.ndarray] = None
+        self.history: Optional[np.ndarray] = None  # Last `lookback` scaled days, [days, items]
+        self.last_date: Optional[pd.Timestamp] = None
+        self.metrics: Dict[str, float] = {}
+
+    @property
+    def lookback(self) -> int:
+        return max(max(self.lags), max(self.windows))
+
+    @property
+    def feature_names(self) -> List[str]:
+        return (
+            [f"lag_{lag}" for lag in self.lags]
+            + [f"mean_{window}" for window in self.windows]
+            + [f"std_{window}" for window in self.windows]
+            + ['day_of_week', 'day_of_month', 'month', 'item_index', 'log_scale']
+        )
+
+    def fit(self, demand: pd.DataFrame) -> "GlobalDemandModel":
+        """
+        Train on every series at once
+
+        Args:
+            demand: Wide daily demand with a 'date' column and one column per
+                item, as returned by get_training_data(tenant_id, 'demand');
+                missing days count as zero demand
+        """
+        matrix, dates = self._to_matrix(demand)
+        if len(dates) <= self.lookback:
+            raise ValueError(f"Global demand model needs more than {self.lookback} days of history")
+
+        self.item_ids = [str(item) for item in demand.columns if item != 'date']
+        self.scales = np.maximum(matrix.mean(axis=0), 1e-3)
+        scaled = matrix / self.scales
+
+        X, y = self._training_rows(scaled, dates)
+        if len(y) > self.max_training_rows:
+            # Keep the most recent rows; rows are ordered by day
+            X, y = X[-self.max_training_rows:], y[-self.max_training_rows:]
+
+        self.regressor = XGBRegressor(
+            n_estimators=self.n_estimators,
+            max_depth=self.max_depth,
+            learning_rate=self.learning_rate,
+            subsample=0.8,
+            colsample_bytree=0.8,
+            tree_method='hist',
+            n_jobs=self.n_jobs,
+            random_state=self.random_state
+        )
+        self.regressor.fit(X, y)
+
+        fitted = self.regressor.predict(X)
+        self.metrics = {
+            'training_rows': float(len(y)),
+            'series': float(len(self.item_ids)),
+            'scaled_mae': float(np.mean(np.abs(fitted - y)))
+        }
+
+        self.history = scaled[-self.lookback:].copy()
+        self.last_date = dates[-1]
+        logger.info(f"Global demand model trained on {len(y)} rows across {len(self.item_ids)} series")
+        return self
+
+    def predict(self, horizon: int, item_ids: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Forecast the next `horizon` days for many items in one pass
+
+        Args:
+            horizon: Days to forecast after the last training day
+            item_ids: Items to forecast (optional, defaults to every trained item)
+
+        Returns:
+            Wide frame with a 'date' column and one column per item
+        """
+        if self.regressor is None:
+            raise ValueError("Global demand model is not trained")
+
+        if item_ids is None:
+            columns = np.arange(len(self.item_ids))
+        else:
+            index = {item: i for i, item in enumerate(self.item_ids)}
+            missing = [item for item in item_ids if str(item) not in index]
+            if missing:
+                raise ValueError(f"Items not in the global demand model: {missing[:5]}")
+            columns = np.array([index[str(item)] for item in item_ids], dtype=np.int64)
+
+        history = np.asarray(self.history)[:, columns]
+        scales = np.asarray(self.scales)[columns]
+        dates = pd.date_range(self.last_date + pd.Timedelta(days=1), periods=horizon, freq='D')
+        forecast = np.empty((horizon, len(columns)))
+
+        for step, date in enumerate(dates):
+            features = self._step_features(history, date, columns, scales)
+            predicted = np.maximum(self.regressor.predict(features), 0.0)
+            forecast[step] = predicted
+            history = np.vstack([history[1:], predicted])
+
+        result = pd.DataFrame(forecast * scales, columns=[self.item_ids[i] for i in columns])
+        result.insert(0, 'date', dates)
+        return result
+
+    def _to_matrix(self, demand: pd.DataFrame):
+        frame = demand.copy()
+        frame['date'] = pd.to_datetime(frame['date'])
+        frame = frame.set_index('date').sort_index()
+        days = pd.date_range(frame.index.min(), frame.index.max(), freq='D')
+        frame = frame.reindex(days, fill_value=0).fillna(0)
+        return frame.to_numpy(dtype=np.float64), days
+
+    def _calendar(self, dates: pd.DatetimeIndex) -> np.ndarray:
+        return np.column_stack([dates.dayofweek, dates.day, dates.month]).astype(np.float32)
+
+    def _training_rows(self, scaled: np.ndarray, dates: pd.DatetimeIndex):
+        """Build the pooled (day, item) design matrix with whole-array operations"""
+        days, series = scaled.shape
+        start = self.lookback
+        targets = slice(start, days)
+        rows = (days - start) * series
+
+        cumsum = np.vstack([np.zeros((1, series)), np.cumsum(scaled, axis=0)])
+        cumsum_sq = np.vstack([np.zeros((1, series)), np.cumsum(scaled ** 2, axis=0)])
+
+        columns = [scaled[start - lag:days - lag] for lag in self.lags]
+        means = [_window_sums(cumsum, targets, window) / window for window in self.windows]
+        stds = [
+            np.sqrt(np.maximum(_window_sums(cumsum_sq, targets, window) / window - mean ** 2, 0.0))
+            for window, mean in zip(self.windows, means)
+        ]
+        columns.extend(means)
+        columns.extend(stds)
+
+        X = np.empty((rows, len(self.feature_names)), dtype=np.float32)
+        for i, column in enumerate(columns):
+            X[:, i] = column.ravel()
+
+        calendar = self._calendar(dates[start:])
+        offset = len(columns)
+        X[:, offset:offset + 3] = np.repeat(calendar, series, axis=0)
+        X[:, offset + 3] = np.tile(np.arange(series, dtype=np.float32), days - start)
+        X[:, offset + 4] = np.tile(np.log1p(self.scales).astype(np.float32), days - start)
+
+        y = scaled[start:].ravel().astype(np.float32)
+        return X, y
+
+    def _step_features(self, history: np.ndarray, date: pd.Timestamp, columns: np.ndarray, scales: np.ndarray) -> np.ndarray:
+        """Features for the day after `history`, one row per item"""
+        values = [history[-lag] for lag in self.lags]
+        values.extend(history[-window:].mean(axis=0) for window in self.windows)
+        values.extend(history[-window:].std(axis=0) for window in self.windows)
+
+        count = history.shape[1]
+        calendar = self._calendar(pd.DatetimeIndex([date]))[0]
+        values.extend(np.full(count, value) for value in calendar)
+        values.append(columns.astype(np.float32))
+        values.append(np.log1p(scales))
+        return np.column_stack(values).astype(np.float32)
+
+    def config(self) -> Dict[str, Any]:
+        """JSON-serializable settings and series ids, saved alongside the booster"""
+        return {
+            'lags': list(self.lags),
+            'windows': list(self.windows),
+            'n_estimators': self.n_estimators,
+            'max_depth': self.max_depth,
+            'learning_rate': self.learning_rate,
+            'max_training_rows': self.max_training_rows,
+            'random_state': self.random_state,
+            'item_ids': self.item_ids,
+            'last_date': self.last_date.isoformat() if self.last_date is not None else None,
+            'metrics': self.metrics
+        }
+
+    def state_arrays(self) -> Dict[str, np.ndarray]:
+        return {'history': self.history, 'scales': self.scales}
+
+    @classmethod
+    def from_state(cls, config: Dict[str, Any], arrays: Dict[str, np.ndarray], regressor: XGBRegressor) -> "GlobalDemandModel":
+        model = cls(
+            lags=config['lags'],
+            windows=config['windows'],
+            n_estimators=config['n_estimators'],
+            max_depth=config['max_depth'],
+            learning_rate=config['learning_rate'],
+            max_training_rows=config['max_training_rows'],
+            random_state=config['random_state']
+        )
+        model.regressor = regressor
+        model.item_ids = config['item_ids']
+        model.last_date = pd.Timestamp(config['last_date']) if config['last_date'] else None
+        model.metrics = config['metrics']
+        model.history = arrays['history']
+        model.scales = arrays['scales']
+        return model
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import pandas as pd
 import numpy as np
@@ -5,6 +6,8 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 import joblib
 import os
+import threading
+import time
 from pathlib import Path
 
 # ML Libraries
@@ -16,17 +19,501 @@ from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 from sklearn.model_selection import train_test_split
 
 from app.core.config import settings
+from app.core.database import get_data_service
 from app.services.data_service import DataService
+from app.services.global_demand_model import GlobalDemandModel
+from app.services.cost_inference import COST_INPUT_FEATURES, predict_costs, seasonality_factors
+from app.services.model_cache import model_cache
+from app.services.model_registry import ModelRegistry
+from app.services.prediction_intervals import constant_half_width, demand_calibration, interval_half_widths
+from app.services.prophet_tuning import prophet_tuner
+from app.services.model_artifacts import ARTIFACT_SUFFIX, save_artifact, load_artifact
 from app.models.forecast_model import ForecastModel
 
 logger = logging.getLogger(__name__)
 
-class MLService:
-    def __init__(self):
-        self.data_service = DataService(
-            mongo_uri=settings.MONGODB_URI,
-            redis_url=settings.REDIS_URL
+
+def _load_forecast_model(model_path: str) -> Tuple[Any, Dict[str, Any]]:
+    """Load (model, metadata) from an artifact or a legacy (model, metadata) pickle"""
+    if Path(model_path).is_dir():
+        return load_artifact(model_path)
+    return joblib.load(model_path)
+
+
+def prophet_warm_start_params(model: Prophet) -> Dict[str, Any]:
+    """
+    Fitted parameters of a Prophet model in the form Stan's optimizer takes as init
+
+    MAP fits store each parameter with a leading axis of one and MCMC fits
+    one row per draw, so the mean over that axis covers both.
+    """
+    return {
+        'k': float(np.mean(model.params['k'])),
+        'm': float(np.mean(model.params['m'])),
+        'sigma_obs': float(np.mean(model.params['sigma_obs'])),
+        'delta': np.mean(np.atleast_2d(model.params['delta']), axis=0),
+        'beta': np.mean(np.atleast_2d(model.params['beta']), axis=0)
+    }
+
+
+def prophet_components(model: Prophet, dates: pd.Series) -> pd.DataFrame:
+    """
+    trend, seasonal components and yhat of a Prophet model at the given dates
+
+    Runs the trend and seasonality steps of Prophet.predict only, without
+    uncertainty sampling, so it costs a fraction of a predict call and
+    never mutates the model.
+    """
+    df = model.setup_dataframe(pd.DataFrame({'ds': pd.to_datetime(dates).to_numpy()}))
+    trend = np.asarray(model.predict_trend(df), dtype=float)
+    components = model.predict_seasonal_components(df).reset_index(drop=True)
+    components['ds'] = df['ds'].to_numpy()
+    components['trend'] = trend
+    components['yhat'] = (
+        trend * (1 + components['multiplicative_terms'].to_numpy())
+        + components['additive_terms'].to_numpy()
+    )
+    return components
+
+
+def prophet_point_forecast(model: Prophet, dates: pd.Series) -> np.ndarray:
+    """yhat of a Prophet model at the given dates, without uncertainty sampling"""
+    return prophet_components(model, dates)['yhat'].to_numpy(dtype=float)
+
+
+def fit_demand_model(
+    data: pd.DataFrame,
+    parameters: Dict[str, Any],
+    init: Optional[Dict[str, Any]] = None
+) -> Prophet:
+    """
+    Train demand forecasting model using Prophet
+    
+    Args:
+        data: Daily demand with 'date' and 'quantity' columns
+        parameters: Model parameters
+        init: Starting point for Stan's optimizer (optional, see
+            prophet_warm_start_params); parameters whose shape does not
+            match the new fit are reset by Prophet to its defaults
+    """
+    try:
+        # Prepare data for Prophet
+        prophet_data = data.rename(columns={
+            'date': 'ds',
+            'quantity': 'y'
+        })
+        
+        # Initialize Prophet model
+        model = Prophet(
+            yearly_seasonality=parameters.get('yearly_seasonality', True),
+            weekly_seasonality=parameters.get('weekly_seasonality', True),
+            daily_seasonality=parameters.get('daily_seasonality', False),
+            seasonality_mode=parameters.get('seasonality_mode', 'multiplicative'),
+            changepoint_prior_scale=parameters.get('changepoint_prior_scale', 0.05),
+            seasonality_prior_scale=parameters.get('seasonality_prior_scale', 10.0),
+            # Intervals come from the model's calibration (prediction_intervals), not sampling
+            uncertainty_samples=parameters.get('uncertainty_samples', 0)
+        )
+        
+        # Add custom seasonality if specified
+        if parameters.get('custom_seasonality'):
+            for seasonality in parameters['custom_seasonality']:
+                model.add_seasonality(
+                    name=seasonality['name'],
+                    period=seasonality['period'],
+                    fourier_order=seasonality.get('fourier_order', 10)
+                )
+        
+        # Fit model
+        if init is not None:
+            model.fit(prophet_data, init=init)
+        else:
+            model.fit(prophet_data)
+        
+        logger.info("Demand forecasting model trained successfully")
+        return model
+        
+    except Exception as e:
+        logger.error(f"Error training demand model: {str(e)}")
+        raise
+
+
+def fit_cost_model(data: pd.DataFrame, parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Train cost prediction model using XGBoost
+    """
+    try:
+        # Map cost data columns onto the model's feature names
+        data = data.rename(columns={
+            'vendorRating': 'vendor_rating',
+            'unitPrice': 'unit_cost'
+        })
+        
+        # Prepare features
+        feature_columns = ['quantity', 'vendor_rating', 'market_price', 'seasonality_factor']
+        target_column = 'unit_cost'
+        
+        # Ensure all required columns exist
+        available_features = [col for col in feature_columns if col in data.columns]
+        if not available_features:
+            raise ValueError("No suitable features found for cost prediction")
+        
+        X = data[available_features].fillna(0)
+        y = data[target_column]
+        
+        # Split data
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.2, random_state=42
+        )
+        
+        # Scale features
+        scaler = StandardScaler()
+        X_train_scaled = scaler.fit_transform(X_train)
+        X_test_scaled = scaler.transform(X_test)
+        
+        # Initialize XGBoost model
+        model = XGBRegressor(
+            n_estimators=parameters.get('n_estimators', 100),
+            max_depth=parameters.get('max_depth', 6),
+            learning_rate=parameters.get('learning_rate', 0.1),
+            random_state=42
+        )
+        
+        # Train model
+        model.fit(X_train_scaled, y_train)
+        
+        # Evaluate model
+        y_pred = model.predict(X_test_scaled)
+        mae = mean_absolute_error(y_test, y_pred)
+        rmse = np.sqrt(mean_squared_error(y_test, y_pred))
+        r2 = r2_score(y_test, y_pred)
+        
+        logger.info(f"Cost prediction model trained successfully. MAE: {mae:.2f}, RMSE: {rmse:.2f}, R²: {r2:.2f}")
+        
+        # Return model with scaler
+        return {
+            'model': model,
+            'scaler': scaler,
+            'feature_columns': available_features,
+            'metrics': {'mae': mae, 'rmse': rmse, 'r2': r2}
+        }
+        
+    except Exception as e:
+        logger.error(f"Error training cost model: {str(e)}")
+        raise
+
+
+def fit_global_demand_model(data: pd.DataFrame, parameters: Dict[str, Any]) -> GlobalDemandModel:
+    """
+    Train one demand model across every item of a tenant
+    """
+    try:
+        model = GlobalDemandModel(
+            **{
+                name: parameters[name]
+                for name in ('lags', 'windows', 'n_estimators', 'max_depth', 'learning_rate', 'max_training_rows')
+                if name in parameters
+            }
+        )
+        model.fit(data)
+        
+        logger.info("Global demand forecasting model trained successfully")
+        return model
+        
+    except Exception as e:
+        logger.error(f"Error training global demand model: {str(e)}")
+        raise
+
+
+def calibrate_demand_model(
+    model: Prophet,
+    training_data: pd.DataFrame,
+    holdout: pd.DataFrame,
+    holdout_model: Optional[Prophet],
+    cutoff: pd.Timestamp
+) -> Dict[str, Any]:
+    """
+    Calibration record of a fitted demand model (see prediction_intervals)
+
+    Args:
+        model: The final model, fitted on all of training_data
+        training_data: Its training data
+        holdout: The last days of training_data, unseen by holdout_model
+        holdout_model: A fit on the days up to cutoff, or None if there was
+            too little data for one
+        cutoff: Last training day of holdout_model
+    """
+    dates = pd.to_datetime(training_data['date'])
+    in_sample = training_data['quantity'].to_numpy(dtype=float) - prophet_point_forecast(model, dates)
+
+    residuals, lead_days = np.empty(0), np.empty(0)
+    if holdout_model is not None and not holdout.empty:
+        residuals = holdout['quantity'].to_numpy(dtype=float) - prophet_point_forecast(holdout_model, holdout['date'])
+        lead_days = (pd.to_datetime(holdout['date']) - cutoff).dt.days.to_numpy()
+
+    return demand_calibration(
+        residuals, lead_days, float(np.std(in_sample)),
+        max(int((dates.max() - cutoff).days), 1), dates.max().to_pydatetime()
+    )
+
+
+def calibration_split(
+    training_data: pd.DataFrame,
+    parameters: Dict[str, Any]
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Timestamp]:
+    """
+    Split sorted training data at the start of its calibration window
+
+    Returns:
+        (days up to the cutoff, the last `interval_calibration_days` days,
+        cutoff); the holdout is empty if the window is not positive
+    """
+    window_days = int(parameters.get('interval_calibration_days', settings.INTERVAL_CALIBRATION_DAYS))
+    dates = pd.to_datetime(training_data['date'])
+    cutoff = dates.max() - timedelta(days=max(window_days, 0))
+    return training_data[dates <= cutoff], training_data[dates > cutoff], cutoff
+
+
+def fit_calibrated_demand_model(
+    training_data: pd.DataFrame,
+    parameters: Dict[str, Any]
+) -> Tuple[Prophet, Dict[str, Any]]:
+    """
+    Fit a Prophet demand model and calibrate its prediction intervals
+
+    A first fit leaves out the last `interval_calibration_days` days and
+    its errors on them are kept as calibration residuals; the model is
+    then refitted on all the data, warm-started from the first fit.
+
+    Returns:
+        (model, calibration record)
+    """
+    training_data = training_data.sort_values('date')
+    fit_part, holdout, cutoff = calibration_split(training_data, parameters)
+
+    if len(fit_part) < 2 or holdout.empty:
+        model = fit_demand_model(training_data, parameters)
+        return model, calibrate_demand_model(model, training_data, holdout, None, cutoff)
+
+    holdout_model = fit_demand_model(fit_part, parameters)
+    model = fit_demand_model(training_data, parameters, init=prophet_warm_start_params(holdout_model))
+    return model, calibrate_demand_model(model, training_data, holdout, holdout_model, cutoff)
+
+
+def fit_and_save_model(
+    model_type: str,
+    training_data: pd.DataFrame,
+    parameters: Dict[str, Any],
+    metadata: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Fit a model and save it as an artifact at metadata['model_path']
+
+    CPU-bound and self-contained, so it can run in a worker process; only
+    the metadata travels back, never the fitted model.
+
+    Returns:
+        The metadata, with training metrics added for cost models, the
+        interval calibration for demand models and the fit's wall time as
+        fit_seconds
+    """
+    started = time.perf_counter()
+    if model_type == "demand_forecast":
+        model, calibration = fit_calibrated_demand_model(training_data, parameters)
+        metadata = {**metadata, 'calibration': calibration}
+    elif model_type == "cost_prediction":
+        model = fit_cost_model(training_data, parameters)
+        metadata = {**metadata, 'metrics': {k: float(v) for k, v in model['metrics'].items()}}
+    elif model_type == "global_demand_forecast":
+        model = fit_global_demand_model(training_data, parameters)
+        metadata = {**metadata, 'metrics': model.metrics, 'series': len(model.item_ids)}
+    else:
+        raise ValueError(f"Unsupported model type: {model_type}")
+    metadata = {**metadata, 'warm_start': False, 'fit_seconds': round(time.perf_counter() - started, 3)}
+
+    save_artifact(Path(metadata['model_path']), model, metadata)
+    return metadata
+
+
+def retrain_and_save_demand_model(
+    previous: Prophet,
+    training_data: pd.DataFrame,
+    parameters: Dict[str, Any],
+    metadata: Dict[str, Any],
+    previous_parameters: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Refit a Prophet demand model warm-started from a previous version
+
+    The last `retrain_holdout_days` days of the refreshed window are held
+    out: a candidate is fitted on the rest, starting Stan's optimizer from
+    the previous version's parameters, and both are scored on the holdout
+    days the previous version was not trained on, so neither is scored
+    in-sample. If the previous version saw every holdout day, its
+    parameters (previous_parameters) are refitted on the candidate's data
+    and that fit is scored instead. Only a candidate with a lower MAE is
+    refitted on the full window (again warm-started, from the candidate)
+    and saved at metadata['model_path'].
+
+    An accepted model is calibrated like fit_calibrated_demand_model, from
+    a fit that leaves out the last `interval_calibration_days` days.
+
+    Returns:
+        The metadata, with accepted, warm_start, fit_seconds and the holdout
+        scores, and for an accepted model its interval calibration
+    """
+    holdout_days = int(parameters.get('retrain_holdout_days', settings.RETRAIN_HOLDOUT_DAYS))
+    training_data = training_data.sort_values('date')
+    dates = pd.to_datetime(training_data['date'])
+    cutoff = dates.max() - timedelta(days=holdout_days)
+    fit_part, holdout = training_data[dates <= cutoff], training_data[dates > cutoff]
+
+    started = time.perf_counter()
+    previous_mae = candidate_mae = None
+    scored_days = 0
+    baseline = 'previous'
+    candidate = None
+    if holdout_days <= 0 or len(fit_part) < 2 or holdout.empty:
+        # Too little data to score the candidate, so the refreshed fit wins
+        model = fit_demand_model(training_data, parameters, init=prophet_warm_start_params(previous))
+        accepted = True
+    else:
+        candidate = fit_demand_model(fit_part, parameters, init=prophet_warm_start_params(previous))
+        previous_end = pd.Timestamp(previous.history['ds'].max())
+        scored = holdout[pd.to_datetime(holdout['date']) > previous_end]
+        reference = previous
+        if scored.empty:
+            # Every holdout day is in-sample for the previous version
+            reference = fit_demand_model(
+                fit_part, previous_parameters or parameters, init=prophet_warm_start_params(previous)
+            )
+            scored = holdout
+            baseline = 'refit'
+        scored_days = len(scored)
+        actual = scored['quantity'].to_numpy(dtype=float)
+        previous_mae = mean_absolute_error(actual, prophet_point_forecast(reference, scored['date']))
+        candidate_mae = mean_absolute_error(actual, prophet_point_forecast(candidate, scored['date']))
+        accepted = candidate_mae < previous_mae
+        model = None
+        if accepted:
+            model = fit_demand_model(training_data, parameters, init=prophet_warm_start_params(candidate))
+    if accepted:
+        # Calibrated over the full calibration window, as in fit_calibrated_demand_model;
+        # the retrain holdout is usually too short for a conformal quantile
+        calibration_part, calibration_holdout, calibration_cutoff = calibration_split(training_data, parameters)
+        calibration_model = None
+        if len(calibration_part) >= 2 and not calibration_holdout.empty:
+            if candidate is not None and calibration_cutoff == cutoff:
+                calibration_model = candidate
+            else:
+                calibration_model = fit_demand_model(
+                    calibration_part, parameters, init=prophet_warm_start_params(candidate or previous)
+                )
+        metadata = {
+            **metadata,
+            'calibration': calibrate_demand_model(
+                model, training_data, calibration_holdout, calibration_model, calibration_cutoff
+            )
+        }
+
+    metadata = {
+        **metadata,
+        'accepted': accepted,
+        'warm_start': True,
+        'fit_seconds': round(time.perf_counter() - started, 3),
+        'holdout': {
+            'days': holdout_days,
+            'scored_days': scored_days,
+            'baseline': baseline,
+            'previous_mae': previous_mae,
+            'candidate_mae': candidate_mae
+        }
+    }
+    if accepted:
+        save_artifact(Path(metadata['model_path']), model, metadata)
+    return metadata
+
+
+def retrain_and_save_model(
+    model_type: str,
+    previous_path: str,
+    training_data: pd.DataFrame,
+    parameters: Dict[str, Any],
+    metadata: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Refit a model from its previous version and save it at metadata['model_path']
+
+    Prophet demand models are warm-started from the previous version's
+    artifact (see retrain_and_save_demand_model); other model types are
+    refitted from scratch. Like fit_and_save_model it only takes paths and
+    data, so it can run in a worker process.
+
+    Returns:
+        The new version's metadata; accepted is False if the previous
+        version was kept and nothing was saved
+    """
+    if model_type == "demand_forecast":
+        previous, previous_metadata = _load_forecast_model(previous_path)
+        return retrain_and_save_demand_model(
+            previous, training_data, parameters, metadata, previous_metadata.get('parameters')
         )
+    return fit_and_save_model(model_type, training_data, parameters, metadata)
+
+
+class FitStats:
+    """
+    Process-wide count and wall time of model fits, cold and warm-started
+
+    Fits may run in worker processes, so they are recorded from the
+    fit_seconds of the metadata that comes back rather than timed here.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # model_type -> 'cold' / 'warm' -> [fits, seconds]
+        self._totals: Dict[str, Dict[str, List[float]]] = {}
+        self.rejected = 0
+
+    def record(self, model_type: str, metadata: Dict[str, Any]) -> None:
+        if 'fit_seconds' not in metadata:
+            return
+        kind = 'warm' if metadata.get('warm_start') else 'cold'
+        with self._lock:
+            totals = self._totals.setdefault(model_type, {'cold': [0, 0.0], 'warm': [0, 0.0]})
+            totals[kind][0] += 1
+            totals[kind][1] += metadata['fit_seconds']
+            if metadata.get('accepted') is False:
+                self.rejected += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return fits and mean seconds per model type, and how much faster warm fits are"""
+        with self._lock:
+            result: Dict[str, Any] = {'rejected_retrains': self.rejected}
+            for model_type, totals in self._totals.items():
+                means = {kind: seconds / fits if fits else None for kind, (fits, seconds) in totals.items()}
+                result[model_type] = {
+                    kind: {
+                        'fits': int(fits),
+                        'seconds': round(seconds, 3),
+                        'mean_seconds': round(means[kind], 3) if means[kind] is not None else None
+                    }
+                    for kind, (fits, seconds) in totals.items()
+                }
+                if means['cold'] and means['warm']:
+                    result[model_type]['warm_speedup'] = round(means['cold'] / means['warm'], 2)
+            return result
+
+
+fit_stats = FitStats()
+
+
+MODEL_TYPES = ("demand_forecast", "cost_prediction", "global_demand_forecast")
+
+
+class MLService:
+    def __init__(self, data_service: Optional[DataService] = None):
+        self.data_service = data_service or get_data_service()
         self.model_path = Path(settings.MODEL_PATH)
         self.model_path.mkdir(exist_ok=True)
         
@@ -40,56 +527,98 @@ class MLService:
     ) -> str:
         """
         Train a new ML model
+        
+        Fitting runs in a worker thread so the event loop keeps serving
+        requests; TrainingExecutor runs the same steps in worker processes.
         """
         try:
-            logger.info(f"Starting training for {model_type} model")
-            
-            # Get training data
-            training_data = self.data_service.get_training_data(
-                tenant_id, 'demand'
+            training_data, model_metadata = await self.prepare_training(
+                model_type, item_id, vendor_id, tenant_id, parameters
             )
             
-            if training_data.empty:
-                raise ValueError("Insufficient training data")
-            
-            # Train model based on type
-            if model_type == "demand_forecast":
-                model = await self._train_demand_model(training_data, parameters)
-            elif model_type == "cost_prediction":
-                model = await self._train_cost_model(training_data, parameters)
-            else:
-                raise ValueError(f"Unsupported model type: {model_type}")
-            
-            # Save model
-            model_id = f"{model_type}_{tenant_id}_{item_id}_{vendor_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            model_path = self.model_path / f"{model_id}.joblib"
-            
-            # Save model metadata
-            model_metadata = {
-                "model_id": model_id,
-                "model_type": model_type,
-                "tenant_id": tenant_id,
-                "item_id": item_id,
-                "vendor_id": vendor_id,
-                "parameters": parameters,
-                "training_date": datetime.now(),
-                "data_points": len(training_data),
-                "model_path": str(model_path)
-            }
-            
-            # Save model and metadata
-            joblib.dump((model, model_metadata), model_path)
+            # Train and save model with its metadata sidecar
+            model_metadata = await asyncio.to_thread(
+                fit_and_save_model, model_type, training_data, model_metadata['parameters'], model_metadata
+            )
+            fit_stats.record(model_type, model_metadata)
             
             # Save metadata to database
             await self._save_model_metadata(model_metadata)
             
-            logger.info(f"Model {model_id} trained and saved successfully")
-            return model_id
+            logger.info(f"Model {model_metadata['model_id']} trained and saved successfully")
+            return model_metadata['model_id']
             
         except Exception as e:
             logger.error(f"Error training model: {str(e)}")
             raise
     
+    async def prepare_training(
+        self,
+        model_type: str,
+        item_id: str,
+        vendor_id: str,
+        tenant_id: str,
+        parameters: Dict[str, Any],
+        start_date: Optional[str] = None
+    ) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Load the training data and build the metadata of a new model
+        
+        Parameters found by tune_demand_model for the series are used for
+        any the caller does not set; the merged parameters are the
+        metadata's 'parameters', which the model is fitted with, and the
+        caller's own are kept as 'parameter_overrides' so a retrain picks
+        up the series' latest tuned values instead of the ones this
+        version was fitted with.
+        
+        Args:
+            start_date: Only train on data from this date (optional, ISO format)
+        
+        Returns:
+            (training data, model metadata including model_id and model_path)
+        """
+        if model_type not in MODEL_TYPES:
+            raise ValueError(f"Unsupported model type: {model_type}")
+        
+        logger.info(f"Starting training for {model_type} model")
+        
+        if model_type == "global_demand_forecast":
+            # One model per tenant, trained on every item's series
+            item_id, vendor_id = None, None
+        
+        # Get training data (one row per PO line for cost models)
+        data_type = 'cost' if model_type == "cost_prediction" else 'demand'
+        training_data = await self.data_service.get_training_data(
+            tenant_id, data_type, start_date, item_id=item_id, vendor_id=vendor_id
+        )
+        
+        if training_data.empty:
+            raise ValueError("Insufficient training data")
+        
+        overrides = parameters
+        if model_type == "demand_forecast":
+            tuned = await self.registry.tuned_parameters(tenant_id, item_id, vendor_id, model_type)
+            if tuned:
+                parameters = {**tuned['parameters'], **overrides}
+        
+        model_id = f"{model_type}_{tenant_id}_{item_id}_{vendor_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        model_path = self.model_path / f"{model_id}{ARTIFACT_SUFFIX}"
+        
+        model_metadata = {
+            "model_id": model_id,
+            "model_type": model_type,
+            "tenant_id": tenant_id,
+            "item_id": item_id,
+            "vendor_id": vendor_id,
+            "parameters": parameters,
+            "parameter_overrides": overrides,
+            "training_date": datetime.now(),
+            "data_points": len(training_data),
+            "model_path": str(model_path)
+        }
+        
+        return training_data, model_metadata
+    
     async def generate_forecast(
         self,
         model_type: str,
@@ -101,17 +630,28 @@ class MLService:
     ) -> Dict[str, Any]:
         """
         Generate forecast predictions
+        
+        forecast_horizon is in weeks for every model type (see
+        DEFAULT_FORECAST_HORIZON): demand and cost models return one
+        prediction per week, and the global demand model, which forecasts
+        daily, returns forecast_horizon * 7 days.
+        
+        Global demand models are trained per tenant, so they are looked up
+        without the item and vendor; item_id only selects the series.
         """
         try:
             # Load the best available model
-            model_info = await self._get_best_model(tenant_id, item_id, vendor_id, model_type)
+            if model_type == "global_demand_forecast":
+                model_info = await self._get_best_model(tenant_id, None, None, model_type)
+            else:
+                model_info = await self._get_best_model(tenant_id, item_id, vendor_id, model_type)
             
             if not model_info:
                 raise ValueError(f"No trained model found for {model_type}")
             
-            # Load model
+            # Load model (cached per process, reloaded if the artifact changes)
             model_path = Path(model_info["model_path"])
-            model, metadata = joblib.load(model_path)
+            model, metadata = await model_cache.aget(model_path, loader=_load_forecast_model)
             
             # Generate forecast
             if model_type == "demand_forecast":
@@ -122,13 +662,21 @@ class MLService:
                 predictions = await self._generate_cost_forecast(
                     model, forecast_horizon, parameters
                 )
+            elif model_type == "global_demand_forecast":
+                batch = await asyncio.to_thread(model.predict, forecast_horizon * 7, [item_id])
+                predictions = self._format_global_demand_forecast(batch, item_id)
             else:
                 raise ValueError(f"Unsupported model type: {model_type}")
             
+            confidence_intervals = self._calculate_confidence_intervals(predictions, metadata, parameters)
+            for prediction, interval in zip(predictions, confidence_intervals):
+                prediction['lower_bound'] = interval['lower_bound']
+                prediction['upper_bound'] = interval['upper_bound']
+            
             return {
                 "model_id": model_info["model_id"],
                 "predictions": predictions,
-                "confidence_intervals": self._calculate_confidence_intervals(predictions, parameters),
+                "confidence_intervals": confidence_intervals,
                 "model_metadata": metadata
             }
             
@@ -136,112 +684,52 @@ class MLService:
             logger.error(f"Error generating forecast: {str(e)}")
             raise
     
-    async def _train_demand_model(
-        self, 
-        data: pd.DataFrame, 
-        parameters: Dict[str, Any]
-    ) -> Any:
-        """
-        Train demand forecasting model using Prophet
-        """
-        try:
-            # Prepare data for Prophet
-            prophet_data = data.rename(columns={
-                'date': 'ds',
-                'quantity': 'y'
-            })
-            
-            # Initialize Prophet model
-            model = Prophet(
-                yearly_seasonality=parameters.get('yearly_seasonality', True),
-                weekly_seasonality=parameters.get('weekly_seasonality', True),
-                daily_seasonality=parameters.get('daily_seasonality', False),
-                seasonality_mode=parameters.get('seasonality_mode', 'multiplicative'),
-                changepoint_prior_scale=parameters.get('changepoint_prior_scale', 0.05),
-                seasonality_prior_scale=parameters.get('seasonality_prior_scale', 10.0)
-            )
-            
-            # Add custom seasonality if specified
-            if parameters.get('custom_seasonality'):
-                for seasonality in parameters['custom_seasonality']:
-                    model.add_seasonality(
-                        name=seasonality['name'],
-                        period=seasonality['period'],
-                        fourier_order=seasonality.get('fourier_order', 10)
-                    )
-            
-            # Fit model
-            model.fit(prophet_data)
-            
-            logger.info("Demand forecasting model trained successfully")
-            return model
-            
-        except Exception as e:
-            logger.error(f"Error training demand model: {str(e)}")
-            raise
-    
-    async def _train_cost_model(
-        self, 
-        data: pd.DataFrame, 
-        parameters: Dict[str, Any]
-    ) -> Any:
+    async def generate_batch_demand_forecast(
+        self,
+        tenant_id: str,
+        forecast_horizon: int,
+        item_ids: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
         """
-        Train cost prediction model using XGBoost
+        Forecast demand for many items with the tenant's global demand model
+        
+        Every item is predicted in the same batched calls, rather than
+        loading and running one model per item.
+        
+        Args:
+            tenant_id: Tenant identifier
+            forecast_horizon: Days to forecast
+            item_ids: Items to forecast (optional, defaults to every item the model was trained on)
         """
         try:
-            # Prepare features
-            feature_columns = ['quantity', 'vendor_rating', 'market_price', 'seasonality_factor']
-            target_column = 'unit_cost'
+            model_info = await self._get_best_model(tenant_id, None, None, "global_demand_forecast")
             
-            # Ensure all required columns exist
-            available_features = [col for col in feature_columns if col in data.columns]
-            if not available_features:
-                raise ValueError("No suitable features found for cost prediction")
-            
-            X = data[available_features].fillna(0)
-            y = data[target_column]
-            
-            # Split data
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=42
-            )
-            
-            # Scale features
-            scaler = StandardScaler()
-            X_train_scaled = scaler.fit_transform(X_train)
-            X_test_scaled = scaler.transform(X_test)
-            
-            # Initialize XGBoost model
-            model = XGBRegressor(
-                n_estimators=parameters.get('n_estimators', 100),
-                max_depth=parameters.get('max_depth', 6),
-                learning_rate=parameters.get('learning_rate', 0.1),
-                random_state=42
-            )
-            
-            # Train model
-            model.fit(X_train_scaled, y_train)
-            
-            # Evaluate model
-            y_pred = model.predict(X_test_scaled)
-            mae = mean_absolute_error(y_test, y_pred)
-            rmse = np.sqrt(mean_squared_error(y_test, y_pred))
-            r2 = r2_score(y_test, y_pred)
+            if not model_info:
+                raise ValueError("No trained model found for global_demand_forecast")
             
-            logger.info(f"Cost prediction model trained successfully. MAE: {mae:.2f}, RMSE: {rmse:.2f}, R²: {r2:.2f}")
+            model, metadata = await model_cache.aget(Path(model_info["model_path"]), loader=_load_forecast_model)
+            batch = await asyncio.to_thread(model.predict, forecast_horizon, item_ids)
             
-            # Return model with scaler
             return {
-                'model': model,
-                'scaler': scaler,
-                'feature_columns': available_features,
-                'metrics': {'mae': mae, 'rmse': rmse, 'r2': r2}
+                "model_id": model_info["model_id"],
+                "predictions": {
+                    item: self._format_global_demand_forecast(batch, item)
+                    for item in batch.columns if item != 'date'
+                },
+                "model_metadata": metadata
             }
             
         except Exception as e:
-            logger.error(f"Error training cost model: {str(e)}")
+            logger.error(f"Error generating batch demand forecast: {str(e)}")
             raise
     
+    def _format_global_demand_forecast(self, batch: pd.DataFrame, item_id: str) -> List[Dict[str, Any]]:
+        """Format one item's column of a global demand forecast"""
+        return [
+            {'date': day.strftime('%Y-%m-%d'), 'predicted_demand': float(value)}
+            for day, value in zip(batch['date'], batch[str(item_id)])
+        ]
+    
     async def _generate_demand_forecast(
         self, 
         model: Prophet, 
@@ -250,33 +738,38 @@ class MLService:
     ) -> List[Dict[str, Any]]:
         """
         Generate demand forecast using Prophet
+        
+        Point forecasts and components only; Prophet's Monte Carlo
+        uncertainty sampling is skipped and intervals are added from the
+        model's calibration (see _calculate_confidence_intervals).
         """
         try:
             # Create future dates
             future_dates = model.make_future_dataframe(
                 periods=forecast_horizon,
-                freq='W'  # Weekly frequency
+                freq='W',  # Weekly frequency
+                include_history=False
             )
             
             # Generate forecast
-            forecast = model.predict(future_dates)
-            
-            # Extract future predictions
-            future_forecast = forecast.tail(forecast_horizon)
+            forecast = await asyncio.to_thread(prophet_components, model, future_dates['ds'])
+            seasonal = np.zeros(len(forecast))
+            for name in ('yearly', 'weekly'):
+                if name in forecast.columns:
+                    seasonal += forecast[name].to_numpy()
             
             # Format results
-            predictions = []
-            for _, row in future_forecast.iterrows():
-                predictions.append({
-                    'date': row['ds'].strftime('%Y-%m-%d'),
-                    'predicted_demand': max(0, row['yhat']),
-                    'lower_bound': max(0, row['yhat_lower']),
-                    'upper_bound': max(0, row['yhat_upper']),
-                    'trend': row['trend'],
-                    'seasonal': row['yearly'] + row['weekly']
-                })
-            
-            return predictions
+            return [
+                {
+                    'date': day.strftime('%Y-%m-%d'),
+                    'predicted_demand': max(0.0, float(yhat)),
+                    'trend': float(trend),
+                    'seasonal': float(season)
+                }
+                for day, yhat, trend, season in zip(
+                    pd.to_datetime(forecast['ds']), forecast['yhat'], forecast['trend'], seasonal
+                )
+            ]
             
         except Exception as e:
             logger.error(f"Error generating demand forecast: {str(e)}")
@@ -290,83 +783,215 @@ class MLService:
     ) -> List[Dict[str, Any]]:
         """
         Generate cost forecast using XGBoost
+        
+        quantity, vendor_rating and market_price are taken from parameters
+        when given; otherwise each week draws an example value. All weeks
+        are scored in one vectorized call.
         """
         try:
-            model = model_data['model']
-            scaler = model_data['scaler']
-            feature_columns = model_data['feature_columns']
-            
-            # Generate future feature values (simplified approach)
-            future_features = []
-            for i in range(forecast_horizon):
-                # This is a simplified approach - in practice, you'd use actual future data
-                features = {
-                    'quantity': np.random.normal(100, 20),  # Example future quantity
-                    'vendor_rating': np.random.uniform(3.5, 5.0),
-                    'market_price': np.random.normal(10, 2),
-                    'seasonality_factor': np.sin(2 * np.pi * i / 52)  # Weekly seasonality
-                }
-                future_features.append([features[col] for col in feature_columns])
-            
-            # Scale features
-            future_features_scaled = scaler.transform(future_features)
+            # Simplified future feature values - in practice, you'd use actual future data
+            rng = np.random.default_rng()
+            example_inputs = {
+                'quantity': rng.normal(100, 20, (1, forecast_horizon)),
+                'vendor_rating': rng.uniform(3.5, 5.0, (1, forecast_horizon)),
+                'market_price': rng.normal(10, 2, (1, forecast_horizon))
+            }
+            inputs = {
+                name: np.broadcast_to(
+                    np.asarray(parameters[name], dtype=np.float64), (1, forecast_horizon)
+                ) if parameters.get(name) is not None else example_inputs[name]
+                for name in COST_INPUT_FEATURES
+            }
             
-            # Generate predictions
-            predictions_raw = model.predict(future_features_scaled)
+            predictions_raw = predict_costs(model_data, inputs, 1, forecast_horizon)[0]
+            seasonality = seasonality_factors(forecast_horizon)
             
             # Format results
-            predictions = []
-            for i, pred in enumerate(predictions_raw):
-                predictions.append({
+            return [
+                {
                     'week': i + 1,
-                    'predicted_cost': max(0, pred),
+                    'predicted_cost': float(pred),
                     'confidence': 0.8,  # Simplified confidence
                     'factors': {
-                        'quantity': future_features[i][0],
-                        'vendor_rating': future_features[i][1],
-                        'market_price': future_features[i][2],
-                        'seasonality': future_features[i][3]
+                        'quantity': float(inputs['quantity'][0, i]),
+                        'vendor_rating': float(inputs['vendor_rating'][0, i]),
+                        'market_price': float(inputs['market_price'][0, i]),
+                        'seasonality': float(seasonality[i])
                     }
-                })
-            
-            return predictions
+                }
+                for i, pred in enumerate(predictions_raw)
+            ]
             
         except Exception as e:
             logger.error(f"Error generating cost forecast: {str(e)}")
             raise
     
+    async def generate_batch_cost_forecast(
+        self,
+        tenant_id: str,
+        item_ids: List[str],
+        forecast_horizon: int,
+        vendor_ids: Optional[List[Optional[str]]] = None,
+        inputs: Optional[Dict[str, Optional[List[float]]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Predict weekly unit costs of many items in columnar form
+        
+        Each item is priced with the newest cost model of its item/vendor,
+        falling back to its item-only model and then to the tenant-wide
+        model; all candidates are resolved with one registry aggregation.
+        Items are then grouped by model, and each model builds its [N * H]
+        feature matrix with NumPy and scores it with one predict call.
+        
+        Args:
+            tenant_id: Tenant identifier
+            item_ids: Items to price (N)
+            forecast_horizon: Weeks to price (H)
+            vendor_ids: Vendor of each item (optional)
+            inputs: Per-item feature values keyed by quantity, vendor_rating
+                and market_price (optional); features left out are set to
+                their training mean
+        
+        Returns:
+            Columns of length N (item_id, vendor_id, model_id and
+            predicted_cost, each row of which holds H weekly costs or None
+            if no model covers the item), plus per-model timings
+        """
+        try:
+            n = len(item_ids)
+            vendor_ids = list(vendor_ids) if vendor_ids is not None else [None] * n
+            if len(vendor_ids) != n:
+                raise ValueError("vendor_ids must have one entry per item")
+            
+            features = {}
+            for name, values in (inputs or {}).items():
+                if name not in COST_INPUT_FEATURES:
+                    raise ValueError(f"Unknown cost input: {name}")
+                if values is None:
+                    continue
+                features[name] = np.asarray(values, dtype=np.float64)
+                if len(features[name]) != n:
+                    raise ValueError(f"{name} must have one entry per item")
+            
+            models = await self.registry.best_many(tenant_id, "cost_prediction", list(set(item_ids)))
+            
+            # Resolve each distinct item/vendor once, then group rows by model in one pass
+            resolved: Dict[Tuple[Optional[str], Optional[str]], Optional[Dict[str, Any]]] = {}
+            for key in set(zip(item_ids, vendor_ids)):
+                for candidate in (key, (key[0], None), (None, None)):
+                    if candidate in models:
+                        resolved[key] = models[candidate]
+                        break
+                else:
+                    resolved[key] = None
+            
+            row_models: List[Optional[str]] = []
+            used: Dict[str, Dict[str, Any]] = {}
+            model_rows: Dict[str, List[int]] = {}
+            missing: List[int] = []
+            for row, key in enumerate(zip(item_ids, vendor_ids)):
+                metadata = resolved[key]
+                if metadata is None:
+                    row_models.append(None)
+                    missing.append(row)
+                    continue
+                row_models.append(metadata['model_id'])
+                used[metadata['model_id']] = metadata
+                model_rows.setdefault(metadata['model_id'], []).append(row)
+            
+            # Only the models some row resolved to are loaded, all at once
+            loaded = await asyncio.gather(*(
+                model_cache.aget(Path(metadata['model_path']), loader=_load_forecast_model)
+                for metadata in used.values()
+            ))
+            
+            predictions = np.full((n, forecast_horizon), np.nan)
+            timings = {}
+            for model_id, (model_data, _) in zip(used, loaded):
+                rows = np.asarray(model_rows[model_id], dtype=np.int64)
+                started = time.perf_counter()
+                predictions[rows] = await asyncio.to_thread(
+                    predict_costs,
+                    model_data,
+                    {name: values[rows] for name, values in features.items()},
+                    len(rows),
+                    forecast_horizon
+                )
+                timings[model_id] = {
+                    'items': int(len(rows)),
+                    'seconds': round(time.perf_counter() - started, 4)
+                }
+            
+            predicted_cost = predictions.tolist()
+            for row in missing:
+                predicted_cost[row] = None
+            
+            return {
+                'forecast_horizon': forecast_horizon,
+                'weeks': list(range(1, forecast_horizon + 1)),
+                'item_id': list(item_ids),
+                'vendor_id': vendor_ids,
+                'model_id': row_models,
+                'predicted_cost': predicted_cost,
+                'models': timings,
+                'missing': int(len(missing))
+            }
+            
+        except Exception as e:
+            logger.error(f"Error generating batch cost forecast: {str(e)}")
+            raise
+    
     def _calculate_confidence_intervals(
         self, 
         predictions: List[Dict[str, Any]], 
+        metadata: Dict[str, Any],
         parameters: Dict[str, Any]
-    ) -> Dict[str, Any]:
+    ) -> List[Dict[str, Any]]:
         """
-        Calculate confidence intervals for predictions
+        Calculate a prediction interval for every forecast step
+        
+        Demand models use their stored calibration: split-conformal
+        quantiles of held-out residuals, widening with the lead time past
+        the training data, or a normal approximation when there are too few
+        residuals for the confidence level. Cost models use their held-out
+        RMSE. Models without either (e.g. the global demand model, or demand
+        models trained before calibration was stored) get no intervals.
+        
+        Returns:
+            One {'date' or 'week', 'lower_bound', 'upper_bound',
+            'confidence_level', 'method'} per prediction, or an empty list
         """
-        confidence_level = parameters.get('confidence_level', 0.95)
+        confidence_level = float(parameters.get('confidence_level', 0.95))
         
         if not predictions:
-            return {}
-        
-        # Extract prediction values
-        values = [pred.get('predicted_demand', pred.get('predicted_cost', 0)) for pred in predictions]
+            return []
         
-        # Calculate statistics
-        mean_val = np.mean(values)
-        std_val = np.std(values)
+        value_key = 'predicted_demand' if 'predicted_demand' in predictions[0] else 'predicted_cost'
+        values = np.array([prediction.get(value_key, 0.0) for prediction in predictions], dtype=float)
         
-        # Calculate confidence intervals
-        z_score = 1.96  # 95% confidence level
-        margin_of_error = z_score * (std_val / np.sqrt(len(values)))
+        calibration = metadata.get('calibration')
+        if calibration:
+            training_end = pd.Timestamp(calibration['training_end'])
+            lead_days = np.array([(pd.Timestamp(p['date']) - training_end).days for p in predictions])
+            half_widths, method = interval_half_widths(calibration, lead_days, confidence_level)
+        else:
+            if metadata.get('model_type') != 'cost_prediction':
+                return []
+            half_width = constant_half_width(metadata.get('metrics', {}).get('rmse'), confidence_level)
+            if half_width is None:
+                return []
+            half_widths, method = np.full(len(values), half_width), 'analytic'
         
-        return {
-            'confidence_level': confidence_level,
-            'mean': mean_val,
-            'std': std_val,
-            'margin_of_error': margin_of_error,
-            'lower_bound': mean_val - margin_of_error,
-            'upper_bound': mean_val + margin_of_error
-        }
+        return [
+            {
+                **{key: prediction[key] for key in ('date', 'week') if key in prediction},
+                'lower_bound': float(max(0.0, value - half_width)),
+                'upper_bound': float(value + half_width),
+                'confidence_level': confidence_level,
+                'method': method
+            }
+            for prediction, value, half_width in zip(predictions, values, half_widths)
+        ]
     
     async def _get_best_model(
         self, 
@@ -377,32 +1002,42 @@ class MLService:
     ) -> Optional[Dict[str, Any]]:
         """
         Get the best available model for the given parameters
+        
+        The newest registered model of the series, from the registry's
+        in-process index or a single indexed query.
         """
         try:
-            # Query database for available models
-            models = await self._get_models_from_db(tenant_id, item_id, vendor_id, model_type)
-            
-            if not models:
-                return None
-            
-            # Sort by training date (newest first) and return the best one
-            sorted_models = sorted(models, key=lambda x: x['training_date'], reverse=True)
-            return sorted_models[0]
+            return await self.registry.best(tenant_id, item_id, vendor_id, model_type)
             
         except Exception as e:
             logger.error(f"Error getting best model: {str(e)}")
             return None
     
+    @property
+    def registry(self) -> ModelRegistry:
+        return self.data_service.model_registry
+    
     async def _save_model_metadata(self, metadata: Dict[str, Any]) -> None:
         """
-        Save model metadata to database
+        Save model metadata to the model registry
+        
+        Forecasts cached for the model's series are invalidated.
         """
         try:
-            # This would save to your MongoDB collection
-            # Implementation depends on your data service
-            pass
+            await self.registry.register(metadata)
+            await self._invalidate_forecasts(metadata)
         except Exception as e:
             logger.error(f"Error saving model metadata: {str(e)}")
+            raise
+    
+    async def _invalidate_forecasts(self, metadata: Dict[str, Any]) -> None:
+        """Orphan cached forecasts of a model's series after it is registered or deleted"""
+        forecast_cache = self.data_service.forecast_cache
+        if forecast_cache is not None:
+            await asyncio.to_thread(
+                forecast_cache.bump_model_version,
+                metadata['tenant_id'], metadata.get('item_id'), metadata.get('vendor_id')
+            )
     
     async def _get_models_from_db(
         self, 
@@ -412,67 +1047,269 @@ class MLService:
         model_type: str
     ) -> List[Dict[str, Any]]:
         """
-        Get models from database
+        Get a series' models from the registry, newest first
         """
         try:
-            # This would query your MongoDB collection
-            # Implementation depends on your data service
-            return []
+            models, _ = await self.registry.list(
+                tenant_id,
+                model_type,
+                limit=settings.MODEL_REGISTRY_PAGE_SIZE,
+                query={'item_id': item_id, 'vendor_id': vendor_id}
+            )
+            return models
         except Exception as e:
             logger.error(f"Error getting models from DB: {str(e)}")
             return []
     
-    async def list_models(self, tenant_id: str, model_type: Optional[str] = None) -> List[Dict[str, Any]]:
+    async def list_models(
+        self,
+        tenant_id: str,
+        model_type: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
-        List available models for a tenant
+        List available models for a tenant, newest first
+        
+        Args:
+            tenant_id: Tenant identifier
+            model_type: Restrict to one model type (optional)
+            limit: Models per page (optional, defaults to MODEL_REGISTRY_PAGE_SIZE)
+            cursor: next_cursor of the previous page (optional)
+        
+        Returns:
+            {'models': [...], 'next_cursor': cursor of the next page or None}
         """
         try:
-            # Implementation to list models from database
-            return []
+            models, next_cursor = await self.registry.list(
+                tenant_id, model_type, limit or settings.MODEL_REGISTRY_PAGE_SIZE, cursor
+            )
+            return {'models': models, 'next_cursor': next_cursor}
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"Error listing models: {str(e)}")
-            return []
+            return {'models': [], 'next_cursor': None}
     
     async def get_model_info(self, tenant_id: str, model_id: str) -> Optional[Dict[str, Any]]:
         """
         Get detailed information about a specific model
         """
         try:
-            # Implementation to get model info from database
-            return None
+            return await self.registry.get(tenant_id, model_id)
         except Exception as e:
             logger.error(f"Error getting model info: {str(e)}")
             return None
     
-    async def delete_model(self, tenant_id: str, model_id: str) -> None:
+    async def delete_model(self, tenant_id: str, model_id: str) -> bool:
         """
-        Delete a trained model
+        Delete a trained model's artifact and registry entry
+        
+        Forecasts cached for the model's series are invalidated.
+        
+        Returns:
+            False if the model is not registered
         """
         try:
-            # Implementation to delete model from database and file system
-            pass
+            metadata = await self.registry.get(tenant_id, model_id)
+            if not await self.registry.delete(tenant_id, model_id):
+                return False
+            if metadata is not None:
+                await self._invalidate_forecasts(metadata)
+            return True
         except Exception as e:
             logger.error(f"Error deleting model: {str(e)}")
             raise
     
-    async def retrain_model(self, tenant_id: str, model_id: str) -> None:
+    async def retrain_model(
+        self,
+        tenant_id: str,
+        model_id: str,
+        parameters: Optional[Dict[str, Any]] = None
+    ) -> str:
         """
-        Retrain an existing model
+        Retrain an existing model on its refreshed training window
+        
+        Only the last `training_window_days` days of data (default
+        DEFAULT_TRAINING_WINDOW weeks) are loaded. Prophet demand models are
+        warm-started from the previous version's fitted parameters and the
+        new version is kept only if it beats the old one on the most recent
+        days (see retrain_and_save_demand_model); other model types are
+        refitted from scratch. The fit runs in a worker thread;
+        TrainingExecutor.submit_retrain runs the same steps in its worker
+        processes.
+        
+        Args:
+            tenant_id: Tenant identifier
+            model_id: Model to retrain
+            parameters: Overrides of the previous version's parameters (optional)
+        
+        Returns:
+            The id of the model to use from now on: the new version, or
+            model_id if the previous version was kept
         """
         try:
-            # Implementation to retrain existing model
-            pass
+            previous_path, training_data, model_metadata = await self.prepare_retraining(
+                tenant_id, model_id, parameters
+            )
+            model_metadata = await asyncio.to_thread(
+                retrain_and_save_model,
+                model_metadata['model_type'], previous_path, training_data,
+                model_metadata['parameters'], model_metadata
+            )
+            return await self.complete_retraining(model_metadata)
+            
         except Exception as e:
             logger.error(f"Error retraining model: {str(e)}")
             raise
     
+    async def prepare_retraining(
+        self,
+        tenant_id: str,
+        model_id: str,
+        parameters: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, pd.DataFrame, Dict[str, Any]]:
+        """
+        Load a model's refreshed training window and build its next version's metadata
+        
+        Returns:
+            (previous artifact path, training data, new metadata with
+            parent_model_id set)
+        
+        Raises:
+            ValueError: If the model does not belong to the tenant
+        """
+        registered = await self.registry.get(tenant_id, model_id)
+        previous_path = Path(registered['model_path']) if registered else self._artifact_path(model_id)
+        _, previous_metadata = await model_cache.aget(previous_path, loader=_load_forecast_model)
+        if previous_metadata.get('tenant_id') != tenant_id:
+            raise ValueError(f"Model {model_id} not found for tenant {tenant_id}")
+        
+        model_type = previous_metadata['model_type']
+        # Only the previous version's explicit overrides carry over; tuned values are looked up afresh
+        previous_overrides = previous_metadata.get('parameter_overrides', previous_metadata.get('parameters', {}))
+        parameters = {**previous_overrides, **(parameters or {})}
+        window_days = int(parameters.get('training_window_days', settings.DEFAULT_TRAINING_WINDOW * 7))
+        start_date = (datetime.now() - timedelta(days=window_days)).isoformat()
+        
+        training_data, model_metadata = await self.prepare_training(
+            model_type,
+            previous_metadata.get('item_id'),
+            previous_metadata.get('vendor_id'),
+            tenant_id,
+            parameters,
+            start_date=start_date
+        )
+        model_metadata['parent_model_id'] = model_id
+        return str(previous_path), training_data, model_metadata
+    
+    async def complete_retraining(self, model_metadata: Dict[str, Any]) -> str:
+        """
+        Record a finished retrain and register its new version if it was accepted
+        
+        Returns:
+            The id of the model to use from now on
+        """
+        model_id = model_metadata['parent_model_id']
+        fit_stats.record(model_metadata['model_type'], model_metadata)
+        
+        if model_metadata.get('accepted') is False:
+            holdout = model_metadata['holdout']
+            logger.info(
+                f"Kept model {model_id}: retrained MAE {holdout['candidate_mae']:.3f} "
+                f"is not below {holdout['previous_mae']:.3f}"
+            )
+            return model_id
+        
+        await self._save_model_metadata(model_metadata)
+        
+        logger.info(
+            f"Model {model_id} retrained as {model_metadata['model_id']} "
+            f"in {model_metadata['fit_seconds']:.2f}s (warm start: {model_metadata['warm_start']})"
+        )
+        return model_metadata['model_id']
+    
+    async def tune_demand_model(
+        self,
+        tenant_id: str,
+        item_id: str,
+        vendor_id: str,
+        search_space: Optional[Dict[str, Any]] = None,
+        search: str = 'grid',
+        n_iter: int = 20,
+        metric: str = 'rmse',
+        seed: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Search Prophet parameters of a series by rolling-origin cross-validation
+        
+        Folds are fitted in the tuner's worker processes and scored results
+        are cached by fold content, so re-tuning after new data arrives only
+        fits the new folds. The best parameters are stored in the model
+        registry and used by every later training of the series.
+        
+        Args:
+            tenant_id: Tenant identifier
+            item_id: Item identifier
+            vendor_id: Vendor identifier
+            search_space: Parameter values to search (optional, see
+                prophet_tuning.DEFAULT_SEARCH_SPACE)
+            search: 'grid' or 'random'
+            n_iter: Parameter sets sampled by random search
+            metric: Error to minimize: mae, rmse, mape or smape
+            seed: Random search seed
+        
+        Returns:
+            The tuner's report: best parameters and scores, every candidate's
+            scores, fold cutoffs and how many fold fits were cached
+        """
+        try:
+            training_data = await self.data_service.get_training_data(
+                tenant_id, 'demand', item_id=item_id, vendor_id=vendor_id
+            )
+            if training_data.empty:
+                raise ValueError("Insufficient training data")
+            
+            report = await prophet_tuner.tune(
+                training_data, search_space, search=search, n_iter=n_iter, seed=seed, metric=metric
+            )
+            await self.registry.save_tuned_parameters(
+                tenant_id, item_id, vendor_id, "demand_forecast",
+                report['best_parameters'], report['best_scores']
+            )
+            
+            logger.info(
+                f"Tuned demand model of {item_id}/{vendor_id}: {report['best_parameters']} "
+                f"({report['evaluations'] - report['cached_evaluations']} of {report['evaluations']} "
+                f"fold fits run in {report['seconds']:.1f}s)"
+            )
+            return report
+            
+        except Exception as e:
+            logger.error(f"Error tuning demand model: {str(e)}")
+            raise
+    
+    def _artifact_path(self, model_id: str) -> Path:
+        """Path of an unregistered model's artifact, or of its legacy joblib pickle"""
+        path = self.model_path / f"{model_id}{ARTIFACT_SUFFIX}"
+        legacy_path = self.model_path / f"{model_id}.joblib"
+        if not path.exists() and legacy_path.exists():
+            return legacy_path
+        return path
+    
     async def get_model_performance(self, tenant_id: str, model_type: Optional[str] = None) -> Dict[str, Any]:
         """
         Get performance metrics for models
+        
+        Returns:
+            Registry summary per model type (model count, mean training
+            metrics and fit time) and this process's fit timings
         """
         try:
-            # Implementation to get performance metrics
-            return {}
+            return {
+                'models': await self.registry.performance(tenant_id, model_type),
+                'fit_timings': fit_stats.stats()
+            }
         except Exception as e:
             logger.error(f"Error getting performance metrics: {str(e)}")
             return {}
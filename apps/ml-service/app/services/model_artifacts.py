@@ -0,0 +1,265 @@
+import json
+import logging
+import os
+import shutil
+import uuid
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+ARTIFACT_SUFFIX = '.model'
+SIDECAR_FILE = 'artifact.json'
+ARRAYS_DIR = 'arrays'
+
+# Rows of Prophet training history kept in the artifact; predict() needs a
+# non-empty history and uses the last step of 't' for one-step futures
+PROPHET_HISTORY_ROWS = 2
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date, pd.Timestamp)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+def _save_array(artifact_dir: Path, name: str, array: np.ndarray) -> str:
+    relative = f"{ARRAYS_DIR}/{name}.npy"
+    (artifact_dir / ARRAYS_DIR).mkdir(exist_ok=True)
+    np.save(artifact_dir / relative, np.ascontiguousarray(array), allow_pickle=False)
+    return relative
+
+
+def _load_array(artifact_dir: Path, relative: str) -> np.ndarray:
+    # Read-only maps are shared between every process that opens the artifact
+    try:
+        return np.load(artifact_dir / relative, mmap_mode='r', allow_pickle=False)
+    except ValueError:
+        # Zero-length arrays cannot be mapped
+        return np.load(artifact_dir / relative, allow_pickle=False)
+
+
+def _is_prophet(model: Any) -> bool:
+    return type(model).__name__ == 'Prophet' and hasattr(model, 'params')
+
+
+def _is_xgboost_cost_model(model: Any) -> bool:
+    return isinstance(model, dict) and hasattr(model.get('model'), 'get_booster') and 'scaler' in model
+
+
+def _is_global_demand_model(model: Any) -> bool:
+    return type(model).__name__ == 'GlobalDemandModel'
+
+
+def _save_prophet(artifact_dir: Path, model: Any) -> Dict[str, Any]:
+    from prophet.serialize import model_to_dict
+
+    stripped = model.history, model.history_dates
+    try:
+        # Only the tail of the training history is needed to predict
+        model.history = model.history.tail(PROPHET_HISTORY_ROWS)
+        model.history_dates = model.history_dates.tail(PROPHET_HISTORY_ROWS)
+        model_dict = model_to_dict(model)
+    finally:
+        model.history, model.history_dates = stripped
+
+    params = {
+        name: _save_array(artifact_dir, f"param_{name}", np.asarray(value))
+        for name, value in model.params.items()
+    }
+    model_dict['params'] = {}
+
+    with open(artifact_dir / 'prophet.json', 'w') as f:
+        json.dump(model_dict, f)
+
+    return {'model': 'prophet.json', 'params': params}
+
+
+def _load_prophet(artifact_dir: Path, parts: Dict[str, Any]) -> Any:
+    from prophet.serialize import model_from_dict
+
+    with open(artifact_dir / parts['model']) as f:
+        model = model_from_dict(json.load(f))
+    model.params = {name: _load_array(artifact_dir, path) for name, path in parts['params'].items()}
+    return model
+
+
+def _save_xgboost_cost_model(artifact_dir: Path, model: Dict[str, Any]) -> Dict[str, Any]:
+    model['model'].save_model(str(artifact_dir / 'booster.ubj'))
+
+    scaler = model['scaler']
+    scaler_arrays = {
+        name: _save_array(artifact_dir, f"scaler_{name}", getattr(scaler, name))
+        for name in ('mean_', 'scale_', 'var_')
+        if getattr(scaler, name, None) is not None
+    }
+
+    return {
+        'booster': 'booster.ubj',
+        'scaler': {
+            'params': scaler.get_params(),
+            'arrays': scaler_arrays,
+            'n_features_in_': int(scaler.n_features_in_),
+            'n_samples_seen_': np.asarray(scaler.n_samples_seen_).tolist()
+        },
+        'feature_columns': list(model['feature_columns']),
+        'metrics': {k: float(v) for k, v in model.get('metrics', {}).items()}
+    }
+
+
+def _load_xgboost_cost_model(artifact_dir: Path, parts: Dict[str, Any]) -> Dict[str, Any]:
+    from sklearn.preprocessing import StandardScaler
+    from xgboost import XGBRegressor
+
+    regressor = XGBRegressor()
+    regressor.load_model(str(artifact_dir / parts['booster']))
+
+    scaler_parts = parts['scaler']
+    scaler = StandardScaler(**scaler_parts['params'])
+    for name, path in scaler_parts['arrays'].items():
+        setattr(scaler, name, _load_array(artifact_dir, path))
+    scaler.n_features_in_ = scaler_parts['n_features_in_']
+    scaler.n_samples_seen_ = np.asarray(scaler_parts['n_samples_seen_'])
+
+    return {
+        'model': regressor,
+        'scaler': scaler,
+        'feature_columns': parts['feature_columns'],
+        'metrics': parts['metrics']
+    }
+
+
+def _save_global_demand_model(artifact_dir: Path, model: Any) -> Dict[str, Any]:
+    model.regressor.save_model(str(artifact_dir / 'booster.ubj'))
+
+    arrays = {
+        name: _save_array(artifact_dir, f"global_{name}", value)
+        for name, value in model.state_arrays().items()
+    }
+    return {'booster': 'booster.ubj', 'arrays': arrays, 'config': model.config()}
+
+
+def _load_global_demand_model(artifact_dir: Path, parts: Dict[str, Any]) -> Any:
+    from xgboost import XGBRegressor
+    from app.services.global_demand_model import GlobalDemandModel
+
+    regressor = XGBRegressor()
+    regressor.load_model(str(artifact_dir / parts['booster']))
+
+    arrays = {name: _load_array(artifact_dir, path) for name, path in parts['arrays'].items()}
+    return GlobalDemandModel.from_state(parts['config'], arrays, regressor)
+
+
+def save_artifact(path: Path, model: Any, metadata: Dict[str, Any]) -> str:
+    """
+    Save a model as a versioned artifact directory
+
+    Layout of <path> (a directory ending in .model):
+      - artifact.json: format version, model kind, metadata and part paths
+      - prophet.json: Prophet model_to_json output with the training
+        history reduced to its last rows and params moved to arrays/
+      - booster.ubj: XGBoost booster in native UBJSON (cost and global
+        demand models)
+      - arrays/*.npy: numeric arrays, opened with mmap_mode='r' on load
+      - model.joblib: anything else, as a joblib pickle
+
+    The directory is written under a temporary name and renamed into
+    place, so readers never see a partial artifact.
+
+    Returns:
+        The artifact path
+    """
+    path = Path(path)
+    tmp_dir = path.parent / f".{path.name}.{uuid.uuid4().hex[:8]}.tmp"
+    tmp_dir.mkdir(parents=True)
+
+    try:
+        if _is_prophet(model):
+            kind, parts = 'prophet', _save_prophet(tmp_dir, model)
+        elif _is_xgboost_cost_model(model):
+            kind, parts = 'xgboost_cost', _save_xgboost_cost_model(tmp_dir, model)
+        elif _is_global_demand_model(model):
+            kind, parts = 'global_demand', _save_global_demand_model(tmp_dir, model)
+        else:
+            joblib.dump(model, tmp_dir / 'model.joblib')
+            kind, parts = 'joblib', {'model': 'model.joblib'}
+
+        sidecar = {
+            'format_version': FORMAT_VERSION,
+            'kind': kind,
+            'metadata': metadata,
+            'parts': parts
+        }
+        with open(tmp_dir / SIDECAR_FILE, 'w') as f:
+            json.dump(sidecar, f, default=_json_default)
+
+        if path.exists():
+            shutil.rmtree(path)
+        os.rename(tmp_dir, path)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    return str(path)
+
+
+def load_metadata(path: Path) -> Dict[str, Any]:
+    """Read only the metadata sidecar of an artifact"""
+    with open(Path(path) / SIDECAR_FILE) as f:
+        return json.load(f)['metadata']
+
+
+def load_artifact(path: Path) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Load a model saved by save_artifact
+
+    Returns:
+        (model, metadata)
+    """
+    artifact_dir = Path(path)
+    with open(artifact_dir / SIDECAR_FILE) as f:
+        sidecar = json.load(f)
+
+    if sidecar['format_version'] > FORMAT_VERSION:
+        raise ValueError(f"Unsupported model artifact format {sidecar['format_version']}: {path}")
+
+    kind, parts = sidecar['kind'], sidecar['parts']
+    if kind == 'prophet':
+        model = _load_prophet(artifact_dir, parts)
+    elif kind == 'xgboost_cost':
+        model = _load_xgboost_cost_model(artifact_dir, parts)
+    elif kind == 'global_demand':
+        model = _load_global_demand_model(artifact_dir, parts)
+    elif kind == 'joblib':
+        model = joblib.load(artifact_dir / parts['model'], mmap_mode='r')
+    else:
+        raise ValueError(f"Unknown model artifact kind {kind}: {path}")
+
+    return model, sidecar['metadata']
+
+
+def artifact_size(path: Path) -> int:
+    """Total size on disk of an artifact directory or legacy pickle"""
+    path = Path(path)
+    if not path.is_dir():
+        return path.stat().st_size
+    return sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
+
+
+def delete_artifact(path: Path) -> None:
+    """Delete an artifact directory or legacy pickle if it exists"""
+    path = Path(path)
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        os.remove(path)
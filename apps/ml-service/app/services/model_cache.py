@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+import joblib
+
+from app.core.config import settings
+from app.services.model_artifacts import artifact_size
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry(NamedTuple):
+    value: Any
+    size: int
+    mtime_ns: int
+    version: Optional[str]
+
+
+class ModelCache:
+    """
+    Process-wide LRU cache of deserialized model artifacts
+
+    Entries are keyed by artifact path and bounded by their estimated size
+    (the artifact's size on disk). Every lookup stats the artifact, so an
+    artifact rewritten in place, or looked up under a different version, is
+    reloaded rather than served stale. Concurrent loads of the same path
+    share one deserialization: the first caller loads while the others wait
+    on the path's lock and then hit the cache.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, path: str, version: Optional[str] = None, loader: Callable[[str], Any] = joblib.load) -> Any:
+        """
+        Return the loaded artifact at path, deserializing it only on a miss
+
+        Args:
+            path: Artifact path
+            version: Model version the caller expects (optional)
+            loader: Function that deserializes the artifact
+
+        Raises:
+            FileNotFoundError: If the artifact does not exist
+        """
+        path = str(path)
+        stat = os.stat(path)
+
+        cached = self._lookup(path, stat.st_mtime_ns, version)
+        if cached is not None:
+            return cached.value
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(path, threading.Lock())
+
+        with load_lock:
+            # Another caller may have finished loading while we waited
+            cached = self._lookup(path, stat.st_mtime_ns, version)
+            if cached is not None:
+                return cached.value
+
+            with self._lock:
+                self.misses += 1
+
+            value = loader(path)
+            self._store(path, _Entry(value, artifact_size(path), stat.st_mtime_ns, version))
+            return value
+
+    async def aget(self, path: str, version: Optional[str] = None, loader: Callable[[str], Any] = joblib.load) -> Any:
+        """Async variant of get that deserializes off the event loop"""
+        path = str(path)
+        # Serve hot models without a thread hop; only misses leave the event loop
+        try:
+            cached = self._lookup(path, os.stat(path).st_mtime_ns, version)
+        except FileNotFoundError:
+            cached = None
+        if cached is not None:
+            return cached.value
+        return await asyncio.to_thread(self.get, path, version, loader)
+
+    def invalidate(self, path: str) -> None:
+        """Drop a cached artifact, e.g. after deleting it"""
+        with self._lock:
+            entry = self._entries.pop(str(path), None)
+            if entry is not None:
+                self._bytes -= entry.size
+            self._load_locks.pop(str(path), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit, miss and eviction counters and current occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def _lookup(self, path: str, mtime_ns: int, version: Optional[str]) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                return None
+
+            if entry.mtime_ns != mtime_ns or (version is not None and entry.version != version):
+                # Artifact was rewritten; drop the stale copy and reload
+                self._entries.pop(path)
+                self._bytes -= entry.size
+                return None
+
+            self._entries.move_to_end(path)
+            self.hits += 1
+            return entry
+
+    def _store(self, path: str, entry: _Entry) -> None:
+        if entry.size > self.max_bytes:
+            logger.debug(f"Model artifact {path} ({entry.size} bytes) exceeds the cache size, not caching")
+            return
+
+        with self._lock:
+            previous = self._entries.pop(path, None)
+            if previous is not None:
+                self._bytes -= previous.size
+
+            while self._entries and self._bytes + entry.size > self.max_bytes:
+                evicted_path, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+                logger.debug(f"Evicted model artifact {evicted_path} from cache")
+
+            self._entries[path] = entry
+            self._bytes += entry.size
+
+
+model_cache = ModelCache(settings.MODEL_CACHE_MAX_BYTES)
@@ -0,0 +1,330 @@
+import asyncio
+import base64
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from app.services.model_artifacts import delete_artifact
+from app.services.model_cache import model_cache
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_COLLECTION = 'ml_models'
+# Best hyperparameters found per series, keyed by tenant:item:vendor:model_type
+TUNING_COLLECTION = 'ml_tuning'
+
+# Equality fields lead, then training_date descending, so the newest model of
+# a series and every page of a listing are index scans that stop early
+MODEL_REGISTRY_INDEXES = [
+    IndexModel(
+        [('tenant_id', ASCENDING), ('item_id', ASCENDING), ('vendor_id', ASCENDING),
+         ('model_type', ASCENDING), ('training_date', DESCENDING)],
+        name='tenant_item_vendor_type_trainingDate'
+    ),
+    IndexModel(
+        [('tenant_id', ASCENDING), ('model_type', ASCENDING), ('training_date', DESCENDING), ('_id', DESCENDING)],
+        name='tenant_type_trainingDate'
+    ),
+    IndexModel(
+        [('tenant_id', ASCENDING), ('training_date', DESCENDING), ('_id', DESCENDING)],
+        name='tenant_trainingDate'
+    ),
+]
+
+SeriesKey = Tuple[str, Optional[str], Optional[str], str]
+
+
+def encode_cursor(training_date: datetime, model_id: str) -> str:
+    """Opaque pagination cursor pointing after a listed model"""
+    return base64.urlsafe_b64encode(f"{training_date.isoformat()}|{model_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        training_date, model_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|', 1)
+        return datetime.fromisoformat(training_date), model_id
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def _to_metadata(document: Dict[str, Any]) -> Dict[str, Any]:
+    document.pop('_id', None)
+    document.pop('deleting', None)
+    return document
+
+
+class ModelRegistry:
+    """
+    MongoDB registry of the models MLService trains
+
+    One document per model, keyed by model_id, in a collection shared by
+    every tenant. Models being deleted are flagged before their artifact is
+    removed and are invisible to lookups from then on, so the registry
+    never hands out a model whose artifact is gone; if removing the
+    artifact fails the flagged entry is left for a retried delete.
+
+    The newest model of each tenant/item/vendor/model type is kept in an
+    in-process read-through index for `cache_ttl_seconds`, and is dropped
+    as soon as this process registers or deletes a model of that series.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase, cache_ttl_seconds: float = 60):
+        self.collection = db[REGISTRY_COLLECTION]
+        self.tuning = db[TUNING_COLLECTION]
+        self.cache_ttl_seconds = cache_ttl_seconds
+        # series key -> (monotonic time fetched, metadata or None)
+        self._best: Dict[SeriesKey, Tuple[float, Optional[Dict[str, Any]]]] = {}
+        self._indexed = False
+        self.hits = 0
+        self.misses = 0
+
+    async def ensure_indexes(self) -> None:
+        """Create the registry indexes once per process"""
+        if self._indexed:
+            return
+        # create_indexes is a no-op for indexes that already exist
+        await self.collection.create_indexes(MODEL_REGISTRY_INDEXES)
+        self._indexed = True
+
+    async def register(self, metadata: Dict[str, Any]) -> None:
+        """Insert or replace the entry of a trained model"""
+        await self.ensure_indexes()
+        document = {**metadata, '_id': metadata['model_id']}
+        await self.collection.replace_one({'_id': document['_id']}, document, upsert=True)
+        self._best.pop(self._key(metadata), None)
+
+    async def get(self, tenant_id: str, model_id: str) -> Optional[Dict[str, Any]]:
+        """Return the metadata of one model, or None if it is not registered"""
+        document = await self.collection.find_one(
+            {'_id': model_id, 'tenant_id': tenant_id, 'deleting': {'$ne': True}}
+        )
+        return _to_metadata(document) if document else None
+
+    async def best(
+        self,
+        tenant_id: str,
+        item_id: Optional[str],
+        vendor_id: Optional[str],
+        model_type: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return the newest model of a series
+
+        Served from the in-process index while fresh, otherwise one find_one
+        walking tenant_item_vendor_type_trainingDate from its newest entry.
+        """
+        key = (tenant_id, item_id, vendor_id, model_type)
+        cached = self._best.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.cache_ttl_seconds:
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        fetched_at = time.monotonic()
+        document = await self.collection.find_one(
+            {
+                'tenant_id': tenant_id,
+                'item_id': item_id,
+                'vendor_id': vendor_id,
+                'model_type': model_type,
+                'deleting': {'$ne': True}
+            },
+            sort=[('training_date', DESCENDING)]
+        )
+        metadata = _to_metadata(document) if document else None
+        self._best[key] = (fetched_at, metadata)
+        return metadata
+
+    async def best_many(
+        self,
+        tenant_id: str,
+        model_type: str,
+        item_ids: List[Optional[str]]
+    ) -> Dict[Tuple[Optional[str], Optional[str]], Dict[str, Any]]:
+        """
+        Return the newest model of every series of the given items in one aggregation
+
+        Covers every vendor of each item, and the item-less (tenant-wide)
+        series, so callers can fall back from an item/vendor model to an
+        item model to a tenant model without further queries.
+
+        Returns:
+            Mapping of (item_id, vendor_id) to metadata
+        """
+        pipeline = [
+            {'$match': {
+                'tenant_id': tenant_id,
+                'model_type': model_type,
+                'item_id': {'$in': list({*item_ids, None})},
+                'deleting': {'$ne': True}
+            }},
+            {'$sort': {'training_date': DESCENDING}},
+            {'$group': {
+                '_id': {'item_id': '$item_id', 'vendor_id': '$vendor_id'},
+                'model': {'$first': '$$ROOT'}
+            }}
+        ]
+        fetched_at = time.monotonic()
+        models = {}
+        async for row in self.collection.aggregate(pipeline, allowDiskUse=True):
+            metadata = _to_metadata(row['model'])
+            models[(metadata.get('item_id'), metadata.get('vendor_id'))] = metadata
+            self._best[self._key(metadata)] = (fetched_at, metadata)
+        return models
+
+    async def list(
+        self,
+        tenant_id: str,
+        model_type: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        query: Optional[Dict[str, Any]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        List a tenant's models, newest first, one page at a time
+
+        Pages are keyset-paginated on (training_date, model_id), so reading
+        page N costs the same as reading the first.
+
+        Args:
+            tenant_id: Tenant identifier
+            model_type: Restrict to one model type (optional)
+            limit: Models per page
+            cursor: next_cursor of the previous page (optional)
+            query: Further equality filters, e.g. {'item_id': ...} (optional)
+
+        Returns:
+            (models, next_cursor), with next_cursor None on the last page
+        """
+        match: Dict[str, Any] = {**(query or {}), 'tenant_id': tenant_id, 'deleting': {'$ne': True}}
+        if model_type is not None:
+            match['model_type'] = model_type
+        if cursor is not None:
+            training_date, model_id = decode_cursor(cursor)
+            match['$or'] = [
+                {'training_date': {'$lt': training_date}},
+                {'training_date': training_date, '_id': {'$lt': model_id}}
+            ]
+
+        documents = await self.collection.find(match) \
+            .sort([('training_date', DESCENDING), ('_id', DESCENDING)]) \
+            .limit(limit + 1) \
+            .to_list(length=limit + 1)
+
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            next_cursor = encode_cursor(documents[-1]['training_date'], documents[-1]['_id'])
+        return [_to_metadata(document) for document in documents], next_cursor
+
+    async def update(self, tenant_id: str, model_id: str, fields: Dict[str, Any]) -> bool:
+        """Set fields on a model's entry; returns False if it is not registered"""
+        document = await self.collection.find_one_and_update(
+            {'_id': model_id, 'tenant_id': tenant_id, 'deleting': {'$ne': True}},
+            {'$set': fields}
+        )
+        if document is None:
+            return False
+        self._best.pop(self._key(document), None)
+        return True
+
+    async def delete(self, tenant_id: str, model_id: str) -> bool:
+        """
+        Delete a model's artifact and registry entry
+
+        Returns:
+            False if the model is not registered
+        """
+        document = await self.collection.find_one_and_update(
+            {'_id': model_id, 'tenant_id': tenant_id},
+            {'$set': {'deleting': True}}
+        )
+        if document is None:
+            return False
+        self._best.pop(self._key(document), None)
+
+        await asyncio.to_thread(delete_artifact, document['model_path'])
+        model_cache.invalidate(document['model_path'])
+        await self.collection.delete_one({'_id': model_id})
+        return True
+
+    async def performance(self, tenant_id: str, model_type: Optional[str] = None) -> Dict[str, Any]:
+        """Summarize a tenant's models per model type in one aggregation"""
+        match: Dict[str, Any] = {'tenant_id': tenant_id, 'deleting': {'$ne': True}}
+        if model_type is not None:
+            match['model_type'] = model_type
+
+        pipeline = [
+            {'$match': match},
+            {'$group': {
+                '_id': '$model_type',
+                'models': {'$sum': 1},
+                'latest_training_date': {'$max': '$training_date'},
+                'mean_data_points': {'$avg': '$data_points'},
+                'mean_fit_seconds': {'$avg': '$fit_seconds'},
+                'mae': {'$avg': '$metrics.mae'},
+                'rmse': {'$avg': '$metrics.rmse'},
+                'r2': {'$avg': '$metrics.r2'}
+            }}
+        ]
+        summary = {}
+        async for row in self.collection.aggregate(pipeline):
+            summary[row.pop('_id')] = row
+        return summary
+
+    async def save_tuned_parameters(
+        self,
+        tenant_id: str,
+        item_id: Optional[str],
+        vendor_id: Optional[str],
+        model_type: str,
+        parameters: Dict[str, Any],
+        scores: Dict[str, float]
+    ) -> None:
+        """Record the best parameters found for a series, replacing earlier ones"""
+        key = (tenant_id, item_id, vendor_id, model_type)
+        await self.tuning.replace_one(
+            {'_id': self._tuning_id(key)},
+            {
+                'tenant_id': tenant_id,
+                'item_id': item_id,
+                'vendor_id': vendor_id,
+                'model_type': model_type,
+                'parameters': parameters,
+                'scores': scores,
+                'tuned_at': datetime.now()
+            },
+            upsert=True
+        )
+
+    async def tuned_parameters(
+        self,
+        tenant_id: str,
+        item_id: Optional[str],
+        vendor_id: Optional[str],
+        model_type: str
+    ) -> Optional[Dict[str, Any]]:
+        """Return the tuned parameters of a series, or None if it was never tuned"""
+        document = await self.tuning.find_one({'_id': self._tuning_id((tenant_id, item_id, vendor_id, model_type))})
+        if document:
+            document.pop('_id')
+        return document
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._best),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    def _tuning_id(self, key: SeriesKey) -> str:
+        return ':'.join(str(part) for part in key)
+
+    def _key(self, metadata: Dict[str, Any]) -> SeriesKey:
+        return (metadata['tenant_id'], metadata.get('item_id'), metadata.get('vendor_id'), metadata['model_type'])
@@ -0,0 +1,151 @@
+import ast
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from redis import Redis
+
+logger = logging.getLogger(__name__)
+
+METADATA_KEY = "model_versions:{tenant_id}:{model_name}"
+INDEX_KEY = "model_versions_idx:{tenant_id}:{model_name}"
+LEGACY_KEY = "model_metadata:{tenant_id}:{model_name}"
+
+
+def _decode(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class ModelVersionRegistry:
+    """
+    Redis registry of saved model versions
+
+    Each model keeps two keys:
+      - model_versions:<tenant>:<model>: hash of version -> JSON metadata
+      - model_versions_idx:<tenant>:<model>: sorted set of versions scored
+        by creation time, so the latest version is a ZREVRANGE of one item
+
+    Multi-key reads go through a single pipeline, so listing every version
+    of a model costs one round trip regardless of how many there are.
+    Metadata written by the old str()/eval() format is imported the first
+    time a lookup misses, and is parsed as a literal rather than evaluated.
+    """
+
+    def __init__(self, redis_client: Redis, batch_size: int = 500):
+        self.redis_client = redis_client
+        self.batch_size = batch_size
+
+    def register(self, tenant_id: str, model_name: str, version: str, metadata: Dict[str, Any]) -> None:
+        """Store metadata for a version and index it by its created_at"""
+        created_at = datetime.fromisoformat(metadata['created_at']).timestamp()
+        pipe = self.redis_client.pipeline(transaction=True)
+        pipe.hset(METADATA_KEY.format(tenant_id=tenant_id, model_name=model_name), version, json.dumps(metadata))
+        pipe.zadd(INDEX_KEY.format(tenant_id=tenant_id, model_name=model_name), {version: created_at})
+        pipe.execute()
+
+    def get(self, tenant_id: str, model_name: str, version: str) -> Optional[Dict[str, Any]]:
+        """Return the metadata for one version, or None if it is not registered"""
+        key = METADATA_KEY.format(tenant_id=tenant_id, model_name=model_name)
+        value = self.redis_client.hget(key, version)
+        if value is None and self._import_legacy(tenant_id, model_name):
+            value = self.redis_client.hget(key, version)
+        return json.loads(value) if value else None
+
+    def latest(self, tenant_id: str, model_name: str) -> Optional[Dict[str, Any]]:
+        """Return the metadata of the most recently created version"""
+        key = INDEX_KEY.format(tenant_id=tenant_id, model_name=model_name)
+        versions = self.redis_client.zrevrange(key, 0, 0)
+        if not versions and self._import_legacy(tenant_id, model_name):
+            versions = self.redis_client.zrevrange(key, 0, 0)
+        if not versions:
+            return None
+        return self.get(tenant_id, model_name, _decode(versions[0]))
+
+    def list(self, tenant_id: str, model_name: str) -> List[Dict[str, Any]]:
+        """Return metadata for every version, newest first, in one round trip"""
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.zrevrange(INDEX_KEY.format(tenant_id=tenant_id, model_name=model_name), 0, -1)
+        pipe.hgetall(METADATA_KEY.format(tenant_id=tenant_id, model_name=model_name))
+        versions, values = pipe.execute()
+
+        if not versions and self._import_legacy(tenant_id, model_name):
+            return self.list(tenant_id, model_name)
+
+        values = {_decode(k): v for k, v in values.items()}
+        return [json.loads(values[_decode(v)]) for v in versions if _decode(v) in values]
+
+    def remove(self, tenant_id: str, model_name: str, versions: List[str]) -> None:
+        """Unregister versions; the caller owns deleting their artifacts"""
+        if not versions:
+            return
+        pipe = self.redis_client.pipeline(transaction=True)
+        pipe.hdel(METADATA_KEY.format(tenant_id=tenant_id, model_name=model_name), *versions)
+        pipe.zrem(INDEX_KEY.format(tenant_id=tenant_id, model_name=model_name), *versions)
+        pipe.execute()
+
+    def model_names(self, tenant_id: str) -> Iterator[str]:
+        """Yield every model name registered for a tenant using SCAN"""
+        prefix = INDEX_KEY.format(tenant_id=tenant_id, model_name='')
+        for key in self.redis_client.scan_iter(match=f"{prefix}*", count=self.batch_size):
+            yield _decode(key)[len(prefix):]
+
+    def expired(self, tenant_id: str, max_versions: int) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Find versions beyond the newest max_versions of each model
+
+        Model keys are found with SCAN and the candidates for each batch of
+        models are fetched with one pipelined round trip.
+
+        Returns:
+            Mapping of model name to the metadata of its expired versions
+        """
+        legacy_prefix = LEGACY_KEY.format(tenant_id=tenant_id, model_name='')
+        for key in self.redis_client.scan_iter(match=f"{legacy_prefix}*", count=self.batch_size):
+            self._import_legacy(tenant_id, _decode(key)[len(legacy_prefix):])
+
+        expired: Dict[str, List[Dict[str, Any]]] = {}
+        names = list(self.model_names(tenant_id))
+
+        for start in range(0, len(names), self.batch_size):
+            batch = names[start:start + self.batch_size]
+
+            pipe = self.redis_client.pipeline(transaction=False)
+            for name in batch:
+                pipe.zrevrange(INDEX_KEY.format(tenant_id=tenant_id, model_name=name), max_versions, -1)
+            candidates = pipe.execute()
+
+            pipe = self.redis_client.pipeline(transaction=False)
+            lookups = []
+            for name, versions in zip(batch, candidates):
+                if versions:
+                    pipe.hmget(METADATA_KEY.format(tenant_id=tenant_id, model_name=name), versions)
+                    lookups.append(name)
+            for name, values in zip(lookups, pipe.execute() if lookups else []):
+                expired[name] = [json.loads(v) for v in values if v]
+
+        return expired
+
+    def _import_legacy(self, tenant_id: str, model_name: str) -> bool:
+        """
+        Move metadata stored by the old str()/eval() format into the registry
+
+        Returns:
+            True if any legacy entries were found
+        """
+        legacy_key = LEGACY_KEY.format(tenant_id=tenant_id, model_name=model_name)
+        entries = self.redis_client.hgetall(legacy_key)
+        if not entries:
+            return False
+
+        for version, value in entries.items():
+            try:
+                # literal_eval only accepts literals, unlike the eval() it replaces
+                metadata = ast.literal_eval(_decode(value))
+                self.register(tenant_id, model_name, _decode(version), metadata)
+            except (ValueError, SyntaxError, KeyError) as e:
+                logger.warning(f"Skipping unreadable legacy metadata for {model_name} {_decode(version)}: {str(e)}")
+
+        self.redis_client.delete(legacy_key)
+        logger.info(f"Imported {len(entries)} legacy model versions for {model_name} and tenant {tenant_id}")
+        return True
@@ -0,0 +1,98 @@
+import logging
+from datetime import datetime
+from statistics import NormalDist
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def lead_scale(lead_days: np.ndarray, window_days: int) -> np.ndarray:
+    """
+    Relative error spread at each lead time
+
+    About 1 across the calibration window and growing with the square root
+    of the distance past it, so forecasts further out than anything the
+    model was calibrated on get wider intervals.
+    """
+    return np.sqrt(1 + np.maximum(np.asarray(lead_days, dtype=np.float64), 0) / max(window_days, 1))
+
+
+def conformal_quantile(scores: np.ndarray, level: float) -> float:
+    """
+    Split-conformal quantile of nonconformity scores
+
+    The ceil((n + 1) * level)-th smallest of n scores, which covers a new
+    exchangeable score with probability at least `level`; inf when there
+    are too few scores for that guarantee.
+    """
+    n = len(scores)
+    rank = int(np.ceil((n + 1) * level))
+    if n == 0 or rank > n:
+        return float('inf')
+    return float(np.sort(scores)[rank - 1])
+
+
+def demand_calibration(
+    residuals: np.ndarray,
+    lead_days: np.ndarray,
+    in_sample_sigma: float,
+    window_days: int,
+    training_end: datetime
+) -> Dict[str, Any]:
+    """
+    Calibration record of a demand model, stored in its metadata
+
+    Args:
+        residuals: Actual minus predicted demand of a fit that did not see
+            the last window_days days, on those days
+        lead_days: Days from that fit's last training day to each residual
+        in_sample_sigma: Residual standard deviation of the final model on
+            its training data, for the analytic fallback
+        window_days: Length of the calibration window
+        training_end: Last training day of the final model
+    """
+    return {
+        'window_days': int(window_days),
+        'lead_days': [int(d) for d in lead_days],
+        'residuals': [round(float(r), 6) for r in residuals],
+        'in_sample_sigma': float(in_sample_sigma),
+        'training_end': training_end.isoformat()
+    }
+
+
+def interval_half_widths(
+    calibration: Dict[str, Any],
+    lead_days: np.ndarray,
+    level: float
+) -> Tuple[np.ndarray, str]:
+    """
+    Half-widths of the `level` prediction interval at each lead time
+
+    Split conformal: each calibration residual is scaled by lead_scale at
+    its own lead time, the conformal quantile of the scaled absolute
+    residuals is taken, and it is scaled back at the requested lead times.
+    With too few residuals for the level, falls back to a normal
+    approximation from the in-sample residual spread.
+
+    Returns:
+        (half-widths, 'conformal' or 'analytic')
+    """
+    window_days = calibration['window_days']
+    residuals = np.abs(np.asarray(calibration['residuals'], dtype=np.float64))
+    scores = residuals / lead_scale(calibration['lead_days'], window_days)
+
+    quantile = conformal_quantile(scores, level)
+    if np.isfinite(quantile):
+        return quantile * lead_scale(lead_days, window_days), 'conformal'
+
+    z = NormalDist().inv_cdf(0.5 + level / 2)
+    return z * calibration['in_sample_sigma'] * lead_scale(lead_days, window_days), 'analytic'
+
+
+def constant_half_width(rmse: Optional[float], level: float) -> Optional[float]:
+    """Normal-approximation half-width from a held-out RMSE, for models without a time dimension"""
+    if rmse is None:
+        return None
+    return NormalDist().inv_cdf(0.5 + level / 2) * float(rmse)
@@ -0,0 +1,365 @@
+import asyncio
+import hashlib
+import itertools
+import json
+import logging
+import multiprocessing as mp
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bump to invalidate every cached fold result, e.g. when the fit or the metrics change
+TUNING_FORMAT = 1
+
+DEFAULT_SEARCH_SPACE: Dict[str, Any] = {
+    'changepoint_prior_scale': [0.001, 0.01, 0.1, 0.5],
+    'seasonality_prior_scale': [0.01, 0.1, 1.0, 10.0],
+    'seasonality_mode': ['additive', 'multiplicative'],
+}
+
+METRICS = ('mae', 'rmse', 'mape', 'smape')
+
+
+class Fold(NamedTuple):
+    cutoff: pd.Timestamp
+    digest: str
+    path: str
+
+
+def rolling_origin_cutoffs(
+    first: pd.Timestamp,
+    last: pd.Timestamp,
+    initial_days: int,
+    period_days: int,
+    horizon_days: int
+) -> List[pd.Timestamp]:
+    """
+    Cutoffs every period_days from first + initial_days whose test window fits
+
+    Cutoffs are anchored at the first day of history rather than the last,
+    so appending data keeps every earlier cutoff (and its fold) unchanged
+    and only adds new ones at the end.
+    """
+    cutoffs = []
+    cutoff = first + timedelta(days=initial_days - 1)
+    while cutoff + timedelta(days=horizon_days) <= last:
+        cutoffs.append(cutoff)
+        cutoff += timedelta(days=period_days)
+    return cutoffs
+
+
+def parameter_candidates(
+    space: Dict[str, Any],
+    search: str = 'grid',
+    n_iter: int = 20,
+    seed: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    Parameter sets to evaluate
+
+    Args:
+        space: Parameter name to a list of values, or for random search
+            also to {'low': ..., 'high': ..., 'log': bool} ranges
+        search: 'grid' for every combination, 'random' for n_iter samples
+        n_iter: Samples drawn by random search
+        seed: Random search seed
+
+    Raises:
+        ValueError: For an unknown search or a range in a grid search
+    """
+    if search == 'grid':
+        if any(not isinstance(values, list) for values in space.values()):
+            raise ValueError("Grid search needs a list of values for every parameter")
+        names = list(space)
+        return [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+
+    if search != 'random':
+        raise ValueError(f"Unknown search: {search}")
+
+    rng = np.random.default_rng(seed)
+    candidates, seen = [], set()
+    for _ in range(n_iter):
+        candidate = {}
+        for name, values in space.items():
+            if isinstance(values, list):
+                candidate[name] = values[rng.integers(len(values))]
+            elif values.get('log'):
+                candidate[name] = float(np.exp(rng.uniform(np.log(values['low']), np.log(values['high']))))
+            else:
+                candidate[name] = float(rng.uniform(values['low'], values['high']))
+        key = json.dumps(candidate, sort_keys=True, default=str)
+        if key not in seen:
+            seen.add(key)
+            candidates.append(candidate)
+    return candidates
+
+
+def fold_errors(actual: np.ndarray, predicted: np.ndarray) -> Dict[str, float]:
+    """MAE, RMSE, MAPE (over non-zero actuals) and sMAPE of one fold, percentages as 0-100"""
+    error = actual - predicted
+    nonzero = actual != 0
+    denominator = np.abs(actual) + np.abs(predicted)
+    return {
+        'mae': float(np.mean(np.abs(error))),
+        'rmse': float(np.sqrt(np.mean(error ** 2))),
+        'mape': float(np.mean(np.abs(error[nonzero] / actual[nonzero])) * 100) if nonzero.any() else float('nan'),
+        'smape': float(np.mean(np.where(denominator > 0, 2 * np.abs(error) / np.where(denominator > 0, denominator, 1), 0)) * 100)
+    }
+
+
+def evaluate_fold(fold_path: str, parameters: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Fit Prophet on a fold's training rows and score it on its test rows
+
+    Runs in tuning worker processes, so it takes the fold's path rather
+    than its data.
+    """
+    from app.services.ml_service import fit_demand_model, prophet_point_forecast
+
+    # Prophet and cmdstanpy log every fit
+    logging.getLogger('cmdstanpy').disabled = True
+    logging.getLogger('prophet').setLevel(logging.WARNING)
+
+    with np.load(fold_path) as fold:
+        dates = pd.to_datetime(fold['dates'])
+        values = fold['values']
+        n_train = int(fold['n_train'])
+
+    model = fit_demand_model(
+        pd.DataFrame({'date': dates[:n_train], 'quantity': values[:n_train]}),
+        parameters
+    )
+    return fold_errors(values[n_train:], prophet_point_forecast(model, pd.Series(dates[n_train:])))
+
+
+def result_key(fold_digest: str, parameters: Dict[str, Any]) -> str:
+    payload = json.dumps(
+        {'format': TUNING_FORMAT, 'fold': fold_digest, 'parameters': parameters},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class TuningCache:
+    """
+    Content-addressed on-disk cache of cross-validation folds and their scores
+
+    Layout under <root>:
+      - folds/<digest>.npz: a fold's dates, values and training row count,
+        named by the SHA-256 of that content
+      - results/<key>.json: the errors of one parameter set on one fold,
+        named by the SHA-256 of the fold digest and the parameters
+
+    Identical folds always get the same name, so re-tuning after new days
+    arrive finds every earlier fold and its results already cached and
+    only evaluates the new cutoffs. Files are written under temporary
+    names and renamed into place; the directory can be deleted at any time.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def folds(
+        self,
+        data: pd.DataFrame,
+        initial_days: int,
+        period_days: int,
+        horizon_days: int,
+        max_folds: Optional[int] = None
+    ) -> List[Fold]:
+        """
+        Split a daily demand series into rolling-origin folds and store them
+
+        Args:
+            data: Demand with 'date' and 'quantity' columns
+            initial_days: Days of history before the first cutoff
+            period_days: Days between cutoffs
+            horizon_days: Days after each cutoff to score on
+            max_folds: Keep only the latest folds (optional)
+        """
+        data = data.sort_values('date')
+        dates = pd.to_datetime(data['date']).to_numpy(dtype='datetime64[ns]')
+        values = data['quantity'].fillna(0).to_numpy(dtype=np.float64)
+        if not len(dates):
+            return []
+
+        cutoffs = rolling_origin_cutoffs(
+            pd.Timestamp(dates[0]), pd.Timestamp(dates[-1]), initial_days, period_days, horizon_days
+        )
+        if max_folds:
+            cutoffs = cutoffs[-max_folds:]
+
+        folds = []
+        for cutoff in cutoffs:
+            n_train = int(np.searchsorted(dates, cutoff.to_datetime64(), side='right'))
+            end = int(np.searchsorted(dates, (cutoff + timedelta(days=horizon_days)).to_datetime64(), side='right'))
+            if n_train < 2 or end == n_train:
+                continue
+            folds.append(self._store_fold(cutoff, dates[:end], values[:end], n_train))
+        return folds
+
+    def get_result(self, key: str) -> Optional[Dict[str, float]]:
+        try:
+            with open(self.root / 'results' / f"{key}.json") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put_result(self, key: str, errors: Dict[str, float]) -> None:
+        self._write(self.root / 'results' / f"{key}.json", json.dumps(errors).encode())
+
+    def _store_fold(self, cutoff: pd.Timestamp, dates: np.ndarray, values: np.ndarray, n_train: int) -> Fold:
+        digest = hashlib.sha256()
+        digest.update(dates.view(np.int64).tobytes())
+        digest.update(values.tobytes())
+        digest.update(str(n_train).encode())
+        digest = digest.hexdigest()
+
+        path = self.root / 'folds' / f"{digest}.npz"
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.parent / f".{digest}.{uuid.uuid4().hex[:8]}.tmp.npz"
+            np.savez(tmp_path, dates=dates, values=values, n_train=np.int64(n_train))
+            os.replace(tmp_path, path)
+        return Fold(cutoff, digest, str(path))
+
+    def _write(self, path: Path, payload: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.parent / f".{path.name}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+
+class ProphetTuner:
+    """
+    Rolling-origin cross-validation of Prophet parameters in worker processes
+
+    Every (parameter set, fold) pair whose result is not already in the
+    tuning cache is fitted in a process pool of `workers` processes, which
+    only receives fold paths and parameters. The pool is shared by every
+    tuning run of the process, so concurrent runs queue for the same
+    `workers` processes rather than starting their own. Parameter sets are
+    ranked by their mean error over all folds.
+    """
+
+    def __init__(self, cache: TuningCache, workers: int = settings.TUNING_WORKERS):
+        self.cache = cache
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def shutdown(self) -> None:
+        """Stop the worker pool; the next tuning run starts a new one"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn rather than fork: the API process runs threads and an event loop
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=mp.get_context('spawn'))
+        return self._pool
+
+    async def tune(
+        self,
+        data: pd.DataFrame,
+        space: Optional[Dict[str, Any]] = None,
+        search: str = 'grid',
+        n_iter: int = 20,
+        seed: int = 0,
+        metric: str = 'rmse',
+        initial_days: int = settings.TUNING_INITIAL_DAYS,
+        period_days: int = settings.TUNING_PERIOD_DAYS,
+        horizon_days: int = settings.TUNING_HORIZON_DAYS,
+        max_folds: Optional[int] = settings.TUNING_MAX_FOLDS
+    ) -> Dict[str, Any]:
+        """
+        Find the parameter set with the lowest mean `metric` over the folds
+
+        Returns:
+            best_parameters and best_scores, every candidate's mean scores,
+            and how many fold evaluations ran or came from the cache
+
+        Raises:
+            ValueError: If the history is too short for a single fold
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric: {metric}")
+
+        started = time.perf_counter()
+        candidates = parameter_candidates(space or DEFAULT_SEARCH_SPACE, search, n_iter, seed)
+        folds = await asyncio.to_thread(self.cache.folds, data, initial_days, period_days, horizon_days, max_folds)
+        if not folds:
+            raise ValueError(f"Need more than {initial_days + horizon_days} days of history to tune")
+
+        keys = [[result_key(fold.digest, candidate) for fold in folds] for candidate in candidates]
+        scores: Dict[str, Optional[Dict[str, float]]] = {}
+        for key in itertools.chain.from_iterable(keys):
+            scores[key] = self.cache.get_result(key)
+
+        pending = [
+            (key, fold.path, candidate)
+            for candidate, candidate_keys in zip(candidates, keys)
+            for key, fold in zip(candidate_keys, folds)
+            if scores[key] is None
+        ]
+        cached = sum(1 for value in scores.values() if value is not None)
+        if pending:
+            await self._evaluate(pending, scores)
+
+        ranked = []
+        for candidate, candidate_keys in zip(candidates, keys):
+            results = [scores[key] for key in candidate_keys]
+            if any(result is None for result in results):
+                # A fold failed to fit; the candidate cannot be compared fairly
+                continue
+            ranked.append({
+                'parameters': candidate,
+                'scores': {name: float(np.nanmean([r[name] for r in results])) for name in METRICS}
+            })
+        if not ranked:
+            raise ValueError("Every parameter set failed to fit")
+        ranked.sort(key=lambda entry: entry['scores'][metric])
+
+        return {
+            'metric': metric,
+            'best_parameters': ranked[0]['parameters'],
+            'best_scores': ranked[0]['scores'],
+            'candidates': ranked,
+            'folds': [fold.cutoff.isoformat() for fold in folds],
+            'evaluations': len(keys) * len(folds),
+            'cached_evaluations': cached,
+            'seconds': round(time.perf_counter() - started, 3)
+        }
+
+    async def _evaluate(self, pending: List[tuple], scores: Dict[str, Optional[Dict[str, float]]]) -> None:
+        pool = self._get_pool()
+        # Cancelling the run (e.g. its job) cancels its fits that have not started
+        futures = [asyncio.wrap_future(pool.submit(evaluate_fold, path, candidate)) for _, path, candidate in pending]
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        if any(isinstance(result, BrokenProcessPool) for result in results) and self._pool is pool:
+            # A worker died (e.g. out of memory); start a new pool for the next run
+            self.shutdown()
+
+        for (key, _, candidate), result in zip(pending, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Tuning fit failed for {candidate}: {str(result)}")
+                continue
+            scores[key] = result
+            await asyncio.to_thread(self.cache.put_result, key, result)
+
+
+prophet_tuner = ProphetTuner(TuningCache(settings.TUNING_CACHE_PATH))
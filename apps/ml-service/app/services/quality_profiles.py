@@ -0,0 +1,337 @@
+import json
+import logging
+import math
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from redis import Redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+PROFILE_KEY = "quality_profile:{tenant_id}"
+# Hash field holding the first day not yet folded into the tenant's profiles
+THROUGH_FIELD = '__through__'
+# Rows between the pairs of the seasonality autocorrelation (weekly for daily rows)
+SEASONAL_LAG = 7
+
+EMPTY_QUALITY = {
+    'data_points': 0,
+    'data_completeness': 0.0,
+    'trend_strength': 0.0,
+    'seasonality_strength': 0.0,
+    'noise_level': 1.0,
+    'demand_interval': float('inf')
+}
+
+
+def _correlation(comoment: float, m2_x: float, m2_y: float) -> float:
+    """|Pearson correlation| from co-moment and sums of squares, 0 if either side is constant"""
+    if m2_x <= 0 or m2_y <= 0:
+        return 0.0
+    return min(abs(comoment) / math.sqrt(m2_x * m2_y), 1.0)
+
+
+class SeriesProfile:
+    """
+    Running data-quality statistics of one item/vendor daily demand series
+
+    Rows are the days with demand, in date order. Keeps Welford running
+    moments of the quantity, its co-moment with the row index (for the
+    trend correlation) and the co-moments of rows SEASONAL_LAG apart (for
+    the weekly autocorrelation), plus the last SEASONAL_LAG values. Adding
+    a day is O(1); metrics() reproduces the batch computation that
+    EnhancedMLService used to run over the full history.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.nulls = 0
+        self.first: Optional[str] = None
+        self.last: Optional[str] = None
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.t_mean = 0.0
+        self.t_m2 = 0.0
+        self.ty_comoment = 0.0
+        self.pairs = 0
+        self.lag_mean = 0.0
+        self.lag_m2 = 0.0
+        self.lead_mean = 0.0
+        self.lead_m2 = 0.0
+        self.lag_comoment = 0.0
+        self.recent: List[float] = []
+
+    @classmethod
+    def from_series(cls, dates: pd.Series, values: np.ndarray) -> "SeriesProfile":
+        """Build a profile from a whole sorted series in one vectorized pass"""
+        profile = cls()
+        raw = np.asarray(values, dtype=np.float64)
+        if not len(raw):
+            return profile
+        y = np.nan_to_num(raw, nan=0.0)
+        t = np.arange(len(y), dtype=np.float64)
+        dates = pd.to_datetime(dates)
+
+        profile.n = len(y)
+        profile.nulls = int(np.isnan(raw).sum())
+        profile.first = dates.iloc[0].strftime('%Y-%m-%d')
+        profile.last = dates.iloc[-1].strftime('%Y-%m-%d')
+        profile.mean = float(y.mean())
+        profile.m2 = float(((y - profile.mean) ** 2).sum())
+        profile.t_mean = float(t.mean())
+        profile.t_m2 = float(((t - profile.t_mean) ** 2).sum())
+        profile.ty_comoment = float(((t - profile.t_mean) * (y - profile.mean)).sum())
+
+        if len(y) > SEASONAL_LAG:
+            lag, lead = y[:-SEASONAL_LAG], y[SEASONAL_LAG:]
+            profile.pairs = len(lag)
+            profile.lag_mean = float(lag.mean())
+            profile.lead_mean = float(lead.mean())
+            profile.lag_m2 = float(((lag - profile.lag_mean) ** 2).sum())
+            profile.lead_m2 = float(((lead - profile.lead_mean) ** 2).sum())
+            profile.lag_comoment = float(((lag - profile.lag_mean) * (lead - profile.lead_mean)).sum())
+        profile.recent = [float(v) for v in y[-SEASONAL_LAG:]]
+        return profile
+
+    def add(self, date: str, value: float) -> None:
+        """Fold in the next day of the series (Welford updates)"""
+        if value is None or math.isnan(value):
+            self.nulls += 1
+            value = 0.0
+
+        self.n += 1
+        t = float(self.n - 1)
+        dt = t - self.t_mean
+        dy = value - self.mean
+        self.t_mean += dt / self.n
+        self.mean += dy / self.n
+        self.t_m2 += dt * (t - self.t_mean)
+        self.m2 += dy * (value - self.mean)
+        self.ty_comoment += dt * (value - self.mean)
+
+        if len(self.recent) == SEASONAL_LAG:
+            lagged = self.recent[0]
+            self.pairs += 1
+            dx = lagged - self.lag_mean
+            dz = value - self.lead_mean
+            self.lag_mean += dx / self.pairs
+            self.lead_mean += dz / self.pairs
+            self.lag_m2 += dx * (lagged - self.lag_mean)
+            self.lead_m2 += dz * (value - self.lead_mean)
+            self.lag_comoment += dx * (value - self.lead_mean)
+        self.recent = (self.recent + [value])[-SEASONAL_LAG:]
+
+        self.first = self.first or date
+        self.last = date
+
+    def metrics(self) -> Dict[str, float]:
+        """Data quality metrics in the shape EnhancedMLService's method selection reads"""
+        if self.n == 0:
+            return dict(EMPTY_QUALITY)
+
+        span_days = (datetime.fromisoformat(self.last) - datetime.fromisoformat(self.first)).days + 1
+        std = math.sqrt(self.m2 / self.n)
+        return {
+            'data_points': self.n,
+            'data_completeness': 1 - self.nulls / self.n,
+            'trend_strength': _correlation(self.ty_comoment, self.t_m2, self.m2),
+            'seasonality_strength': (
+                _correlation(self.lag_comoment, self.lag_m2, self.lead_m2) if self.n > 2 * SEASONAL_LAG else 0.0
+            ),
+            'noise_level': std / self.mean if self.mean > 0 else 1.0,
+            'demand_interval': span_days / self.n
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SeriesProfile":
+        profile = cls()
+        profile.__dict__.update(data)
+        return profile
+
+
+def _field(item_id: Any, vendor_id: Any) -> str:
+    return f"{item_id}:{vendor_id}"
+
+
+def _daily_totals(rows: pd.DataFrame) -> pd.DataFrame:
+    """One row per item/vendor/day, sorted by date, with the date as YYYY-MM-DD"""
+    totals = rows.assign(day=pd.to_datetime(rows['date']).dt.strftime('%Y-%m-%d')) \
+        .groupby(['itemId', 'vendorId', 'day'], as_index=False, dropna=False)['quantity'] \
+        .sum(min_count=1)
+    return totals.sort_values('day')
+
+
+def _window_totals(rows: pd.DataFrame, since: str, until: str) -> pd.Series:
+    """Daily totals of rows in [since, until), indexed by itemId, vendorId and day"""
+    dates = pd.to_datetime(rows['date'])
+    window = rows[(dates >= pd.Timestamp(since)) & (dates < pd.Timestamp(until))]
+    return _daily_totals(window).set_index(['itemId', 'vendorId', 'day'])['quantity']
+
+
+def changed_series(before: pd.DataFrame, after: pd.DataFrame, since: str, until: str) -> List[Tuple[Any, Any]]:
+    """
+    Item/vendor pairs whose daily totals in [since, until) differ between two reads
+
+    A day present in only one of the reads counts as a change.
+    """
+    old, new = _window_totals(before, since, until).align(_window_totals(after, since, until))
+    differs = ~((old == new) | (old.isna() & new.isna()))
+    changed = old.index[differs.to_numpy()]
+    return list(dict.fromkeys((item, vendor) for item, vendor, _ in changed))
+
+
+def _build_profiles(rows: pd.DataFrame, through: str) -> Dict[str, str]:
+    """Serialized profiles of every series in rows, from its days before `through`"""
+    profiles: Dict[str, str] = {}
+    if not len(rows):
+        return profiles
+    complete = rows[pd.to_datetime(rows['date']) < pd.Timestamp(through)]
+    if len(complete):
+        for (item, vendor), group in _daily_totals(complete).groupby(['itemId', 'vendorId'], dropna=False, sort=False):
+            profile = SeriesProfile.from_series(group['day'], group['quantity'].to_numpy(dtype=np.float64))
+            profiles[_field(item, vendor)] = json.dumps(profile.to_dict())
+    return profiles
+
+
+class QualityProfileStore:
+    """
+    Per-tenant data-quality profiles of every item/vendor series, in Redis
+
+    One hash per tenant (quality_profile:<tenant_id>) with a field per
+    item/vendor holding its SeriesProfile, and a __through__ field with the
+    first day not yet folded in. Profiles cover complete days only; they
+    are advanced whenever the series cache seals new days, and series whose
+    re-read sealed days changed are refolded (see
+    DataService._refresh_series_cache), so they lag the data by at most the
+    series cache TTL. Looking up a series is one HMGET.
+    """
+
+    def __init__(self, redis_client: Redis):
+        self.redis_client = redis_client
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, tenant_id: str, item_id: str, vendor_id: str) -> Optional[Dict[str, float]]:
+        """
+        Quality metrics of a series
+
+        Returns:
+            The metrics (EMPTY_QUALITY for a series without complete days),
+            or None if the tenant's profiles are not built or Redis is down
+        """
+        key = PROFILE_KEY.format(tenant_id=tenant_id)
+        try:
+            payload, through = self.redis_client.hmget(key, _field(item_id, vendor_id), THROUGH_FIELD)
+        except RedisError as e:
+            logger.warning(f"Quality profiles unavailable for tenant {tenant_id}: {str(e)}")
+            return None
+
+        if through is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if payload is None:
+            return dict(EMPTY_QUALITY)
+        return SeriesProfile.from_dict(json.loads(payload)).metrics()
+
+    def advance(self, tenant_id: str, rows: pd.DataFrame, since: str, through: str) -> bool:
+        """
+        Fold newly completed days into the tenant's profiles
+
+        Args:
+            rows: Demand rows (date, itemId, vendorId, quantity) read from `since`
+            since: First day the profiles do not cover yet
+            through: First day that is not complete
+
+        Returns:
+            False if the stored profiles do not end at `since` (missing or
+            out of step), in which case the caller should rebuild them
+        """
+        key = PROFILE_KEY.format(tenant_id=tenant_id)
+        stored = self.redis_client.hget(key, THROUGH_FIELD)
+        if stored is None or stored.decode() != since:
+            return False
+
+        dates = pd.to_datetime(rows['date'])
+        days = rows[(dates >= pd.Timestamp(since)) & (dates < pd.Timestamp(through))]
+        updates: Dict[str, str] = {THROUGH_FIELD: through}
+        if len(days):
+            totals = _daily_totals(days)
+            series = list(totals.groupby(['itemId', 'vendorId'], dropna=False, sort=False))
+            fields = [_field(item, vendor) for (item, vendor), _ in series]
+            payloads = self.redis_client.hmget(key, fields)
+            for field, (_, group), payload in zip(fields, series, payloads):
+                profile = SeriesProfile.from_dict(json.loads(payload)) if payload else SeriesProfile()
+                for day, quantity in zip(group['day'], group['quantity']):
+                    profile.add(day, float(quantity))
+                updates[field] = json.dumps(profile.to_dict())
+
+        self.redis_client.hset(key, mapping=updates)
+        return True
+
+    def rebuild(self, tenant_id: str, rows: pd.DataFrame, through: str) -> int:
+        """
+        Replace the tenant's profiles with ones built from its full history
+
+        Returns:
+            The number of series profiled
+        """
+        mapping = _build_profiles(rows, through)
+        mapping[THROUGH_FIELD] = through
+
+        key = PROFILE_KEY.format(tenant_id=tenant_id)
+        pipe = self.redis_client.pipeline(transaction=True)
+        pipe.delete(key)
+        pipe.hset(key, mapping=mapping)
+        pipe.execute()
+        return len(mapping) - 1
+
+    def refold(self, tenant_id: str, rows: pd.DataFrame, series: Iterable[Tuple[Any, Any]], through: str) -> int:
+        """
+        Rebuild the profiles of some series from their full history
+
+        Running moments cannot take back a day once folded in, so series
+        whose already-folded days changed (e.g. late movements picked up
+        when the series cache re-reads its last sealed days) are profiled
+        again from scratch. Series with no complete days left are dropped.
+
+        Args:
+            rows: Demand rows (date, itemId, vendorId, quantity) holding at
+                least the full history of the series
+            series: (item_id, vendor_id) pairs to rebuild
+            through: First day that is not complete
+
+        Returns:
+            The number of series rebuilt
+        """
+        fields = {_field(item, vendor) for item, vendor in series}
+        if not fields:
+            return 0
+        if len(rows):
+            keys = rows['itemId'].astype(str) + ':' + rows['vendorId'].astype(str)
+            rows = rows[keys.isin(fields).to_numpy()]
+        mapping = _build_profiles(rows, through)
+
+        key = PROFILE_KEY.format(tenant_id=tenant_id)
+        pipe = self.redis_client.pipeline(transaction=True)
+        removed = [field for field in fields if field not in mapping]
+        if removed:
+            pipe.hdel(key, *removed)
+        if mapping:
+            pipe.hset(key, mapping=mapping)
+        pipe.execute()
+        return len(fields)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+        }
@@ -0,0 +1,304 @@
+import fcntl
+import json
+import logging
+import os
+import shutil
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+logger = logging.getLogger(__name__)
+
+DEMAND_SCHEMA = pa.schema([
+    ('date', pa.timestamp('ms')),
+    ('itemId', pa.string()),
+    ('vendorId', pa.string()),
+    ('quantity', pa.float64()),
+])
+
+MANIFEST_FILE = 'manifest.json'
+LOCK_FILE = '.lock'
+
+
+class SeriesStore:
+    """
+    Per-tenant on-disk columnar cache of daily demand series
+
+    Layout under <root>/<tenant_id>/demand/:
+      - seg-*.arrow: immutable Arrow IPC segments holding complete days
+      - tail-*.arrow: the current (still changing) day, replaced on refresh
+      - manifest.json: segment list with each segment's first and last
+        day, the first unsealed day and refresh time
+
+    Sealed days are not final: a refresh may re-read a trailing window of
+    them (see append's `since`), and segments overlapping that window are
+    rewritten without it. Compaction only merges segments that end before
+    the window, so the large compacted segment is never rewritten.
+
+    Segments are Arrow IPC files rather than Parquet so they can be opened
+    with a memory map and read without decoding; every worker on the host
+    shares the same page cache copy.
+    """
+
+    def __init__(self, root: str, ttl_seconds: int, max_segments: int = 64):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_segments = max_segments
+        # tenant_id -> (manifest version, concatenated memory-mapped table)
+        self._tables: Dict[str, Tuple[int, pa.Table]] = {}
+
+    def _tenant_dir(self, tenant_id: str) -> Path:
+        return self.root / tenant_id / 'demand'
+
+    def read_manifest(self, tenant_id: str) -> Optional[Dict[str, Any]]:
+        """Return the tenant's manifest, or None if nothing is cached"""
+        path = self._tenant_dir(tenant_id) / MANIFEST_FILE
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def is_fresh(self, tenant_id: str, data_version: Optional[int] = None) -> bool:
+        """
+        Check whether the cache was refreshed within the TTL
+
+        When a data version is given, the cache is also stale if it was
+        built at a different version.
+        """
+        manifest = self.read_manifest(tenant_id)
+        if not manifest:
+            return False
+        if data_version is not None and manifest.get('data_version') != data_version:
+            return False
+        refreshed_at = datetime.fromisoformat(manifest['refreshed_at'])
+        return datetime.utcnow() - refreshed_at < timedelta(seconds=self.ttl_seconds)
+
+    @contextmanager
+    def writer_lock(self, tenant_id: str) -> Iterator[bool]:
+        """
+        Take the tenant's cross-process write lock without blocking
+
+        Yields False if another process is already refreshing the tenant.
+        """
+        tenant_dir = self._tenant_dir(tenant_id)
+        tenant_dir.mkdir(parents=True, exist_ok=True)
+        with open(tenant_dir / LOCK_FILE, 'w') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def append(
+        self,
+        tenant_id: str,
+        rows: pd.DataFrame,
+        through: str,
+        data_version: Optional[int] = None,
+        since: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Append newly aggregated rows to the tenant's cache
+
+        Rows before `through` are sealed into a new immutable segment; rows on
+        or after it replace the tail segment. Cached days from `since` on are
+        replaced by the rows, so re-reading already sealed days picks up
+        late or edited movements. Must be called while holding writer_lock.
+
+        Args:
+            tenant_id: Tenant identifier
+            rows: DataFrame with date, itemId, vendorId and quantity columns,
+                covering every day from `since`
+            through: First day (YYYY-MM-DD) that is not yet complete
+            data_version: Tenant data version the rows were read at (optional)
+            since: First day the rows cover (optional, defaults to the
+                manifest's through)
+
+        Returns:
+            The new manifest
+        """
+        tenant_dir = self._tenant_dir(tenant_id)
+        tenant_dir.mkdir(parents=True, exist_ok=True)
+        manifest = self.read_manifest(tenant_id) or {'version': 0, 'segments': [], 'tail': None}
+        obsolete: List[str] = []
+
+        table = self._to_table(rows)
+        cutoff = pa.scalar(pd.Timestamp(through), type=pa.timestamp('ms'))
+        sealed = table.filter(pc.less(table['date'], cutoff))
+        open_days = table.filter(pc.greater_equal(table['date'], cutoff))
+
+        # segment name -> [first day, last day]; unknown for manifests written before ranges were kept
+        ranges: Dict[str, List[Optional[str]]] = dict(manifest.get('ranges', {}))
+        segments = []
+        for name in manifest['segments']:
+            last = ranges.get(name, [None, None])[1]
+            if since is None or (last is not None and last < since):
+                segments.append(name)
+                continue
+            # Overlaps the re-read days: keep only what precedes them
+            obsolete.append(name)
+            ranges.pop(name, None)
+            kept = self._open_files(tenant_dir, [name])
+            kept = kept.filter(pc.less(kept['date'], pa.scalar(pd.Timestamp(since), type=pa.timestamp('ms'))))
+            if kept.num_rows:
+                segments.append(self._write_segment(tenant_dir, kept, ranges))
+
+        if sealed.num_rows:
+            segments.append(self._write_segment(tenant_dir, sealed, ranges))
+
+        if manifest.get('tail'):
+            obsolete.append(manifest['tail'])
+        tail = self._write_file(tenant_dir, 'tail', open_days) if open_days.num_rows else None
+
+        if len(segments) > self.max_segments:
+            # Segments the next refresh may re-read stay separate, so the compacted one stays final
+            horizon = since or through
+            settled = [name for name in segments if (ranges.get(name, [None, None])[1] or horizon) < horizon]
+            recent = [name for name in segments if name not in settled]
+            if len(settled) > 1:
+                obsolete.extend(settled)
+                for name in settled:
+                    ranges.pop(name, None)
+                segments = [self._write_segment(tenant_dir, self._open_files(tenant_dir, settled), ranges)] + recent
+
+        manifest = {
+            'version': manifest['version'] + 1,
+            'segments': segments,
+            'ranges': {name: ranges[name] for name in segments if name in ranges},
+            'tail': tail,
+            'through': through,
+            'data_version': data_version,
+            'refreshed_at': datetime.utcnow().isoformat(),
+        }
+        self._write_manifest(tenant_dir, manifest)
+
+        # Readers that already mapped the old files keep working; unlinked
+        # files stay alive until their maps are closed
+        for name in obsolete:
+            try:
+                os.remove(tenant_dir / name)
+            except FileNotFoundError:
+                pass
+
+        return manifest
+
+    def read(
+        self,
+        tenant_id: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        item_id: Optional[str] = None,
+        vendor_id: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Read cached daily demand rows, optionally filtered
+
+        Returns:
+            DataFrame with date, itemId, vendorId and quantity columns
+        """
+        table = self._load_table(tenant_id)
+        if table is None:
+            return pd.DataFrame(columns=DEMAND_SCHEMA.names)
+
+        mask = None
+        conditions = []
+        if item_id is not None:
+            conditions.append(pc.equal(table['itemId'], item_id))
+        if vendor_id is not None:
+            conditions.append(pc.equal(table['vendorId'], vendor_id))
+        if start_date:
+            conditions.append(pc.greater_equal(
+                table['date'], pa.scalar(pd.Timestamp(start_date).floor('D'), type=pa.timestamp('ms'))
+            ))
+        if end_date:
+            conditions.append(pc.less_equal(
+                table['date'], pa.scalar(pd.Timestamp(end_date), type=pa.timestamp('ms'))
+            ))
+        for condition in conditions:
+            mask = condition if mask is None else pc.and_(mask, condition)
+
+        if mask is not None:
+            table = table.filter(mask)
+
+        return table.to_pandas(coerce_temporal_nanoseconds=True)
+
+    def invalidate(self, tenant_id: str) -> None:
+        """Drop everything cached for a tenant"""
+        self._tables.pop(tenant_id, None)
+        shutil.rmtree(self._tenant_dir(tenant_id), ignore_errors=True)
+
+    def _load_table(self, tenant_id: str) -> Optional[pa.Table]:
+        manifest = self.read_manifest(tenant_id)
+        if not manifest:
+            return None
+
+        cached = self._tables.get(tenant_id)
+        if cached and cached[0] == manifest['version']:
+            return cached[1]
+
+        names = list(manifest['segments'])
+        if manifest.get('tail'):
+            names.append(manifest['tail'])
+
+        try:
+            table = self._open_files(self._tenant_dir(tenant_id), names)
+        except FileNotFoundError:
+            # A concurrent compaction replaced the files; the next read sees the new manifest
+            return None
+
+        self._tables[tenant_id] = (manifest['version'], table)
+        return table
+
+    def _open_files(self, tenant_dir: Path, names: List[str]) -> pa.Table:
+        tables = []
+        for name in names:
+            source = pa.memory_map(str(tenant_dir / name), 'r')
+            tables.append(pa.ipc.open_file(source).read_all())
+        if not tables:
+            return DEMAND_SCHEMA.empty_table()
+        return pa.concat_tables(tables)
+
+    def _to_table(self, rows: pd.DataFrame) -> pa.Table:
+        if rows.empty:
+            return DEMAND_SCHEMA.empty_table()
+        frame = pd.DataFrame({
+            'date': pd.to_datetime(rows['date']),
+            'itemId': rows['itemId'].astype(str),
+            'vendorId': rows['vendorId'].map(lambda v: None if v is None else str(v)),
+            'quantity': rows['quantity'].astype(float),
+        })
+        return pa.Table.from_pandas(frame, schema=DEMAND_SCHEMA, preserve_index=False)
+
+    def _write_segment(self, tenant_dir: Path, table: pa.Table, ranges: Dict[str, List[Optional[str]]]) -> str:
+        """Write a sealed segment and record its first and last day in ranges"""
+        name = self._write_file(tenant_dir, 'seg', table)
+        bounds = pc.min_max(table['date']).as_py()
+        ranges[name] = [bounds['min'].strftime('%Y-%m-%d'), bounds['max'].strftime('%Y-%m-%d')]
+        return name
+
+    def _write_file(self, tenant_dir: Path, prefix: str, table: pa.Table) -> str:
+        name = f"{prefix}-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}.arrow"
+        tmp_path = tenant_dir / f".{name}.tmp"
+        with pa.OSFile(str(tmp_path), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, tenant_dir / name)
+        return name
+
+    def _write_manifest(self, tenant_dir: Path, manifest: Dict[str, Any]) -> None:
+        tmp_path = tenant_dir / f".{MANIFEST_FILE}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, tenant_dir / MANIFEST_FILE)
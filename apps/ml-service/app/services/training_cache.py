@@ -0,0 +1,181 @@
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+from bson import ObjectId
+from redis import Redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "data_version:{tenant_id}"
+VERSION_AT_KEY = "data_version_at:{tenant_id}"
+ENTRY_KEY = "training_data:{tenant_id}:{data_type}:v{version}:{digest}"
+COLUMNS_NAME_META = b'columns_name'
+
+
+def normalize_ids(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert ObjectId values and column labels to strings
+
+    Arrow has no ObjectId type, so frames are normalized before caching.
+    DataService applies it to every training-data read, cached or not, so
+    the cache flags never change the shape of the frames returned.
+    """
+    if df.empty and not len(df.columns):
+        return df
+
+    columns = [str(c) if isinstance(c, ObjectId) else c for c in df.columns]
+    if columns != list(df.columns):
+        df = df.set_axis(pd.Index(columns, name=df.columns.name), axis=1)
+
+    # Every value is checked: ids may be stored as ObjectId in some documents and str in others
+    for column in df.columns[df.dtypes.values == object]:
+        values = df[column]
+        if values.map(lambda v: isinstance(v, ObjectId)).any():
+            df[column] = values.map(lambda v: str(v) if isinstance(v, ObjectId) else v)
+
+    return df
+
+
+def encode_frame(df: pd.DataFrame) -> bytes:
+    """Serialize a DataFrame as a zstd-compressed Arrow IPC stream"""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if df.columns.name is not None:
+        metadata = dict(table.schema.metadata or {})
+        metadata[COLUMNS_NAME_META] = str(df.columns.name).encode()
+        table = table.replace_schema_metadata(metadata)
+
+    sink = pa.BufferOutputStream()
+    options = pa.ipc.IpcWriteOptions(compression='zstd')
+    with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def decode_frame(payload: bytes) -> pd.DataFrame:
+    """Rebuild a DataFrame written by encode_frame"""
+    table = pa.ipc.open_stream(payload).read_all()
+    if not table.num_columns:
+        return pd.DataFrame()
+
+    df = table.to_pandas(coerce_temporal_nanoseconds=True)
+
+    columns_name = (table.schema.metadata or {}).get(COLUMNS_NAME_META)
+    if columns_name is not None:
+        df.columns.name = columns_name.decode()
+    return df
+
+
+class TrainingDataCache:
+    """
+    Redis cache of get_training_data results
+
+    Entries are keyed by tenant, data type, a digest of the filters and the
+    tenant's data version. Writers bump the version (an INCR on
+    data_version:<tenant_id>, with the time kept in data_version_at) when
+    new movements or purchase orders land,
+    which orphans every older entry at once without scanning for keys; the
+    orphans simply expire with their TTL.
+
+    When training reads may be served by a lagging secondary, settle_seconds
+    is its staleness bound: a result read sooner than that after the last
+    bump may predate the bump, so it is not cached under the new version.
+    """
+
+    def __init__(self, redis_client: Redis, ttl_seconds: int, max_bytes: int, settle_seconds: int = 0):
+        self.redis_client = redis_client
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.settle_seconds = settle_seconds
+
+    def get_version(self, tenant_id: str) -> int:
+        """Return the tenant's current data version (0 if never bumped)"""
+        version = self.redis_client.get(VERSION_KEY.format(tenant_id=tenant_id))
+        return int(version) if version else 0
+
+    def bump_version(self, tenant_id: str) -> int:
+        """Invalidate every cached result for the tenant"""
+        try:
+            pipe = self.redis_client.pipeline(transaction=True)
+            pipe.incr(VERSION_KEY.format(tenant_id=tenant_id))
+            pipe.set(VERSION_AT_KEY.format(tenant_id=tenant_id), time.time())
+            return pipe.execute()[0]
+        except RedisError as e:
+            logger.warning(f"Could not bump data version for tenant {tenant_id}: {str(e)}")
+            return 0
+
+    def _key(self, tenant_id: str, data_type: str, version: int, filters: Dict[str, Any]) -> str:
+        digest = hashlib.sha1(json.dumps(filters, sort_keys=True, default=str).encode()).hexdigest()[:16]
+        return ENTRY_KEY.format(tenant_id=tenant_id, data_type=data_type, version=version, digest=digest)
+
+    def get(self, tenant_id: str, data_type: str, filters: Dict[str, Any]) -> Tuple[Optional[int], Optional[pd.DataFrame]]:
+        """
+        Look up a cached result
+
+        Returns:
+            (data version, cached DataFrame or None on a miss). The version is
+            None if Redis is unavailable, in which case nothing should be cached.
+        """
+        try:
+            version = self.get_version(tenant_id)
+        except RedisError as e:
+            logger.warning(f"Training data cache unavailable for tenant {tenant_id}: {str(e)}")
+            return None, None
+
+        try:
+            payload = self.redis_client.get(self._key(tenant_id, data_type, version, filters))
+            if payload is None:
+                return version, None
+            return version, decode_frame(payload)
+        except (RedisError, pa.ArrowException) as e:
+            logger.warning(f"Training data cache read failed for tenant {tenant_id}: {str(e)}")
+            return version, None
+
+    def set(
+        self,
+        tenant_id: str,
+        data_type: str,
+        filters: Dict[str, Any],
+        df: pd.DataFrame,
+        version: int,
+        read_at: Optional[float] = None
+    ) -> bool:
+        """
+        Store a result under the data version it was read at
+
+        The version must be the one returned by get() before the data was
+        read, so a bump that races with the read leaves the entry under the
+        old version rather than caching stale data under the new one.
+        read_at is the time.time() at which the read started; with
+        settle_seconds set, results read too soon after a bump are skipped.
+
+        Returns:
+            True if the result was cached
+        """
+        try:
+            if read_at is not None and self.settle_seconds:
+                bumped_at = self.redis_client.get(VERSION_AT_KEY.format(tenant_id=tenant_id))
+                if bumped_at is not None and read_at - float(bumped_at) < self.settle_seconds:
+                    logger.debug(f"Data version for tenant {tenant_id} has not settled on secondaries, not caching")
+                    return False
+
+            payload = encode_frame(df)
+            if len(payload) > self.max_bytes:
+                logger.debug(f"Training data for tenant {tenant_id} is {len(payload)} bytes, not caching")
+                return False
+
+            self.redis_client.set(
+                self._key(tenant_id, data_type, version, filters),
+                payload,
+                ex=self.ttl_seconds
+            )
+            return True
+        except (RedisError, pa.ArrowException, TypeError, ValueError) as e:
+            # Columns Arrow cannot represent (e.g. mixed object values) are simply not cached
+            logger.warning(f"Training data cache write failed for tenant {tenant_id}: {str(e)}")
+            return False
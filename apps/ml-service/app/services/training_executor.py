@@ -0,0 +1,405 @@
+import asyncio
+import logging
+import multiprocessing as mp
+import os
+import signal
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.ml_service import MLService, fit_and_save_model, fit_stats, retrain_and_save_model
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+FINISHED_STATUSES = {JobStatus.DONE, JobStatus.FAILED, JobStatus.CANCELLED}
+
+
+class TrainingQueueFull(Exception):
+    """Raised when a job is submitted while the training queue is full"""
+
+
+class TrainingJob:
+    """
+    A queued, running or finished training job
+
+    kind is 'train' for a new model, 'retrain' for a new version of
+    parent_model_id (see MLService.prepare_retraining) or 'tune' for a
+    Prophet parameter search of the series, whose report is the job's
+    result.
+    """
+
+    def __init__(
+        self,
+        model_type: Optional[str],
+        item_id: Optional[str],
+        vendor_id: Optional[str],
+        tenant_id: str,
+        parameters: Dict[str, Any],
+        timeout_seconds: float,
+        kind: str = 'train',
+        parent_model_id: Optional[str] = None
+    ):
+        self.job_id = uuid.uuid4().hex
+        self.kind = kind
+        self.model_type = model_type
+        self.item_id = item_id
+        self.vendor_id = vendor_id
+        self.tenant_id = tenant_id
+        self.parameters = parameters
+        self.timeout_seconds = timeout_seconds
+        self.parent_model_id = parent_model_id
+        self.status = JobStatus.QUEUED
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.model_id: Optional[str] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._future: Optional[Future] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.job_id,
+            'status': self.status.value,
+            'kind': self.kind,
+            'model_type': self.model_type,
+            'tenant_id': self.tenant_id,
+            'item_id': self.item_id,
+            'vendor_id': self.vendor_id,
+            'parent_model_id': self.parent_model_id,
+            'model_id': self.model_id,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+def _init_worker() -> None:
+    # Lead a process group, so killing the worker also stops the cmdstan
+    # processes Prophet fits in
+    os.setpgrp()
+
+
+class _WorkerSlot:
+    """
+    One worker process, which runs one job at a time
+
+    ProcessPoolExecutor cannot interrupt a running call, so each slot owns a
+    single-process pool: a cancelled or timed-out job is stopped by killing
+    the slot's process group, and the slot starts a fresh worker for its
+    next job.
+    """
+
+    def __init__(self):
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.pid: Optional[int] = None
+
+    async def ensure_started(self) -> ProcessPoolExecutor:
+        if self.executor is None:
+            # spawn rather than fork: the API process runs threads and an event loop
+            executor = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=mp.get_context('spawn'),
+                initializer=_init_worker
+            )
+            try:
+                self.pid = await asyncio.wrap_future(executor.submit(os.getpid))
+            except BaseException:
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+            self.executor = executor
+        return self.executor
+
+    def kill(self) -> None:
+        if self.executor is None:
+            return
+        try:
+            os.killpg(self.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.executor = None
+        self.pid = None
+
+
+class TrainingExecutor:
+    """
+    Queue of model training jobs fitted in worker processes
+
+    Prophet and XGBoost fits are CPU-bound, so running them on the API's
+    event loop (or in its threads) stalls every request. Jobs wait in a
+    bounded queue and are taken by `workers` slots, each with its own
+    worker process. A slot loads the job's training data on the event loop
+    (it is I/O), then fits and saves the model in its worker; only the
+    data goes in and only the metadata comes back.
+
+    Job state is kept in this process for status lookups, with the newest
+    `history` finished jobs retained.
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.TRAINING_WORKERS,
+        max_queued: int = settings.TRAINING_QUEUE_SIZE,
+        timeout_seconds: float = settings.TRAINING_JOB_TIMEOUT_SECONDS,
+        history: int = settings.TRAINING_JOB_HISTORY
+    ):
+        self.workers = workers
+        self.timeout_seconds = timeout_seconds
+        self.history = history
+        self.ml_service: Optional[MLService] = None
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+        self._jobs: "OrderedDict[str, TrainingJob]" = OrderedDict()
+        self._slots: List[_WorkerSlot] = []
+        self._runners: List[asyncio.Task] = []
+
+    def start(self, ml_service: MLService) -> None:
+        """Start the worker slots; jobs submitted earlier stay queued until now"""
+        self.ml_service = ml_service
+        self._slots = [_WorkerSlot() for _ in range(self.workers)]
+        self._runners = [asyncio.create_task(self._run(slot)) for slot in self._slots]
+        logger.info(f"Training executor started with {self.workers} workers")
+
+    async def shutdown(self) -> None:
+        """Stop the slots, killing any job that is still running"""
+        for runner in self._runners:
+            runner.cancel()
+        await asyncio.gather(*self._runners, return_exceptions=True)
+        for slot in self._slots:
+            slot.kill()
+        self._runners = []
+        self._slots = []
+
+    def submit(
+        self,
+        model_type: str,
+        item_id: str,
+        vendor_id: str,
+        tenant_id: str,
+        parameters: Dict[str, Any],
+        timeout_seconds: Optional[float] = None
+    ) -> TrainingJob:
+        """
+        Queue a training job
+
+        Raises:
+            TrainingQueueFull: If the queue already holds its maximum number of jobs
+        """
+        job = TrainingJob(
+            model_type, item_id, vendor_id, tenant_id, parameters,
+            timeout_seconds or self.timeout_seconds
+        )
+        self._enqueue(job)
+        logger.info(f"Queued training job {job.job_id} for {model_type} model")
+        return job
+
+    def submit_retrain(
+        self,
+        tenant_id: str,
+        model_id: str,
+        parameters: Optional[Dict[str, Any]] = None,
+        timeout_seconds: Optional[float] = None
+    ) -> TrainingJob:
+        """
+        Queue a retrain of an existing model
+
+        The job's model_id is the model to use once it is done: the new
+        version, or model_id itself if the previous version was kept.
+
+        Raises:
+            TrainingQueueFull: If the queue already holds its maximum number of jobs
+        """
+        job = TrainingJob(
+            None, None, None, tenant_id, parameters or {},
+            timeout_seconds or self.timeout_seconds, kind='retrain', parent_model_id=model_id
+        )
+        self._enqueue(job)
+        logger.info(f"Queued retraining job {job.job_id} for model {model_id}")
+        return job
+
+    def submit_tuning(
+        self,
+        item_id: str,
+        vendor_id: str,
+        tenant_id: str,
+        options: Dict[str, Any],
+        timeout_seconds: Optional[float] = None
+    ) -> TrainingJob:
+        """
+        Queue a Prophet parameter search of a series
+
+        The search fans out over the tuner's shared worker pool (see
+        ProphetTuner) rather than a slot's worker; the slot only bounds how
+        many searches run at once.
+
+        Args:
+            options: Keyword arguments of MLService.tune_demand_model
+
+        Raises:
+            TrainingQueueFull: If the queue already holds its maximum number of jobs
+        """
+        job = TrainingJob(
+            "demand_forecast", item_id, vendor_id, tenant_id, options,
+            timeout_seconds or self.timeout_seconds, kind='tune'
+        )
+        self._enqueue(job)
+        logger.info(f"Queued tuning job {job.job_id} for {item_id}/{vendor_id}")
+        return job
+
+    def _enqueue(self, job: TrainingJob) -> None:
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise TrainingQueueFull(f"Training queue is full ({self._queue.maxsize} jobs)")
+        self._jobs[job.job_id] = job
+
+    def get(self, job_id: str) -> Optional[TrainingJob]:
+        return self._jobs.get(job_id)
+
+    def list_jobs(self, tenant_id: Optional[str] = None) -> List[TrainingJob]:
+        return [job for job in self._jobs.values() if tenant_id is None or job.tenant_id == tenant_id]
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job
+
+        Returns:
+            True if the job was cancelled, False if it had already finished
+
+        Raises:
+            KeyError: If the job is unknown
+        """
+        job = self._jobs[job_id]
+        if job.status in FINISHED_STATUSES:
+            return False
+
+        self._finish(job, JobStatus.CANCELLED)
+        # A queued job is skipped when a slot takes it off the queue
+        if job._task is not None:
+            job._task.cancel()
+        logger.info(f"Cancelled training job {job_id}")
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        counts = {status.value: 0 for status in JobStatus}
+        for job in self._jobs.values():
+            counts[job.status.value] += 1
+        return {
+            'workers': self.workers,
+            'queue_size': self._queue.qsize(),
+            'max_queued': self._queue.maxsize,
+            'jobs': counts
+        }
+
+    async def _run(self, slot: _WorkerSlot) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.status == JobStatus.QUEUED:
+                    await self._execute(slot, job)
+            finally:
+                self._queue.task_done()
+
+    async def _execute(self, slot: _WorkerSlot, job: TrainingJob) -> None:
+        job.status = JobStatus.RUNNING
+        job.started_at = datetime.utcnow()
+        job._task = asyncio.ensure_future(self._train(slot, job))
+
+        try:
+            metadata = await asyncio.wait_for(job._task, job.timeout_seconds)
+        except asyncio.TimeoutError:
+            self._stop_worker(slot, job)
+            self._finish(job, JobStatus.FAILED, f"Timed out after {job.timeout_seconds}s")
+            logger.error(f"Training job {job.job_id} timed out after {job.timeout_seconds}s")
+        except asyncio.CancelledError:
+            self._stop_worker(slot, job)
+            if job.status != JobStatus.CANCELLED:
+                # The executor itself is shutting down
+                self._finish(job, JobStatus.FAILED, "Training executor shut down")
+                raise
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                # The worker died (e.g. out of memory); start a new one for the next job
+                slot.kill()
+            logger.error(f"Training job {job.job_id} failed: {str(e)}")
+            self._finish(job, JobStatus.FAILED, str(e))
+        else:
+            job.model_id = metadata.get('model_id')
+            self._finish(job, JobStatus.DONE)
+            logger.info(f"Training job {job.job_id} finished ({job.kind}, model {job.model_id})")
+        finally:
+            job._task = None
+            job._future = None
+
+    async def _train(self, slot: _WorkerSlot, job: TrainingJob) -> Dict[str, Any]:
+        if job.kind == 'retrain':
+            return await self._retrain(slot, job)
+        if job.kind == 'tune':
+            job.result = await self.ml_service.tune_demand_model(
+                job.tenant_id, job.item_id, job.vendor_id, **job.parameters
+            )
+            return {}
+
+        training_data, metadata = await self.ml_service.prepare_training(
+            job.model_type, job.item_id, job.vendor_id, job.tenant_id, job.parameters
+        )
+
+        executor = await slot.ensure_started()
+        job._future = executor.submit(fit_and_save_model, job.model_type, training_data, metadata['parameters'], metadata)
+        metadata = await asyncio.wrap_future(job._future)
+        fit_stats.record(job.model_type, metadata)
+
+        # Register the saved model
+        await self.ml_service._save_model_metadata(metadata)
+        return metadata
+
+    async def _retrain(self, slot: _WorkerSlot, job: TrainingJob) -> Dict[str, Any]:
+        previous_path, training_data, metadata = await self.ml_service.prepare_retraining(
+            job.tenant_id, job.parent_model_id, job.parameters
+        )
+        job.model_type = metadata['model_type']
+        job.item_id, job.vendor_id = metadata.get('item_id'), metadata.get('vendor_id')
+
+        executor = await slot.ensure_started()
+        job._future = executor.submit(
+            retrain_and_save_model, job.model_type, previous_path, training_data, metadata['parameters'], metadata
+        )
+        metadata = await asyncio.wrap_future(job._future)
+
+        # Registers the new version unless the previous one was kept
+        model_id = await self.ml_service.complete_retraining(metadata)
+        return {**metadata, 'model_id': model_id}
+
+    def _stop_worker(self, slot: _WorkerSlot, job: TrainingJob) -> None:
+        # Only restart the worker if the job's fit is actually running in it
+        if job._future is not None and not job._future.done():
+            slot.kill()
+
+    def _finish(self, job: TrainingJob, status: JobStatus, error: Optional[str] = None) -> None:
+        job.status = status
+        job.error = error
+        job.finished_at = datetime.utcnow()
+
+        finished = [job_id for job_id, j in self._jobs.items() if j.status in FINISHED_STATUSES]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+
+training_executor = TrainingExecutor()
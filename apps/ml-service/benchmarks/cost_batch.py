@@ -0,0 +1,103 @@
+"""
+Throughput of batched cost prediction against per-item scoring
+
+Fits an XGBoost cost model (fit_cost_model) on synthetic purchase order
+lines, then prices --items line items over --horizon weeks:
+  - per item: the previous approach, building each item's future features
+    row by row in Python and calling predict once per item (timed on a
+    sample of --loop-items and scaled to --items);
+  - batched: predict_costs, which builds the [items * horizon] feature
+    matrix with NumPy and calls predict once.
+
+Both are checked to produce the same costs on the sample.
+
+    python benchmarks/cost_batch.py --items 50000 --horizon 12
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.cost_inference import predict_costs  # noqa: E402
+from app.services.ml_service import fit_cost_model  # noqa: E402
+
+
+def synthetic_cost_lines(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    quantity = rng.lognormal(3.0, 1.0, rows)
+    rating = rng.uniform(1.0, 5.0, rows)
+    unit_price = 50 * quantity ** -0.1 * (1.2 - 0.05 * rating) * rng.lognormal(0, 0.1, rows)
+    return pd.DataFrame({'quantity': quantity, 'vendorRating': rating, 'unitPrice': unit_price})
+
+
+def _per_item(model_data: Dict[str, Any], quantity: float, rating: float, horizon: int) -> np.ndarray:
+    future_features = []
+    for i in range(horizon):
+        features = {
+            'quantity': quantity,
+            'vendor_rating': rating,
+            'seasonality_factor': np.sin(2 * np.pi * i / 52)
+        }
+        future_features.append([features[col] for col in model_data['feature_columns']])
+    scaled = model_data['scaler'].transform(np.asarray(future_features))
+    return np.maximum(model_data['model'].predict(scaled), 0)
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    model_data = fit_cost_model(synthetic_cost_lines(args.training_rows), {})
+
+    rng = np.random.default_rng(1)
+    quantities = rng.lognormal(3.0, 1.0, args.items)
+    ratings = rng.uniform(1.0, 5.0, args.items)
+
+    sample = min(args.loop_items, args.items)
+    started = time.perf_counter()
+    looped = np.vstack([
+        _per_item(model_data, quantities[i], ratings[i], args.horizon) for i in range(sample)
+    ])
+    loop_seconds = (time.perf_counter() - started) * args.items / sample
+
+    started = time.perf_counter()
+    batched = predict_costs(
+        model_data, {'quantity': quantities, 'vendor_rating': ratings}, args.items, args.horizon
+    )
+    batch_seconds = time.perf_counter() - started
+
+    return {
+        'items': args.items,
+        'horizon': args.horizon,
+        'feature_columns': model_data['feature_columns'],
+        'per_item': {
+            'seconds': round(loop_seconds, 2),
+            'items_timed': sample,
+            'extrapolated': sample != args.items
+        },
+        'batched': {
+            'seconds': round(batch_seconds, 3),
+            'predictions_per_second': round(args.items * args.horizon / batch_seconds)
+        },
+        'speedup': round(loop_seconds / batch_seconds, 1),
+        'max_abs_difference': float(np.abs(looped - batched[:sample]).max())
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=50000)
+    parser.add_argument('--horizon', type=int, default=12)
+    parser.add_argument('--loop-items', type=int, default=2000, help='Items scored one at a time and scaled to --items')
+    parser.add_argument('--training-rows', type=int, default=20000)
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Memory ceiling and throughput of the cost training-data pipeline
+
+Optionally seeds a synthetic tenant with purchase orders, then builds cost
+training data twice: with the previous pipeline (joins over every order,
+results buffered as a list of documents) and with DataService's streaming
+pipeline. Reports wall time, rows per second and the peak Python heap
+allocation (tracemalloc) of each.
+
+    MONGODB_URI=mongodb://... python benchmarks/cost_pipeline.py \\
+        --tenant-id cost-bench --seed-lines 3000000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+from bson import ObjectId
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.config import settings  # noqa: E402
+from app.services.data_service import DataService  # noqa: E402
+
+# The pipeline _get_cost_data ran before it was rewritten
+LEGACY_PIPELINE: List[Dict[str, Any]] = [
+    {'$lookup': {'from': 'vendors', 'localField': 'vendorId', 'foreignField': '_id', 'as': 'vendor'}},
+    {'$unwind': '$vendor'},
+    {'$lookup': {'from': 'items', 'localField': 'items.itemId', 'foreignField': '_id', 'as': 'item'}},
+    {'$unwind': '$item'},
+    {
+        '$project': {
+            'date': '$createdAt',
+            'vendorId': '$vendorId',
+            'vendorName': '$vendor.name',
+            'vendorRating': '$vendor.rating',
+            'itemId': '$item._id',
+            'itemName': '$item.name',
+            'itemCategory': '$item.category',
+            'quantity': '$items.quantity',
+            'unitPrice': '$items.unitPrice',
+            'totalAmount': '$totalAmount'
+        }
+    }
+]
+
+
+async def seed_tenant(db, lines: int, vendors: int, items: int, lines_per_order: int) -> None:
+    rng = np.random.default_rng(0)
+    vendor_ids = [ObjectId() for _ in range(vendors)]
+    item_ids = [ObjectId() for _ in range(items)]
+
+    await db.vendors.insert_many([
+        {'_id': v, 'name': f"Vendor {i}", 'rating': float(rng.uniform(3, 5)), 'category': 'supplies'}
+        for i, v in enumerate(vendor_ids)
+    ])
+    await db.items.insert_many([
+        {'_id': item, 'name': f"Item {i}", 'category': f"category-{i % 20}"}
+        for i, item in enumerate(item_ids)
+    ])
+
+    start = datetime(2021, 1, 1)
+    orders = lines // lines_per_order
+    batch = []
+    for n in range(orders):
+        order_items = [
+            {
+                'itemId': item_ids[int(rng.integers(items))],
+                'quantity': int(rng.integers(1, 100)),
+                'unitPrice': float(rng.uniform(1, 500)),
+                'notes': 'x' * 40
+            }
+            for _ in range(lines_per_order)
+        ]
+        batch.append({
+            'poNumber': f"PO-{n}",
+            'vendorId': vendor_ids[int(rng.integers(vendors))],
+            'description': 'Synthetic purchase order for benchmarking',
+            'items': order_items,
+            'totalAmount': sum(i['quantity'] * i['unitPrice'] for i in order_items),
+            'approvals': [{'status': 'Approved', 'comments': 'ok'}],
+            'status': 'Closed',
+            'createdAt': start + timedelta(minutes=int(rng.integers(0, 60 * 24 * 1000)))
+        })
+        if len(batch) == 5000:
+            await db.purchase_orders.insert_many(batch)
+            batch = []
+    if batch:
+        await db.purchase_orders.insert_many(batch)
+
+
+async def _legacy(db) -> int:
+    documents = await db.purchase_orders.aggregate(LEGACY_PIPELINE).to_list(length=None)
+    return len(pd.DataFrame(documents))
+
+
+async def _streaming(data_service: DataService, db) -> int:
+    return len(await data_service._get_cost_data(db, None, None))
+
+
+async def _measure(label: str, run) -> Dict[str, Any]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    rows = await run()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'pipeline': label,
+        'rows': rows,
+        'seconds': round(elapsed, 2),
+        'rows_per_second': round(rows / elapsed) if elapsed else 0,
+        'peak_python_mb': round(peak / 2 ** 20, 1),
+    }
+
+
+async def run_benchmark(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    data_service = DataService(mongo_uri=settings.MONGODB_URI, redis_url=settings.REDIS_URL)
+    db = data_service.mongo_client[f"tenant_{args.tenant_id}"]
+
+    try:
+        if args.seed_lines:
+            await db.purchase_orders.drop()
+            await db.vendors.drop()
+            await db.items.drop()
+            await seed_tenant(db, args.seed_lines, args.vendors, args.items, args.lines_per_order)
+            await data_service._ensure_tenant_indexes(args.tenant_id)
+
+        results = [await _measure('streaming', lambda: _streaming(data_service, db))]
+        if not args.skip_legacy:
+            results.append(await _measure('legacy', lambda: _legacy(db)))
+    finally:
+        data_service.close()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tenant-id', required=True)
+    parser.add_argument('--seed-lines', type=int, default=0, help='Replace the tenant with this many synthetic PO lines')
+    parser.add_argument('--lines-per-order', type=int, default=5)
+    parser.add_argument('--vendors', type=int, default=200)
+    parser.add_argument('--items', type=int, default=5000)
+    parser.add_argument('--skip-legacy', action='store_true', help='Only run the streaming pipeline')
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run_benchmark(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
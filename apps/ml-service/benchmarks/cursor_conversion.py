@@ -0,0 +1,126 @@
+"""
+Cursor-to-DataFrame conversion: dict lists vs streamed column buffers
+
+Feeds synthetic demand aggregation results (shaped like the output of
+DataService's demand pipeline) through a fake async cursor and compares:
+
+  - legacy: list(cursor) -> DataFrame of dicts -> one .apply per _id field
+  - columnar: FrameBuilder streaming batches into NumPy buffers
+
+Documents are generated batch by batch, as a real cursor would deliver
+them, so peak memory reflects what each approach keeps alive. Time spent
+generating documents is excluded from the conversion time.
+
+    python benchmarks/cursor_conversion.py --rows 1000000
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+import pandas as pd
+from bson import ObjectId
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.cursor_frames import cursor_to_frame  # noqa: E402
+from app.services.data_service import DEMAND_COLUMNS  # noqa: E402
+
+
+class SyntheticCursor:
+    """Async cursor stand-in that builds each batch on demand"""
+
+    def __init__(self, rows: int, items: int = 5000):
+        self.rows = rows
+        self.position = 0
+        self.item_ids = [ObjectId() for _ in range(items)]
+        self.start = date(2020, 1, 1)
+        self.generation_seconds = 0.0
+
+    def _doc(self, i: int) -> Dict[str, Any]:
+        item_index = i % len(self.item_ids)
+        return {
+            '_id': {
+                'date': (self.start + timedelta(days=i // len(self.item_ids))).isoformat(),
+                'itemId': self.item_ids[item_index],
+                'itemName': f'Item {item_index}',
+                'category': f'Category {item_index % 20}',
+            },
+            'quantity': (i * 7) % 50,
+        }
+
+    async def to_list(self, length: int) -> List[Dict[str, Any]]:
+        started = time.perf_counter()
+        end = min(self.position + length, self.rows)
+        batch = [self._doc(i) for i in range(self.position, end)]
+        self.position = end
+        self.generation_seconds += time.perf_counter() - started
+        return batch
+
+
+async def legacy_convert(cursor: SyntheticCursor, batch_size: int) -> pd.DataFrame:
+    data = []
+    while True:
+        batch = await cursor.to_list(batch_size)
+        if not batch:
+            break
+        data.extend(batch)
+
+    df = pd.DataFrame(data)
+    df['date'] = pd.to_datetime(df['_id'].apply(lambda x: x['date']))
+    df['itemId'] = df['_id'].apply(lambda x: x['itemId'])
+    df['itemName'] = df['_id'].apply(lambda x: x['itemName'])
+    df['category'] = df['_id'].apply(lambda x: x['category'])
+    return df
+
+
+async def columnar_convert(cursor: SyntheticCursor, batch_size: int) -> pd.DataFrame:
+    builder = await cursor_to_frame(cursor, DEMAND_COLUMNS, batch_size)
+    return builder.to_frame()
+
+
+def measure(name: str, convert, rows: int, batch_size: int) -> Dict[str, Any]:
+    gc.collect()
+    cursor = SyntheticCursor(rows)
+    started = time.perf_counter()
+    frame = asyncio.run(convert(cursor, batch_size))
+    elapsed = time.perf_counter() - started - cursor.generation_seconds
+    del frame
+
+    gc.collect()
+    tracemalloc.start()
+    frame = asyncio.run(convert(SyntheticCursor(rows), batch_size))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del frame
+
+    return {
+        'approach': name,
+        'rows': rows,
+        'conversion_seconds': round(elapsed, 3),
+        'rows_per_second': int(rows / elapsed),
+        'peak_mb': round(peak / 1024 / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    results = [
+        measure('legacy', legacy_convert, args.rows, args.batch_size),
+        measure('columnar', columnar_convert, args.rows, args.batch_size),
+    ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
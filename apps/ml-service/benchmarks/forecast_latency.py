@@ -0,0 +1,88 @@
+"""
+Concurrent latency benchmark for /forecasts/generate
+
+Fires a fixed number of forecast requests at a running ML service with a
+bounded number in flight and reports latency percentiles. Run it once
+against the build before a change and once after to compare.
+
+    python benchmarks/forecast_latency.py --url http://localhost:8002 \\
+        --tenant-id demo --item-id item1 --vendor-id vendor1 \\
+        --requests 200 --concurrency 32
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict, List
+
+import httpx
+import numpy as np
+
+
+async def _run_one(client: httpx.AsyncClient, payload: Dict[str, Any], semaphore: asyncio.Semaphore, latencies: List[float], errors: List[str]):
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            response = await client.post("/api/v1/forecasts/generate", json=payload)
+            if response.status_code >= 400:
+                errors.append(f"HTTP {response.status_code}")
+        except httpx.HTTPError as e:
+            errors.append(str(e))
+        finally:
+            latencies.append(time.perf_counter() - started)
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    payload = {
+        "tenant_id": args.tenant_id,
+        "item_id": args.item_id,
+        "vendor_id": args.vendor_id,
+        "forecast_horizon": args.horizon,
+        "method": args.method,
+    }
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: List[float] = []
+    errors: List[str] = []
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            _run_one(client, payload, semaphore, latencies, errors)
+            for _ in range(args.requests)
+        ])
+        wall_time = time.perf_counter() - started
+
+    samples = np.array(latencies) * 1000
+    return {
+        "label": args.label,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "errors": len(errors),
+        "wall_time_s": round(wall_time, 3),
+        "throughput_rps": round(args.requests / wall_time, 2),
+        "p50_ms": round(float(np.percentile(samples, 50)), 1),
+        "p95_ms": round(float(np.percentile(samples, 95)), 1),
+        "p99_ms": round(float(np.percentile(samples, 99)), 1),
+        "max_ms": round(float(samples.max()), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--tenant-id", required=True)
+    parser.add_argument("--item-id", required=True)
+    parser.add_argument("--vendor-id", required=True)
+    parser.add_argument("--method", default="prophet")
+    parser.add_argument("--horizon", type=int, default=30)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--label", default="current", help="Tag for the result row, e.g. 'before' or 'after'")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run_benchmark(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Wall time and accuracy of the global demand model against per-item Prophet
+
+Builds a synthetic tenant of daily demand series (weekly and yearly
+seasonality, trend, noise and a share of intermittent items), holds out the
+last --horizon days, then:
+  - fits one GlobalDemandModel on every series and predicts every item in
+    one batched pass;
+  - fits one Prophet model per item (fit_demand_model, as demand_forecast
+    training does) and predicts each.
+
+Prophet is run on a sample of --prophet-items series and its time scaled to
+the whole tenant; pass --prophet-items equal to --items to time it in full.
+Accuracy (WAPE on the holdout) is reported for both on the same sample.
+
+    python benchmarks/global_demand.py --items 2000 --days 730 --prophet-items 50
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.global_demand_model import GlobalDemandModel  # noqa: E402
+from app.services.ml_service import fit_demand_model  # noqa: E402
+
+
+def synthetic_tenant(items: int, days: int, intermittent_share: float, seed: int = 0) -> pd.DataFrame:
+    """Wide daily demand: a 'date' column and one column per item"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2022-01-01', periods=days, freq='D')
+    t = np.arange(days)[:, None]
+
+    level = rng.lognormal(mean=3.0, sigma=1.0, size=items)
+    trend = rng.normal(0, 0.0005, size=items)
+    weekly_amplitude = rng.uniform(0, 0.4, size=items)
+    yearly_amplitude = rng.uniform(0, 0.3, size=items)
+    phase = rng.uniform(0, 2 * np.pi, size=items)
+
+    mean = level * (1 + trend * t) \
+        * (1 + weekly_amplitude * np.sin(2 * np.pi * t / 7 + phase)) \
+        * (1 + yearly_amplitude * np.sin(2 * np.pi * t / 365.25 + phase))
+    demand = rng.poisson(np.maximum(mean, 0)).astype(float)
+
+    intermittent = rng.random(items) < intermittent_share
+    demand[:, intermittent] *= rng.random((days, intermittent.sum())) < 0.15
+
+    frame = pd.DataFrame(demand, columns=[f"item-{i}" for i in range(items)])
+    frame.insert(0, 'date', dates)
+    return frame
+
+
+def _wape(actual: np.ndarray, predicted: np.ndarray) -> float:
+    total = np.abs(actual).sum()
+    return float(np.abs(actual - predicted).sum() / total) if total else 0.0
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    demand = synthetic_tenant(args.items, args.days, args.intermittent_share)
+    train, holdout = demand.iloc[:-args.horizon], demand.iloc[-args.horizon:]
+    items = [column for column in demand.columns if column != 'date']
+
+    rng = np.random.default_rng(1)
+    sample = sorted(rng.choice(len(items), size=min(args.prophet_items, len(items)), replace=False))
+    sample_items = [items[i] for i in sample]
+
+    started = time.perf_counter()
+    model = GlobalDemandModel(n_estimators=args.n_estimators).fit(train)
+    global_fit = time.perf_counter() - started
+
+    started = time.perf_counter()
+    global_forecast = model.predict(args.horizon)
+    global_predict = time.perf_counter() - started
+
+    prophet_fit = prophet_predict = 0.0
+    prophet_forecast = {}
+    for item in sample_items:
+        series = train[['date', item]].rename(columns={item: 'quantity'})
+
+        started = time.perf_counter()
+        prophet = fit_demand_model(series, {})
+        prophet_fit += time.perf_counter() - started
+
+        started = time.perf_counter()
+        future = prophet.make_future_dataframe(periods=args.horizon, freq='D')
+        prophet_forecast[item] = np.maximum(prophet.predict(future)['yhat'].tail(args.horizon).to_numpy(), 0)
+        prophet_predict += time.perf_counter() - started
+
+    scale = len(items) / len(sample_items)
+    actual = holdout[sample_items].to_numpy()
+
+    return {
+        'items': len(items),
+        'days': args.days,
+        'horizon': args.horizon,
+        'prophet_items_timed': len(sample_items),
+        'global': {
+            'fit_seconds': round(global_fit, 2),
+            'predict_seconds': round(global_predict, 2),
+            'total_seconds': round(global_fit + global_predict, 2),
+            'training_rows': int(model.metrics['training_rows']),
+            'sample_wape': round(_wape(actual, global_forecast[sample_items].to_numpy()), 4),
+            'all_items_wape': round(_wape(holdout[items].to_numpy(), global_forecast[items].to_numpy()), 4)
+        },
+        'per_item_prophet': {
+            'fit_seconds_per_item': round(prophet_fit / len(sample_items), 3),
+            'predict_seconds_per_item': round(prophet_predict / len(sample_items), 3),
+            'total_seconds_all_items': round((prophet_fit + prophet_predict) * scale, 1),
+            'extrapolated': scale != 1,
+            'sample_wape': round(_wape(actual, np.column_stack([prophet_forecast[i] for i in sample_items])), 4)
+        },
+        'speedup': round((prophet_fit + prophet_predict) * scale / (global_fit + global_predict), 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=2000)
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--horizon', type=int, default=28)
+    parser.add_argument('--prophet-items', type=int, default=50, help='Series fitted with Prophet and scaled to --items')
+    parser.add_argument('--intermittent-share', type=float, default=0.2)
+    parser.add_argument('--n-estimators', type=int, default=300)
+    args = parser.parse_args()
+
+    # Prophet and cmdstanpy log every fit
+    logging.getLogger('cmdstanpy').disabled = True
+    logging.getLogger('prophet').setLevel(logging.WARNING)
+
+    print(json.dumps(run_benchmark(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Load time and memory of joblib model pickles vs artifact directories
+
+Trains a Prophet demand model and an XGBoost cost model on synthetic data,
+saves each both as a legacy joblib pickle of (model, metadata) and as an
+artifact directory, then starts several worker processes per format that
+load the model at the same time. Each worker reports its first load time
+(which includes one-off library setup), the median of repeated loads, and
+the RSS, PSS and private memory one loaded copy adds; PSS and private
+memory show how much of the model is shared through the page cache rather
+than copied.
+
+    python benchmarks/model_artifacts.py --days 1500 --workers 4 --repeats 10
+"""
+import argparse
+import json
+import logging
+import multiprocessing as mp
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+import joblib
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.model_artifacts import artifact_size, load_artifact, save_artifact  # noqa: E402
+
+
+def _memory_kb() -> Dict[str, int]:
+    fields = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ('Rss:', 'Pss:', 'Private_Clean:', 'Private_Dirty:'):
+                fields[parts[0][:-1]] = int(parts[1])
+    return {
+        'rss': fields['Rss'],
+        'pss': fields['Pss'],
+        'private': fields['Private_Clean'] + fields['Private_Dirty'],
+    }
+
+
+def _load(path: str) -> Any:
+    if os.path.isdir(path):
+        return load_artifact(path)
+    return joblib.load(path)
+
+
+def _worker(path: str, repeats: int, barrier, results) -> None:
+    # Import the model libraries up front so only the load itself is measured
+    import prophet  # noqa: F401
+    import xgboost  # noqa: F401
+
+    before = _memory_kb()
+    started = time.perf_counter()
+    model = _load(path)
+    first_load_seconds = time.perf_counter() - started
+
+    # Measure while every worker holds the model, so shared pages are split
+    barrier.wait()
+    after = _memory_kb()
+    barrier.wait()
+
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        _load(path)
+        timings.append(time.perf_counter() - started)
+
+    results.put({
+        'first_load_ms': first_load_seconds * 1000,
+        'load_ms': float(np.median(timings)) * 1000 if timings else 0.0,
+        **{f"{k}_mb": (after[k] - before[k]) / 1024 for k in before}
+    })
+    del model
+
+
+def _train_models(days: int) -> Dict[str, Any]:
+    from prophet import Prophet
+    from sklearn.preprocessing import StandardScaler
+    from xgboost import XGBRegressor
+
+    logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+    rng = np.random.default_rng(0)
+
+    t = np.arange(days)
+    history = pd.DataFrame({
+        'ds': pd.date_range('2019-01-01', periods=days, freq='D'),
+        'y': 50 + 0.02 * t + 10 * np.sin(2 * np.pi * t / 7) + rng.normal(0, 3, days)
+    })
+    prophet_model = Prophet()
+    prophet_model.fit(history)
+
+    X = rng.normal(size=(days * 20, 4))
+    y = X @ np.array([3.0, -1.0, 0.5, 2.0]) + rng.normal(0, 0.1, len(X))
+    scaler = StandardScaler().fit(X)
+    regressor = XGBRegressor(n_estimators=300, max_depth=6).fit(scaler.transform(X), y)
+    cost_model = {
+        'model': regressor,
+        'scaler': scaler,
+        'feature_columns': ['quantity', 'vendor_rating', 'market_price', 'seasonality_factor'],
+        'metrics': {}
+    }
+
+    return {'prophet': prophet_model, 'xgboost_cost': cost_model}
+
+
+def _measure(path: str, workers: int, repeats: int) -> Dict[str, float]:
+    ctx = mp.get_context('spawn')
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    processes = [ctx.Process(target=_worker, args=(path, repeats, barrier, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    samples: List[Dict[str, float]] = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    return {key: round(float(np.mean([s[key] for s in samples])), 2) for key in samples[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=1500, help="Days of synthetic training history")
+    parser.add_argument("--workers", type=int, default=4, help="Processes loading each model at once")
+    parser.add_argument("--repeats", type=int, default=10, help="Loads per worker after the first")
+    args = parser.parse_args()
+
+    models = _train_models(args.days)
+    workdir = tempfile.mkdtemp(prefix='model-artifacts-')
+    rows = []
+
+    try:
+        for kind, model in models.items():
+            metadata = {'model_type': kind, 'training_date': datetime.now()}
+
+            pickle_path = os.path.join(workdir, f"{kind}.joblib")
+            joblib.dump((model, metadata), pickle_path)
+            artifact_path = save_artifact(os.path.join(workdir, f"{kind}.model"), model, metadata)
+
+            for label, path in (('joblib', pickle_path), ('artifact', artifact_path)):
+                rows.append({
+                    'model': kind,
+                    'format': label,
+                    'size_kb': round(artifact_size(path) / 1024, 1),
+                    **_measure(path, args.workers, args.repeats)
+                })
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Predict latency and interval coverage of calibrated intervals against Prophet's sampled bands
+
+Fits each synthetic demand series on all but its last --horizon days with
+fit_calibrated_demand_model, then forecasts the held-out days with the same
+model two ways:
+  - sampled: Prophet.predict with --samples uncertainty samples, the
+    previous default, reading yhat_lower / yhat_upper;
+  - calibrated: prophet_point_forecast (no sampling) plus the per-step
+    half-widths of interval_half_widths.
+
+Reports mean predict milliseconds, the share of held-out days inside each
+interval (target: --level) and the mean interval width.
+
+    python benchmarks/prediction_intervals.py --series 10 --days 730 --horizon 28
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.ml_service import fit_calibrated_demand_model, prophet_point_forecast  # noqa: E402
+from app.services.prediction_intervals import interval_half_widths  # noqa: E402
+from benchmarks.global_demand import synthetic_tenant  # noqa: E402
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    demand = synthetic_tenant(args.series, args.days, intermittent_share=0.0)
+    items = [column for column in demand.columns if column != 'date']
+    parameters = {'interval_calibration_days': args.calibration_days}
+
+    timings = {'sampled': [], 'calibrated': []}
+    inside = {'sampled': [], 'calibrated': []}
+    widths = {'sampled': [], 'calibrated': []}
+    methods = []
+
+    for item in items:
+        series = demand[['date', item]].rename(columns={item: 'quantity'})
+        train, test = series.iloc[:-args.horizon], series.iloc[-args.horizon:]
+        actual = test['quantity'].to_numpy(dtype=float)
+        model, calibration = fit_calibrated_demand_model(train, parameters)
+
+        model.uncertainty_samples = args.samples
+        model.interval_width = args.level
+        started = time.perf_counter()
+        forecast = model.predict(pd.DataFrame({'ds': test['date']}))
+        timings['sampled'].append(time.perf_counter() - started)
+        lower, upper = forecast['yhat_lower'].to_numpy(), forecast['yhat_upper'].to_numpy()
+        inside['sampled'].append((actual >= lower) & (actual <= upper))
+        widths['sampled'].append(upper - lower)
+
+        model.uncertainty_samples = 0
+        started = time.perf_counter()
+        point = prophet_point_forecast(model, test['date'])
+        lead_days = (pd.to_datetime(test['date']) - pd.Timestamp(calibration['training_end'])).dt.days.to_numpy()
+        half_widths, method = interval_half_widths(calibration, lead_days, args.level)
+        timings['calibrated'].append(time.perf_counter() - started)
+        inside['calibrated'].append(np.abs(actual - point) <= half_widths)
+        widths['calibrated'].append(2 * half_widths)
+        methods.append(method)
+
+    result = {
+        'series': len(items),
+        'horizon': args.horizon,
+        'level': args.level,
+        'uncertainty_samples': args.samples,
+        'calibration_methods': {m: methods.count(m) for m in set(methods)}
+    }
+    for name in ('sampled', 'calibrated'):
+        result[name] = {
+            'predict_ms': round(float(np.mean(timings[name])) * 1000, 2),
+            'coverage': round(float(np.concatenate(inside[name]).mean()), 4),
+            'mean_width': round(float(np.concatenate(widths[name]).mean()), 3)
+        }
+    result['predict_speedup'] = round(result['sampled']['predict_ms'] / result['calibrated']['predict_ms'], 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--series', type=int, default=10)
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--horizon', type=int, default=28, help='Held-out days forecast per series')
+    parser.add_argument('--calibration-days', type=int, default=28)
+    parser.add_argument('--level', type=float, default=0.8, help="Interval level (Prophet's default interval_width)")
+    parser.add_argument('--samples', type=int, default=1000, help="Prophet's uncertainty_samples for the sampled bands")
+    args = parser.parse_args()
+
+    logging.getLogger('cmdstanpy').disabled = True
+    logging.getLogger('prophet').setLevel(logging.WARNING)
+    print(json.dumps(run_benchmark(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
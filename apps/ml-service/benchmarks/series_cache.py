@@ -0,0 +1,83 @@
+"""
+Cold Mongo vs warm memory-mapped reads of demand training data
+
+Reads the same tenant's demand history repeatedly through DataService,
+first with the series cache disabled (every read aggregates in Mongo) and
+then from the warm on-disk Arrow cache, and reports per-read latency.
+
+    MONGODB_URI=mongodb://... python benchmarks/series_cache.py \\
+        --tenant-id demo --item-id 65a0c1e2f3a4b5c6d7e8f901 --reads 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.config import settings  # noqa: E402
+from app.services.data_service import DataService  # noqa: E402
+from app.services.series_store import SeriesStore  # noqa: E402
+
+
+def _summary(label: str, samples: List[float]) -> Dict[str, Any]:
+    values = np.array(samples) * 1000
+    return {
+        'path': label,
+        'reads': len(samples),
+        'mean_ms': round(float(values.mean()), 2),
+        'p50_ms': round(float(np.percentile(values, 50)), 2),
+        'p99_ms': round(float(np.percentile(values, 99)), 2),
+    }
+
+
+async def _time_reads(data_service: DataService, tenant_id: str, item_id: Optional[str], reads: int) -> List[float]:
+    samples = []
+    for _ in range(reads):
+        started = time.perf_counter()
+        await data_service.get_training_data(tenant_id, 'demand', item_id=item_id)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def run_benchmark(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    data_service = DataService(mongo_uri=settings.MONGODB_URI, redis_url=settings.REDIS_URL)
+    try:
+        data_service.series_store = None
+        cold = await _time_reads(data_service, args.tenant_id, args.item_id, args.reads)
+
+        data_service.series_store = SeriesStore(
+            tempfile.mkdtemp(prefix='series_cache_bench_'),
+            ttl_seconds=3600
+        )
+        started = time.perf_counter()
+        await data_service.get_training_data(args.tenant_id, 'demand', item_id=args.item_id)
+        build_time = time.perf_counter() - started
+
+        warm = await _time_reads(data_service, args.tenant_id, args.item_id, args.reads)
+    finally:
+        data_service.close()
+
+    results = [_summary('mongo_cold', cold), _summary('mmap_warm', warm)]
+    results[1]['initial_build_ms'] = round(build_time * 1000, 2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tenant-id', required=True)
+    parser.add_argument('--item-id', default=None, help='Read a single item series instead of the full pivot')
+    parser.add_argument('--reads', type=int, default=20)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run_benchmark(args)), indent=2))
+
+
+if __name__ == '__main__':
+    main()
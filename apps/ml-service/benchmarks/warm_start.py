@@ -0,0 +1,113 @@
+"""
+Wall time of warm-started Prophet retrains against cold fits
+
+Simulates a daily retrain schedule on synthetic demand series: each series
+is fitted once on its first --days days, then for --retrains days one more
+day of demand arrives and the model is refitted on the trailing --window
+days, either:
+  - cold: fit_demand_model from Prophet's default starting point, as a
+    full retrain does;
+  - warm: retrain_and_save_demand_model, which warm-starts from the
+    previous version, scores it on the last --holdout days and refits on
+    the full window only if it wins.
+
+Reports mean fit seconds of each, the warm speedup, how many retrains were
+accepted, and the holdout MAE of both on the final day.
+
+    python benchmarks/warm_start.py --series 10 --days 730 --retrains 7
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.model_artifacts import load_artifact  # noqa: E402
+from app.services.ml_service import (  # noqa: E402
+    fit_demand_model,
+    prophet_point_forecast,
+    retrain_and_save_demand_model,
+)
+from benchmarks.global_demand import synthetic_tenant  # noqa: E402
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    demand = synthetic_tenant(args.series, args.days + args.retrains, intermittent_share=0.0)
+    items = [column for column in demand.columns if column != 'date']
+    parameters = {'retrain_holdout_days': args.holdout}
+
+    cold_seconds, warm_seconds = [], []
+    accepted = 0
+    cold_mae, warm_mae = [], []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for item in items:
+            series = demand[['date', item]].rename(columns={item: 'quantity'})
+            current = fit_demand_model(series.iloc[:args.days], parameters)
+
+            for day in range(1, args.retrains + 1):
+                end = args.days + day
+                window = series.iloc[max(0, end - args.window):end]
+
+                started = time.perf_counter()
+                cold = fit_demand_model(window, parameters)
+                cold_seconds.append(time.perf_counter() - started)
+
+                metadata = retrain_and_save_demand_model(
+                    current, window, parameters, {'model_path': str(Path(tmp) / f"{item}-{day}.model")}
+                )
+                warm_seconds.append(metadata['fit_seconds'])
+                if metadata['accepted']:
+                    accepted += 1
+                    current = load_artifact(metadata['model_path'])[0]
+
+            holdout = series.iloc[args.days + args.retrains - args.holdout:args.days + args.retrains]
+            actual = holdout['quantity'].to_numpy(dtype=float)
+            cold_mae.append(np.mean(np.abs(actual - prophet_point_forecast(cold, holdout['date']))))
+            warm_mae.append(np.mean(np.abs(actual - prophet_point_forecast(current, holdout['date']))))
+
+    cold_mean, warm_mean = float(np.mean(cold_seconds)), float(np.mean(warm_seconds))
+    return {
+        'series': len(items),
+        'retrains_per_series': args.retrains,
+        'window_days': args.window,
+        'cold': {'fits': len(cold_seconds), 'mean_seconds': round(cold_mean, 3)},
+        'warm': {
+            'fits': len(warm_seconds),
+            'mean_seconds': round(warm_mean, 3),
+            'accepted': accepted
+        },
+        'warm_speedup': round(cold_mean / warm_mean, 2) if warm_mean else None,
+        'final_in_sample_mae': {
+            'cold': round(float(np.mean(cold_mae)), 3),
+            'warm': round(float(np.mean(warm_mae)), 3)
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--series', type=int, default=10)
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--retrains', type=int, default=7)
+    parser.add_argument('--window', type=int, default=364)
+    parser.add_argument('--holdout', type=int, default=14)
+    args = parser.parse_args()
+
+    # Prophet and cmdstanpy log every fit
+    logging.getLogger('cmdstanpy').disabled = True
+    logging.getLogger('prophet').setLevel(logging.WARNING)
+
+    print(json.dumps(run_benchmark(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,18 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from contextlib import asynccontextmanager
 import uvicorn
+import asyncio
 import os
 from dotenv import load_dotenv
 
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.database import connections, init_db, close_db, ensure_indexes
 from app.api.v1.api import api_router
 from app.core.logging import setup_logging
+from app.services.demand_rollup import run_demand_rollup
+from app.services.ml_service import MLService
+from app.services.prophet_tuning import prophet_tuner
+from app.services.training_executor import training_executor
 
 # Load environment variables
 load_dotenv()
@@ -18,12 +23,25 @@ load_dotenv()
 async def lifespan(app: FastAPI):
     # Startup
     setup_logging()
-    await init_db()
+    app.state.connections = connections
+    if not await init_db():
+        await close_db()
+        raise RuntimeError("MongoDB is unavailable, not starting the ML service")
+    # Reads also create a tenant's indexes on first use, so startup does not wait for every tenant
+    index_task = asyncio.create_task(ensure_indexes())
+    rollup_task = asyncio.create_task(run_demand_rollup(connections.mongo_client, connections.redis_client))
+    training_executor.start(MLService(connections.data_service))
     print("🚀 ML Service started successfully")
     
     yield
     
     # Shutdown
+    await training_executor.shutdown()
+    prophet_tuner.shutdown()
+    index_task.cancel()
+    rollup_task.cancel()
+    await asyncio.gather(index_task, rollup_task, return_exceptions=True)
+    await close_db()
     print("🛑 ML Service shutting down")
 
 def create_application() -> FastAPI: